@@ -4,34 +4,51 @@ import csv
 import io
 import uuid
 import re
+import tempfile
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form, Query, status
-from fastapi.responses import StreamingResponse, Response
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text
-from app.core.database import get_db
-from app.core.security import get_current_user, get_current_user_from_token_param
+from sqlalchemy import select, func, text, update, bindparam, any_, tuple_, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.orm import lazyload
+from app.core.database import get_db, get_read_db, read_session
+from app.core.security import get_current_user, get_current_user_rw, get_current_user_from_token_param
 from app.core.storage_dispatch import upload_file, get_presigned_url, generate_upload_url, get_file_object
+from app.core.instrumentation import query_budget
+from app.core.process_pool import run_cpu
+from app.core.tracing import span
 from app.services.thumbnails import generate_thumbnail
+from app.services.zipstream import iter_zip
+from app.services.archive_filters import CSV_COLUMNS, apply_archive_filters
+from app.services.slugs import slugify
+from app.services.territory_matching import match_territory
+from app.services.territory_stats import territory_grid
+from app.services.changes import (
+    record_archive_change, record_archive_changes, change_op_for_update,
+    stable_change_cursor, encode_cursor, decode_cursor,
+)
+from app.services.archive_stats import archive_stats
+from app.services.bundles import (
+    BUNDLE_RETRY_AFTER_SECONDS, bundle_building, bundle_digest, bundle_exists, bundle_key, enqueue_bundle,
+)
+from app.services.sprites import (
+    TILE_WIDTH, TILE_HEIGHT, ensure_sprite, sprite_key, sprite_layout,
+)
 from app.models.user import User
 from app.models.archive import Archive
+from app.models.archive_change import ArchiveChange
 from app.models.territory import Territory
 from app.schemas.schemas import (
     ArchiveCreate, ArchiveUpdate, ArchiveResponse,
     ArchiveListResponse, UploadUrlRequest, UploadUrlResponse,
+    SpriteResponse, SpriteTile, BundleResponse, TerritoryResponse,
+    BulkArchiveUpdate, BulkOutcome, BulkUpdateResponse, ArchiveStatsResponse,
 )
 
 router = APIRouter(prefix="/archives", tags=["Archives"])
 
 
-def slugify(text: str) -> str:
-    """Générer un slug à partir d'un titre."""
-    slug = text.lower().strip()
-    slug = re.sub(r"[^\w\s-]", "", slug)
-    slug = re.sub(r"[-\s]+", "-", slug)
-    return f"{slug}-{uuid.uuid4().hex[:8]}"
-
-
 def enrich_archive_response(archive: Archive) -> ArchiveResponse:
     """Enrichir une archive avec les URLs proxy via le backend."""
     response = ArchiveResponse.model_validate(archive)
@@ -52,7 +69,7 @@ async def create_archive(
     file: UploadFile = File(...),
     data: str = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_rw),
 ):
     """Déposer une nouvelle archive avec son fichier."""
     # Parser les métadonnées JSON envoyées via le formulaire
@@ -62,41 +79,30 @@ async def create_archive(
     ext = file.filename.rsplit(".", 1)[-1] if "." in file.filename else "bin"
     object_key = f"{data.media_type}/{uuid.uuid4().hex}.{ext}"
 
-    # Upload du fichier
-    file_data = await file.read()
+    # Upload du fichier (le corps multipart est déjà reçu : lecture du fichier temporaire)
+    with span("archive.read_upload") as read_span:
+        file_data = await file.read()
+        if read_span is not None:
+            read_span.attributes["bytes"] = len(file_data)
     await upload_file(file_data, object_key, file.content_type)
 
     # Générer le thumbnail et extraire les métadonnées média
-    media_info = await generate_thumbnail(data.media_type, file_data, object_key)
+    with span("archive.thumbnail", media_type=data.media_type):
+        media_info = await generate_thumbnail(data.media_type, file_data, object_key)
 
-    # Auto-matching du territoire si non sélectionné
+    # Auto-matching du territoire si non sélectionné : position GPS du média
+    # (territoire le plus proche), à défaut le lieu d'enregistrement
     territory_id = data.territory_id
-    if not territory_id and data.recording_location:
-        import unicodedata
-        loc = unicodedata.normalize("NFD", data.recording_location.lower())
-        loc = "".join(c for c in loc if unicodedata.category(c) != "Mn")
-        result_t = await db.execute(select(Territory))
-        all_territories = result_t.scalars().all()
-        best_match = None
-        best_score = 0
-        for t in all_territories:
-            t_name = unicodedata.normalize("NFD", t.name.lower())
-            t_name = "".join(c for c in t_name if unicodedata.category(c) != "Mn")
-            t_country = unicodedata.normalize("NFD", t.country.lower())
-            t_country = "".join(c for c in t_country if unicodedata.category(c) != "Mn")
-            if t_name in loc or loc.startswith(t_name):
-                score = len(t_name)
-                if score > best_score:
-                    best_score = score
-                    best_match = t
-            full = f"{t_name}, {t_country}"
-            if full in loc:
-                score = len(full) + 100
-                if score > best_score:
-                    best_score = score
-                    best_match = t
-        if best_match:
-            territory_id = best_match.id
+    with span("archive.territory_match"):
+        if not territory_id and media_info.get("coordinates"):
+            grid = await territory_grid(db)
+            territory_id = grid.nearest(*media_info["coordinates"])
+        if not territory_id and data.recording_location:
+            result_t = await db.execute(select(Territory.id, Territory.name, Territory.country))
+            # Normalisation Unicode de tous les noms : hors de la boucle
+            territory_id = await run_cpu(
+                match_territory, data.recording_location, [tuple(row) for row in result_t.all()]
+            )
 
     archive = Archive(
         title=data.title,
@@ -107,6 +113,7 @@ async def create_archive(
         file_size_bytes=len(file_data),
         mime_type=file.content_type,
         thumbnail_key=media_info.get("thumbnail_key"),
+        placeholder=media_info.get("placeholder"),
         duration_seconds=media_info.get("duration_seconds"),
         territory_id=territory_id,
         recording_date=data.recording_date,
@@ -122,28 +129,31 @@ async def create_archive(
         author_id=current_user.id,
         status="published",
     )
-    db.add(archive)
-    await db.flush()
-    await db.refresh(archive)
+    with span("archive.insert"):
+        db.add(archive)
+        await db.flush()
+        await db.refresh(archive)
+        await record_archive_change(db, archive.id, "create")
 
     # Mettre à jour le vecteur de recherche
-    await db.execute(
-        text("""
-            UPDATE archives SET search_vector =
-                setweight(to_tsvector('french', coalesce(:title, '')), 'A') ||
-                setweight(to_tsvector('french', coalesce(:description, '')), 'B') ||
-                setweight(to_tsvector('french', coalesce(:context, '')), 'C') ||
-                setweight(to_tsvector('french', coalesce(:location, '')), 'D')
-            WHERE id = :id
-        """),
-        {
-            "title": archive.title,
-            "description": archive.description or "",
-            "context": archive.context_notes or "",
-            "location": archive.recording_location or "",
-            "id": str(archive.id),
-        },
-    )
+    with span("archive.search_vector"):
+        await db.execute(
+            text("""
+                UPDATE archives SET search_vector =
+                    setweight(to_tsvector('french', coalesce(:title, '')), 'A') ||
+                    setweight(to_tsvector('french', coalesce(:description, '')), 'B') ||
+                    setweight(to_tsvector('french', coalesce(:context, '')), 'C') ||
+                    setweight(to_tsvector('french', coalesce(:location, '')), 'D')
+                WHERE id = :id
+            """),
+            {
+                "title": archive.title,
+                "description": archive.description or "",
+                "context": archive.context_notes or "",
+                "location": archive.recording_location or "",
+                "id": str(archive.id),
+            },
+        )
 
     return enrich_archive_response(archive)
 
@@ -170,32 +180,20 @@ async def get_upload_url(
 
 # ── Lister les archives ──────────────────────────
 
-@router.get("/", response_model=ArchiveListResponse)
+@router.get("/", response_model=ArchiveListResponse, dependencies=[query_budget(8)])
 async def list_archives(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     media_type: Optional[str] = None,
     status_filter: Optional[str] = Query(None, alias="status"),
     territory_id: Optional[uuid.UUID] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Lister les archives avec filtres et pagination."""
-    query = select(Archive)
-
-    # Filtres
-    if media_type:
-        query = query.where(Archive.media_type == media_type)
-    if status_filter:
-        query = query.where(Archive.status == status_filter)
-    if territory_id:
-        query = query.where(Archive.territory_id == territory_id)
-
-    # Visibilité : published visible par tous, draft/review visible par auteur + admin
-    if current_user.role not in ("admin", "editor"):
-        query = query.where(
-            (Archive.status == "published") | (Archive.author_id == current_user.id)
-        )
+    query = apply_archive_filters(
+        select(Archive), current_user, media_type, status_filter, territory_id
+    )
 
     # Compter le total
     count_query = select(func.count()).select_from(query.subquery())
@@ -218,34 +216,18 @@ async def list_archives(
     )
 
 
-# ── Export CSV des métadonnées ────────────────────
+# ── Statistiques du tableau de bord ──────────────
+
+@router.get("/stats", response_model=ArchiveStatsResponse, dependencies=[query_budget(9)])
+async def get_archive_stats(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Totaux par type et statut, stockage, durée et histogrammes mensuels (archives visibles)."""
+    return await archive_stats(db, current_user)
 
-CSV_COLUMNS = [
-    ("id", "ID"),
-    ("title", "Titre"),
-    ("slug", "Slug"),
-    ("description", "Description"),
-    ("media_type", "Type de média"),
-    ("mime_type", "Format MIME"),
-    ("file_size_bytes", "Taille (octets)"),
-    ("duration_seconds", "Durée (secondes)"),
-    ("recording_date", "Date d'enregistrement"),
-    ("recording_location", "Lieu d'enregistrement"),
-    ("language_spoken", "Langue"),
-    ("tags", "Tags"),
-    ("context_notes", "Notes de contexte"),
-    ("participants", "Participants"),
-    ("license_type", "Licence"),
-    ("rights_holder", "Titulaire des droits"),
-    ("access_level", "Niveau d'accès"),
-    ("consent_obtained", "Consentement"),
-    ("status", "Statut"),
-    ("territory_id", "Territoire (ID)"),
-    ("author_id", "Auteur (ID)"),
-    ("created_at", "Créé le"),
-    ("updated_at", "Modifié le"),
-]
 
+# ── Export CSV des métadonnées ────────────────────
 
 def _format_csv_value(value):
     """Formater une valeur pour le CSV."""
@@ -263,67 +245,392 @@ def _format_csv_value(value):
     return str(value)
 
 
+CSV_BATCH_SIZE = 1000
+
+
+async def _iter_csv_rows(query):
+    """Générer le CSV par blocs depuis un curseur serveur (mémoire constante).
+
+    Utilise sa propre session : celle de la requête est fermée avant la fin du streaming.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
+
+    # En-têtes (BOM UTF-8 pour Excel)
+    writer.writerow([label for _, label in CSV_COLUMNS])
+    yield output.getvalue().encode("utf-8-sig")
+    output.seek(0)
+    output.truncate()
+
+    async with read_session() as session:
+        result = await session.stream(query.execution_options(yield_per=CSV_BATCH_SIZE))
+        async for partition in result.partitions():
+            writer.writerows(
+                [_format_csv_value(value) for value in row] for row in partition
+            )
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+
+
 @router.get("/export/csv")
 async def export_archives_csv(
     media_type: Optional[str] = None,
     status_filter: Optional[str] = Query(None, alias="status"),
     territory_id: Optional[uuid.UUID] = None,
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Exporter les métadonnées des archives en CSV."""
-    query = select(Archive)
+    """Exporter les métadonnées des archives en CSV (streaming, transfert chunked)."""
+    # Seules les colonnes exportées sont lues : pas d'objets ORM ni de relations selectin
+    columns = [getattr(Archive, field) for field, _ in CSV_COLUMNS]
+    query = apply_archive_filters(
+        select(*columns), current_user, media_type, status_filter, territory_id
+    )
+    query = query.order_by(Archive.created_at.desc())
 
-    if media_type:
-        query = query.where(Archive.media_type == media_type)
-    if status_filter:
-        query = query.where(Archive.status == status_filter)
-    if territory_id:
-        query = query.where(Archive.territory_id == territory_id)
+    return StreamingResponse(
+        _iter_csv_rows(query),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": "attachment; filename=archives-metadonnees.csv",
+        },
+    )
 
-    # Visibilité : published visible par tous, draft/review visible par auteur + admin
-    if current_user.role not in ("admin", "editor"):
-        query = query.where(
-            (Archive.status == "published") | (Archive.author_id == current_user.id)
-        )
 
-    query = query.order_by(Archive.created_at.desc())
-    result = await db.execute(query)
-    archives = result.scalars().all()
+# ── Téléchargement groupé (ZIP en streaming) ──────
+
+# Au-delà, le manifeste CSV du ZIP est écrit sur disque plutôt qu'en mémoire
+ZIP_MANIFEST_SPOOL_BYTES = 1024 * 1024
 
-    # Générer le CSV en mémoire
+
+async def _iter_zip_entries(query, manifest):
+    """Entrées du ZIP lues par lots (keyset sur created_at, id) ; chaque ligne est
+    ajoutée au manifeste CSV au passage (mémoire constante).
+
+    Chaque lot est lu dans une session courte, fermée avant le transfert de ses
+    fichiers : aucune connexion ni transaction ne reste ouverte pendant les
+    lectures au stockage, qui peuvent durer des heures sur un lien lent.
+    """
+    fields = [field for field, _ in CSV_COLUMNS]
+    id_index, slug_index, created_index = fields.index("id"), fields.index("slug"), fields.index("created_at")
     output = io.StringIO()
     writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
 
-    # En-têtes
-    writer.writerow([label for _, label in CSV_COLUMNS])
+    # En-têtes (BOM UTF-8 pour Excel)
+    writer.writerow([label for _, label in CSV_COLUMNS] + ["Fichier"])
+    manifest.write(output.getvalue().encode("utf-8-sig"))
+
+    position = None
+    while True:
+        batch = query
+        if position is not None:
+            batch = batch.where(tuple_(Archive.created_at, Archive.id) < position)
+        batch = batch.order_by(Archive.created_at.desc(), Archive.id.desc()).limit(CSV_BATCH_SIZE)
+        async with read_session() as session:
+            rows = (await session.execute(batch)).all()
+        if not rows:
+            return
+
+        output.seek(0)
+        output.truncate()
+        entries = []
+        for file_key, *values in rows:
+            ext = file_key.rsplit(".", 1)[-1] if "." in file_key else "bin"
+            name = f"fichiers/{values[slug_index]}.{ext}"
+            entries.append((name, file_key, values[created_index]))
+            writer.writerow([_format_csv_value(v) for v in values] + [name])
+        manifest.write(output.getvalue().encode("utf-8"))
+        position = (values[created_index], values[id_index])
+
+        for entry in entries:
+            yield entry
+        if len(rows) < CSV_BATCH_SIZE:
+            return
+
+
+async def _iter_archives_zip(query):
+    with tempfile.SpooledTemporaryFile(max_size=ZIP_MANIFEST_SPOOL_BYTES) as manifest:
+
+        def _manifest():
+            manifest.seek(0)
+            return "metadata.csv", manifest
+
+        async for chunk in iter_zip(_iter_zip_entries(query, manifest), _manifest):
+            yield chunk
+
+
+@router.get("/download/zip")
+async def download_archives_zip(
+    ids: Optional[list[uuid.UUID]] = Query(None),
+    media_type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    territory_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_from_token_param),
+):
+    """Télécharger les fichiers originaux sélectionnés dans un ZIP64 streamé.
+
+    Accepte soit une liste d'`ids`, soit les mêmes filtres que la liste paginée.
+    Les lignes sont lues par lots ; le manifeste `metadata.csv`, construit au
+    fil des entrées, est la dernière entrée du ZIP.
+    """
+    columns = [getattr(Archive, field) for field, _ in CSV_COLUMNS]
+    query = apply_archive_filters(
+        select(Archive.file_key, *columns),
+        current_user, media_type, status_filter, territory_id,
+    )
+    if ids:
+        query = query.where(Archive.id.in_(ids))
+    if (await db.execute(query.with_only_columns(Archive.id).limit(1))).first() is None:
+        raise HTTPException(status_code=404, detail="Aucune archive à télécharger")
+
+    return StreamingResponse(
+        _iter_archives_zip(query),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=archives.zip"},
+    )
+
 
-    # Lignes
-    for archive in archives:
-        row = [
-            _format_csv_value(getattr(archive, field, None))
-            for field, _ in CSV_COLUMNS
+# ── Bundle hors ligne (synchronisation terrain) ───
+
+@router.get("/bundle", response_model=BundleResponse)
+async def get_offline_bundle(
+    territory_id: Optional[uuid.UUID] = None,
+    media_type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    since: Optional[str] = Query(None, description="Version d'un bundle précédent (delta)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Préparer un bundle hors ligne (métadonnées + mini-thumbnails) pour un territoire ou un filtre.
+
+    La version est une position du journal des modifications (ordre des commits,
+    comme le flux de changements). Avec `since`, seules les archives journalisées
+    entre cette version et la nouvelle sont incluses ; le manifeste liste toujours
+    tous les identifiants encore visibles pour que le client supprime localement
+    ceux qui ont disparu (suppression, masquage).
+
+    Bundle déjà construit : 200 et `ready=true`. Sinon 202 : la construction part
+    en tâche de fond (une seule par empreinte) et le client consulte
+    `download_url` jusqu'à obtenir le ZIP.
+    """
+    since_position = None
+    if since and not since.isdigit():
+        try:
+            since_position = decode_cursor(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Version de bundle invalide")
+    elif since:
+        # Ancien format (horodatage) : bundle complet, le client repart de la nouvelle version
+        since = None
+
+    def _filtered(query):
+        return apply_archive_filters(query, current_user, media_type, status_filter, territory_id)
+
+    position = await stable_change_cursor(db)
+    version = encode_cursor(*position)
+    count = (await db.execute(_filtered(select(func.count(Archive.id))))).scalar()
+
+    delta_query = _filtered(select(Archive).options(lazyload("*")))
+    if since_position is not None:
+        cursor = tuple_(ArchiveChange.txid, ArchiveChange.seq)
+        delta_query = delta_query.where(
+            Archive.id.in_(
+                select(ArchiveChange.archive_id).where(cursor > since_position, cursor <= position)
+            )
+        )
+    delta_count = (
+        await db.execute(select(func.count()).select_from(delta_query.subquery()))
+    ).scalar()
+
+    filters = {
+        "territory_id": str(territory_id) if territory_id else None,
+        "media_type": media_type,
+        "status": status_filter,
+    }
+    scope = "all" if current_user.role in ("admin", "editor") else str(current_user.id)
+    digest = bundle_digest(filters, scope, since, version, count)
+
+    response = BundleResponse(
+        version=version,
+        since=since,
+        archive_count=delta_count,
+        ready=await bundle_exists(digest),
+        download_url=f"/api/v1/archives/bundle/{digest}",
+    )
+    if response.ready:
+        return response
+
+    async def _collect():
+        # Session propre, fermée avant le téléchargement des thumbnails
+        async with read_session() as session:
+            archives = (
+                await session.execute(delta_query.order_by(Archive.created_at.desc()))
+            ).scalars().all()
+            all_ids = (await session.execute(_filtered(select(Archive.id)))).scalars().all()
+            territory_ids = {a.territory_id for a in archives if a.territory_id}
+            territories = []
+            if territory_ids:
+                territories = (
+                    await session.execute(
+                        select(Territory).options(lazyload("*")).where(Territory.id.in_(territory_ids))
+                    )
+                ).scalars().all()
+
+            manifest = {
+                "version": version,
+                "since": since,
+                "filters": filters,
+                "archives": [enrich_archive_response(a).model_dump(mode="json") for a in archives],
+                "territories": [
+                    TerritoryResponse.model_validate(t).model_dump(mode="json") for t in territories
+                ],
+                "ids": [str(i) for i in all_ids],
+            }
+        thumb_sources = [
+            (str(a.id), a.thumbnail_key or a.file_key)
+            for a in archives
+            if a.thumbnail_key or (a.media_type == "image" and a.file_key)
         ]
-        writer.writerow(row)
+        return manifest, thumb_sources
+
+    enqueue_bundle(digest, _collect)
+    return JSONResponse(
+        response.model_dump(mode="json"),
+        status_code=202,
+        headers={"Retry-After": str(BUNDLE_RETRY_AFTER_SECONDS)},
+    )
 
-    csv_bytes = output.getvalue().encode("utf-8-sig")
 
+@router.get("/bundle/{digest}")
+async def download_offline_bundle(
+    request: Request,
+    digest: str,
+    current_user: User = Depends(get_current_user_from_token_param),
+):
+    """Télécharger un bundle (reprise possible via l'en-tête Range).
+
+    202 tant que le bundle est en préparation sur ce serveur.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", digest):
+        raise HTTPException(status_code=404, detail="Bundle non trouvé")
+    if bundle_building(digest):
+        return JSONResponse(
+            {"detail": "Bundle en préparation"},
+            status_code=202,
+            headers={"Retry-After": str(BUNDLE_RETRY_AFTER_SECONDS)},
+        )
+
+    range_header = request.headers.get("range")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{digest}"',
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Content-Disposition": f"attachment; filename=bundle-{digest[:8]}.zip",
+    }
+    try:
+        s3_object = get_file_object(bundle_key(digest), range_header=range_header)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Bundle non trouvé dans le stockage")
+
+    headers["Content-Length"] = str(s3_object.get("ContentLength", ""))
+    if range_header:
+        headers["Content-Range"] = s3_object.get("ContentRange", "")
     return StreamingResponse(
-        io.BytesIO(csv_bytes),
-        media_type="text/csv; charset=utf-8",
-        headers={
-            "Content-Disposition": "attachment; filename=archives-metadonnees.csv",
-            "Content-Length": str(len(csv_bytes)),
-        },
+        s3_object["Body"],
+        status_code=206 if range_header else 200,
+        media_type="application/zip",
+        headers=headers,
+    )
+
+
+# ── Planche contact (sprite de thumbnails) ───────
+
+@router.get("/sprite", response_model=SpriteResponse)
+async def get_thumbnail_sprite(
+    ids: Optional[list[uuid.UUID]] = Query(None, max_length=100),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    media_type: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    territory_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Composer les thumbnails d'une page en une seule image + table des offsets.
+
+    Accepte soit une liste d'`ids`, soit les mêmes filtres que la liste paginée.
+    """
+    query = apply_archive_filters(
+        select(Archive.id, Archive.thumbnail_key, Archive.file_key, Archive.media_type),
+        current_user, media_type, status_filter, territory_id,
+    )
+    if ids:
+        query = query.where(Archive.id.in_(ids))
+    else:
+        query = query.order_by(Archive.created_at.desc())
+        query = query.offset((page - 1) * page_size).limit(page_size)
+    rows = (await db.execute(query)).all()
+
+    entries = []
+    for archive_id, thumbnail_key, file_key, archive_media_type in rows:
+        key = thumbnail_key or (file_key if archive_media_type == "image" else None)
+        if key:
+            entries.append((str(archive_id), key))
+    if ids:
+        # Respecter l'ordre demandé par le client
+        order = {str(i): n for n, i in enumerate(ids)}
+        entries.sort(key=lambda e: order.get(e[0], len(order)))
+
+    if not entries:
+        raise HTTPException(status_code=404, detail="Aucun thumbnail disponible")
+
+    digest = await ensure_sprite(entries)
+    columns, rows_count = sprite_layout(len(entries))
+    items = [
+        SpriteTile(
+            archive_id=archive_id,
+            x=(n % columns) * TILE_WIDTH,
+            y=(n // columns) * TILE_HEIGHT,
+        )
+        for n, (archive_id, _) in enumerate(entries)
+    ]
+    return SpriteResponse(
+        sprite_url=f"/api/v1/archives/sprite/{digest}",
+        width=columns * TILE_WIDTH,
+        height=rows_count * TILE_HEIGHT,
+        tile_width=TILE_WIDTH,
+        tile_height=TILE_HEIGHT,
+        items=items,
+    )
+
+
+@router.get("/sprite/{digest}")
+async def stream_sprite(
+    digest: str,
+    current_user: User = Depends(get_current_user_from_token_param),
+):
+    """Streamer une planche contact (immuable : adressée par son empreinte)."""
+    if not re.fullmatch(r"[0-9a-f]{32}", digest):
+        raise HTTPException(status_code=404, detail="Planche non trouvée")
+    try:
+        s3_object = get_file_object(sprite_key(digest))
+    except Exception:
+        raise HTTPException(status_code=404, detail="Planche non trouvée dans le stockage")
+
+    return StreamingResponse(
+        s3_object["Body"],
+        media_type="image/jpeg",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
     )
 
 
 # ── Récupérer une archive ────────────────────────
 
-@router.get("/{archive_id}", response_model=ArchiveResponse)
+@router.get("/{archive_id}", response_model=ArchiveResponse, dependencies=[query_budget(7)])
 async def get_archive(
     archive_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Récupérer une archive par son ID."""
@@ -348,7 +655,7 @@ async def update_archive(
     archive_id: uuid.UUID,
     data: ArchiveUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_rw),
 ):
     """Mettre à jour les métadonnées d'une archive."""
     result = await db.execute(select(Archive).where(Archive.id == archive_id))
@@ -366,17 +673,101 @@ async def update_archive(
         setattr(archive, field, value)
 
     await db.flush()
+    await record_archive_change(db, archive.id, change_op_for_update(update_data))
     await db.refresh(archive)
     return enrich_archive_response(archive)
 
 
+# ── Mise à jour groupée ──────────────────────────
+
+def _bulk_tags_expression(add_tags: list[str] | None, remove_tags: list[str] | None):
+    """Expression SQL ajoutant/retirant des tags sans doublons, en conservant l'ordre."""
+    source = "coalesce(tags, '{}'::varchar[])"
+    params = []
+    if add_tags:
+        source = f"({source} || :add_tags)"
+        params.append(bindparam("add_tags", add_tags, type_=ARRAY(String)))
+    where = ""
+    if remove_tags:
+        where = "WHERE t <> ALL(:remove_tags)"
+        params.append(bindparam("remove_tags", remove_tags, type_=ARRAY(String)))
+    return text(
+        f"ARRAY(SELECT t FROM unnest({source}) WITH ORDINALITY AS u(t, n) "
+        f"{where} GROUP BY t ORDER BY min(n))"
+    ).bindparams(*params)
+
+
+@router.post("/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_archives(
+    data: BulkArchiveUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_rw),
+):
+    """Appliquer tags, statut, niveau d'accès ou territoire à un lot d'archives.
+
+    Mêmes règles que la mise à jour unitaire (auteur, admin ou éditeur), mais en
+    requêtes ensemblistes : une sélection des cibles puis un seul UPDATE.
+    """
+    if data.ids is None and data.filters is None:
+        raise HTTPException(status_code=400, detail="Préciser des identifiants ou des filtres")
+
+    values = {}
+    if data.add_tags or data.remove_tags:
+        values["tags"] = _bulk_tags_expression(data.add_tags, data.remove_tags)
+    for field in ("status", "access_level", "territory_id"):
+        if field in data.model_fields_set and (field == "territory_id" or getattr(data, field)):
+            values[field] = getattr(data, field)
+    if not values:
+        raise HTTPException(status_code=400, detail="Aucune modification demandée")
+
+    filters = data.filters
+    query = apply_archive_filters(
+        select(Archive.id, Archive.author_id),
+        current_user,
+        filters.media_type if filters else None,
+        filters.status if filters else None,
+        filters.territory_id if filters else None,
+    )
+    if data.ids is not None:
+        query = query.where(Archive.id.in_(data.ids))
+    candidates = (await db.execute(query)).all()
+
+    is_curator = current_user.role in ("admin", "editor")
+    allowed = [i for i, author_id in candidates if is_curator or author_id == current_user.id]
+    results = {i: "forbidden" for i, _ in candidates}
+
+    if allowed:
+        updated = await db.execute(
+            update(Archive)
+            # = ANY(tableau) : un seul paramètre, quel que soit le nombre de cibles
+            .where(Archive.id == any_(bindparam("allowed", allowed, type_=ARRAY(PG_UUID(as_uuid=True)))))
+            .values(**values)
+            .returning(Archive.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated_ids = updated.scalars().all()
+        results.update({i: "updated" for i in updated_ids})
+        await record_archive_changes(db, updated_ids, change_op_for_update(values))
+
+    if data.ids is not None:
+        # Ids demandés mais invisibles ou inexistants
+        for archive_id in data.ids:
+            results.setdefault(archive_id, "not_found")
+
+    outcomes = [BulkOutcome(id=i, outcome=o) for i, o in results.items()]
+    return BulkUpdateResponse(
+        updated=sum(1 for o in outcomes if o.outcome == "updated"),
+        results=outcomes,
+    )
+
+
 # ── Supprimer une archive ────────────────────────
 
 @router.delete("/{archive_id}", status_code=204)
 async def delete_archive(
     archive_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_rw),
 ):
     """Supprimer une archive."""
     result = await db.execute(select(Archive).where(Archive.id == archive_id))
@@ -389,18 +780,19 @@ async def delete_archive(
         raise HTTPException(status_code=403, detail="Suppression non autorisée")
 
     await db.delete(archive)
+    await record_archive_change(db, archive.id, "delete")
 
 
 # ── Recherche full-text ───────────────────────────
 
-@router.get("/search/", response_model=ArchiveListResponse)
+@router.get("/search/", response_model=ArchiveListResponse, dependencies=[query_budget(8)])
 async def search_archives(
     q: str = Query(..., min_length=2),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     media_type: Optional[str] = None,
     territory_id: Optional[uuid.UUID] = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Recherche full-text dans les archives."""
@@ -447,7 +839,7 @@ async def search_archives(
 async def stream_media(
     request: Request,
     archive_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_from_token_param),
 ):
     """Streamer le fichier média avec support Range requests."""
@@ -495,7 +887,7 @@ async def stream_media(
 @router.get("/{archive_id}/thumbnail")
 async def stream_thumbnail(
     archive_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user_from_token_param),
 ):
     """Streamer le thumbnail d'une archive via le backend."""
@@ -3,11 +3,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import (
-    hash_password, verify_password,
+    hash_password_async, verify_password_async,
     create_access_token, create_refresh_token, create_reset_token,
-    decode_token, get_current_user, require_admin,
+    decode_token, get_current_user, require_admin, require_admin_rw,
 )
 from app.models.user import User
 from app.schemas.schemas import (
@@ -32,7 +32,7 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
 
     user = User(
         email=data.email,
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password_async(data.password),
         full_name=data.full_name,
         organization=data.organization,
         language=data.language,
@@ -50,7 +50,7 @@ async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await verify_password_async(data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
@@ -148,7 +148,7 @@ async def reset_password(data: ResetPasswordRequest, db: AsyncSession = Depends(
             detail="Utilisateur non trouvé",
         )
 
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     await db.flush()
 
     return {"message": "Mot de passe réinitialisé avec succès."}
@@ -158,7 +158,7 @@ async def reset_password(data: ResetPasswordRequest, db: AsyncSession = Depends(
 async def admin_reset_password(
     data: AdminResetPasswordRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: User = Depends(require_admin_rw),
 ):
     """Réinitialiser le mot de passe d'un utilisateur (admin uniquement)."""
     result = await db.execute(select(User).where(User.id == data.user_id))
@@ -170,7 +170,7 @@ async def admin_reset_password(
             detail="Utilisateur non trouvé",
         )
 
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     await db.flush()
 
     return {"message": f"Mot de passe de {user.full_name} réinitialisé."}
@@ -178,7 +178,7 @@ async def admin_reset_password(
 
 @router.get("/admin/users", response_model=list[UserResponse])
 async def list_users(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin),
 ):
     """Lister tous les utilisateurs (admin uniquement)."""
@@ -0,0 +1,75 @@
+"""Routes du flux de changements (synchronisation incrémentale des partenaires)."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import lazyload
+from app.core.database import get_db
+from app.core.security import get_current_user_rw
+from app.core.instrumentation import query_budget
+from app.api.archives import enrich_archive_response
+from app.services.archive_filters import apply_archive_filters
+from app.models.user import User
+from app.models.archive import Archive
+from app.models.archive_change import ArchiveChange
+from app.services.changes import encode_cursor, decode_cursor
+from app.schemas.schemas import ChangeFeedResponse, ArchiveChangeResponse
+
+router = APIRouter(prefix="/archives/changes", tags=["Flux de changements"])
+
+
+@router.get("", response_model=ChangeFeedResponse, dependencies=[query_budget(4)])
+async def list_changes(
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_rw),
+):
+    """Retourner les créations, modifications, suppressions et changements de visibilité
+    depuis un curseur opaque (sans curseur : depuis le début du journal).
+
+    Chaque entrée porte l'état courant de l'archive si elle est visible pour
+    l'appelant, sinon `archive: null` (le miroir doit la retirer).
+    """
+    # Seules les transactions terminées sont publiées : une écriture encore en cours
+    # avec un txid plus petit ne peut donc jamais apparaître derrière le curseur.
+    xmin = func.txid_snapshot_xmin(func.txid_current_snapshot())
+    query = select(ArchiveChange).where(ArchiveChange.txid < xmin)
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+        query = query.where(tuple_(ArchiveChange.txid, ArchiveChange.seq) > position)
+    query = query.order_by(ArchiveChange.txid, ArchiveChange.seq).limit(limit + 1)
+
+    changes = (await db.execute(query)).scalars().all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # État courant des archives concernées, avec les règles de visibilité habituelles
+    archive_ids = {c.archive_id for c in changes}
+    visible = {}
+    if archive_ids:
+        result = await db.execute(
+            apply_archive_filters(select(Archive).options(lazyload("*")), current_user)
+            .where(Archive.id.in_(archive_ids))
+        )
+        visible = {a.id: enrich_archive_response(a) for a in result.scalars().all()}
+
+    items = [
+        ArchiveChangeResponse(
+            archive_id=c.archive_id,
+            op=c.op,
+            changed_at=c.changed_at,
+            archive=visible.get(c.archive_id),
+        )
+        for c in changes
+    ]
+    if changes:
+        next_cursor = encode_cursor(changes[-1].txid, changes[-1].seq)
+    else:
+        next_cursor = cursor
+
+    return ChangeFeedResponse(items=items, next_cursor=next_cursor, has_more=has_more)
@@ -0,0 +1,111 @@
+"""Routes de diagnostic réservées aux administrateurs."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.core.config import get_settings
+from app.core.loop_monitor import recent_stalls
+from app.core.profiler import MAX_PROCESS_PROFILE_SECONDS, list_profiles, profile_path, start_process_profile
+from app.core.tracing import recent_traces, trace_detail
+from app.core.security import require_admin
+from app.core.slow_queries import clear_slow_queries, slow_queries
+from app.models.user import User
+from app.schemas.schemas import (
+    LoopStallListResponse, ProfileResponse, SlowQueryListResponse,
+    TraceResponse, TraceSummaryResponse,
+)
+
+router = APIRouter(prefix="/admin/diagnostics", tags=["Diagnostic"])
+settings = get_settings()
+
+
+# ── Requêtes lentes ──────────────────────────────
+
+@router.get("/slow-queries", response_model=SlowQueryListResponse)
+async def list_slow_queries(
+    fingerprint: str | None = Query(None, description="Filtrer sur une requête normalisée"),
+    limit: int = Query(50, ge=1, le=500),
+    _admin: User = Depends(require_admin),
+):
+    """Dernières requêtes SQL lentes de ce processus, avec leur plan s'il a été capturé."""
+    items = slow_queries()
+    if fingerprint:
+        items = [item for item in items if item["fingerprint"] == fingerprint]
+    return {"threshold_ms": settings.slow_query_ms, "items": items[:limit]}
+
+
+@router.delete("/slow-queries", status_code=204)
+async def reset_slow_queries(_admin: User = Depends(require_admin)):
+    """Vider le tampon (par exemple après un correctif d'index)."""
+    clear_slow_queries()
+
+
+# ── Blocages de la boucle asyncio ────────────────
+
+@router.get("/loop-stalls", response_model=LoopStallListResponse)
+async def list_loop_stalls(
+    route: str | None = Query(None, description="Filtrer sur un gabarit de route"),
+    limit: int = Query(50, ge=1, le=100),
+    _admin: User = Depends(require_admin),
+):
+    """Derniers blocages de la boucle de ce processus, avec la pile du code fautif."""
+    items = recent_stalls()
+    if route:
+        items = [item for item in items if item["route"] == route]
+    return {"threshold_ms": settings.loop_stall_ms, "items": items[:limit]}
+
+
+# ── Profils d'échantillonnage ────────────────────
+
+@router.post("/profiles", response_model=ProfileResponse, status_code=202)
+async def start_profile(
+    seconds: float = Query(30, gt=0, le=MAX_PROCESS_PROFILE_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=100),
+    _admin: User = Depends(require_admin),
+):
+    """Profiler tout le processus pendant `seconds` (toutes les requêtes et threads)."""
+    entry = start_process_profile(seconds, interval_ms / 1000)
+    if entry is None:
+        raise HTTPException(status_code=409, detail="Un profil du processus est déjà en cours")
+    return entry
+
+
+@router.get("/profiles", response_model=list[ProfileResponse])
+async def get_profiles(_admin: User = Depends(require_admin)):
+    """Profils de ce processus (par requête et processus entier)."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, _admin: User = Depends(require_admin)):
+    """Télécharger un profil au format speedscope (ouvrir sur https://speedscope.app)."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+# ── Traces ───────────────────────────────────────
+
+@router.get("/traces", response_model=list[TraceSummaryResponse])
+async def list_traces(
+    name: str | None = Query(None, description="Filtrer sur le span racine, ex. « POST /api/v1/archives/ »"),
+    min_duration_ms: float = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    _admin: User = Depends(require_admin),
+):
+    """Traces récentes de ce processus, les plus récentes d'abord."""
+    items = [
+        item for item in recent_traces()
+        if item["duration_ms"] >= min_duration_ms and (not name or item["name"] == name)
+    ]
+    return items[:limit]
+
+
+@router.get("/traces/{trace_id}", response_model=TraceResponse)
+async def get_trace(trace_id: str, _admin: User = Depends(require_admin)):
+    """Spans d'une trace (en-tête X-Trace-Id d'une réponse) et temps cumulé par étape."""
+    detail = trace_detail(trace_id)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Trace non trouvée")
+    return detail
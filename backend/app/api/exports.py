@@ -0,0 +1,116 @@
+"""Routes pour les exports asynchrones du catalogue (JSONL / Parquet)."""
+
+import uuid
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.database import get_db, get_read_db
+from app.core.security import get_current_user, get_current_user_rw, get_current_user_from_token_param
+from app.core.storage_dispatch import get_file_object
+from app.models.user import User
+from app.models.export_job import ExportJob
+from app.services.exports import (
+    EXPORT_FORMATS, catalog_version, export_fingerprint, enqueue_export, reusable_job_filter,
+)
+from app.schemas.schemas import ExportJobCreate, ExportJobResponse
+
+router = APIRouter(prefix="/archives/exports", tags=["Exports"])
+
+
+def enrich_export_response(job: ExportJob) -> ExportJobResponse:
+    response = ExportJobResponse.model_validate(job)
+    if job.status == "done" and job.file_key:
+        response.download_url = f"/api/v1/archives/exports/{job.id}/download"
+    return response
+
+
+async def _get_visible_job(db: AsyncSession, job_id: uuid.UUID, user: User) -> ExportJob:
+    result = await db.execute(select(ExportJob).where(ExportJob.id == job_id))
+    job = result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export non trouvé")
+    if job.requested_by != user.id and user.role not in ("admin", "editor"):
+        raise HTTPException(status_code=403, detail="Accès non autorisé")
+    return job
+
+
+@router.post("", response_model=ExportJobResponse, status_code=202)
+async def create_export(
+    data: ExportJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_rw),
+):
+    """Demander un export du catalogue (réutilise un export identique encore à jour)."""
+    filters = data.model_dump(mode="json", exclude={"format"}, exclude_none=True)
+    fingerprint = export_fingerprint(
+        data.format, filters, current_user, await catalog_version(db)
+    )
+
+    result = await db.execute(
+        select(ExportJob)
+        .where(
+            ExportJob.fingerprint == fingerprint,
+            reusable_job_filter(),
+        )
+        .order_by(ExportJob.created_at.desc())
+        .limit(1)
+    )
+    existing = result.scalar_one_or_none()
+    if existing:
+        return JSONResponse(
+            enrich_export_response(existing).model_dump(mode="json"), status_code=200
+        )
+
+    job = ExportJob(
+        format=data.format,
+        filters=filters,
+        fingerprint=fingerprint,
+        status="pending",
+        requested_by=current_user.id,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    # Le job doit être visible par le worker : commit avant de le planifier
+    await db.commit()
+    enqueue_export(job.id)
+
+    return enrich_export_response(job)
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Consulter le statut d'un export."""
+    return enrich_export_response(await _get_visible_job(db, job_id, current_user))
+
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user_from_token_param),
+):
+    """Télécharger le fichier d'un export terminé."""
+    job = await _get_visible_job(db, job_id, current_user)
+    if job.status != "done" or not job.file_key:
+        raise HTTPException(status_code=409, detail="Export pas encore disponible")
+
+    try:
+        s3_object = get_file_object(job.file_key)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Fichier d'export non trouvé dans le stockage")
+
+    extension, content_type = EXPORT_FORMATS[job.format]
+    return StreamingResponse(
+        s3_object["Body"],
+        media_type=content_type,
+        headers={
+            "Content-Length": str(s3_object.get("ContentLength", "")),
+            "Content-Disposition": f"attachment; filename=archives-{job.id}.{extension}",
+        },
+    )
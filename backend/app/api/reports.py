@@ -1,19 +1,67 @@
 """Routes pour la modération – signalements de contenu."""
 
+import base64
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.core.database import get_db
-from app.core.security import get_current_user, require_admin
+from sqlalchemy import select, func, update, bindparam, any_, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, aggregate_order_by
+from app.core.database import get_db, get_read_db
+from app.core.security import require_admin, get_current_user_rw, require_admin_rw
+from app.core.instrumentation import query_budget
 from app.models.user import User
 from app.models.archive import Archive
 from app.models.report import Report
-from app.schemas.schemas import ReportCreate, ReportResponse, ReportListResponse
+from app.services.changes import record_archive_changes
+from app.schemas.schemas import (
+    ReportCreate, ReportResponse, ReportListResponse,
+    ModerationQueueItem, ModerationQueueResponse,
+    BulkReportDismiss, BulkArchiveHide, BulkModerationResponse,
+)
 
 router = APIRouter(tags=["Modération"])
 
 
+def _uuid_array(name: str, values):
+    """Paramètre tableau unique pour `= ANY(...)` (évite un IN à N paramètres)."""
+    return any_(bindparam(name, list(values), type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+def _encode_queue_cursor(last_reported_at: datetime, archive_id: uuid.UUID) -> str:
+    raw = f"{last_reported_at.isoformat()}|{archive_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_queue_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    timestamp, archive_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    return datetime.fromisoformat(timestamp), uuid.UUID(archive_id)
+
+
+async def _hide_archives(db: AsyncSession, archive_ids) -> list[uuid.UUID]:
+    """Repasser des archives en brouillon et lever leurs signalements (deux UPDATE)."""
+    hidden = (
+        await db.execute(
+            update(Archive)
+            .where(Archive.id == _uuid_array("archive_ids", archive_ids))
+            .values(status="draft")
+            .returning(Archive.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalars().all()
+    if hidden:
+        await db.execute(
+            update(Report)
+            .where(Report.archive_id == _uuid_array("hidden_ids", hidden), Report.status == "pending")
+            .values(status="dismissed")
+            .execution_options(synchronize_session=False)
+        )
+        await record_archive_changes(db, hidden, "visibility")
+    return hidden
+
+
 # ── Signaler une archive ─────────────────────────
 
 @router.post("/archives/{archive_id}/report", response_model=ReportResponse, status_code=201)
@@ -21,7 +69,7 @@ async def report_archive(
     archive_id: uuid.UUID,
     data: ReportCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_rw),
 ):
     """Signaler un contenu inapproprié."""
     # Vérifier que l'archive existe
@@ -68,35 +116,140 @@ async def report_archive(
 @router.get("/admin/reports", response_model=ReportListResponse)
 async def list_reports(
     status_filter: str = "pending",
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_admin),
 ):
     """Lister les signalements (admin uniquement)."""
-    query = select(Report)
+    # Colonnes + jointures : pas de chargement selectin des archives et des auteurs
+    query = (
+        select(
+            Report.id, Report.archive_id, Report.reporter_id, Report.reason,
+            Report.status, Report.created_at,
+            Archive.title.label("archive_title"),
+            User.full_name.label("reporter_name"),
+        )
+        .outerjoin(Archive, Archive.id == Report.archive_id)
+        .outerjoin(User, User.id == Report.reporter_id)
+    )
+    count_query = select(func.count(Report.id))
     if status_filter:
         query = query.where(Report.status == status_filter)
-    query = query.order_by(Report.created_at.desc())
+        count_query = count_query.where(Report.status == status_filter)
+    query = query.order_by(Report.created_at.desc()).limit(limit).offset(offset)
 
-    count_query = select(func.count()).select_from(query.subquery())
     total = (await db.execute(count_query)).scalar()
+    rows = (await db.execute(query)).mappings().all()
 
-    result = await db.execute(query)
-    reports = result.scalars().all()
+    return ReportListResponse(items=[ReportResponse(**row) for row in rows], total=total)
 
-    items = []
-    for r in reports:
-        items.append(ReportResponse(
-            id=r.id,
-            archive_id=r.archive_id,
-            reporter_id=r.reporter_id,
-            reason=r.reason,
-            status=r.status,
-            created_at=r.created_at,
-            archive_title=r.archive.title if r.archive else None,
-            reporter_name=r.reporter.full_name if r.reporter else None,
-        ))
 
-    return ReportListResponse(items=items, total=total)
+# ── Admin : file de modération (une ligne par archive) ─
+
+@router.get("/admin/reports/queue", response_model=ModerationQueueResponse, dependencies=[query_budget(4)])
+async def moderation_queue(
+    status_filter: str = "pending",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_admin),
+):
+    """File de modération groupée par archive, paginée par curseur (keyset).
+
+    Tri : dernier signalement le plus récent d'abord.
+    """
+    grouped = (
+        select(
+            Report.archive_id,
+            func.count(Report.id).label("report_count"),
+            func.min(Report.created_at).label("first_reported_at"),
+            func.max(Report.created_at).label("last_reported_at"),
+            func.array_agg(
+                aggregate_order_by(Report.reason, Report.created_at.desc())
+            )[1].label("latest_reason"),
+        )
+        .where(Report.status == status_filter)
+        .group_by(Report.archive_id)
+        .subquery()
+    )
+
+    query = (
+        select(
+            grouped,
+            Archive.title.label("archive_title"),
+            Archive.status.label("archive_status"),
+        )
+        .join(Archive, Archive.id == grouped.c.archive_id)
+    )
+    if cursor:
+        try:
+            position = _decode_queue_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+        query = query.where(
+            tuple_(grouped.c.last_reported_at, grouped.c.archive_id) < position
+        )
+    query = query.order_by(
+        grouped.c.last_reported_at.desc(), grouped.c.archive_id.desc()
+    ).limit(limit + 1)
+
+    rows = (await db.execute(query)).mappings().all()
+    total = (
+        await db.execute(
+            select(func.count(func.distinct(Report.archive_id))).where(Report.status == status_filter)
+        )
+    ).scalar()
+
+    items = [ModerationQueueItem(**row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = _encode_queue_cursor(last.last_reported_at, last.archive_id)
+
+    return ModerationQueueResponse(items=items, total=total, next_cursor=next_cursor)
+
+
+# ── Admin : actions groupées ─────────────────────
+
+@router.post("/admin/reports/bulk-dismiss", response_model=BulkModerationResponse)
+async def bulk_dismiss_reports(
+    data: BulkReportDismiss,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin_rw),
+):
+    """Lever en une requête les signalements en attente (par archive et/ou par id)."""
+    if not data.archive_ids and not data.report_ids:
+        raise HTTPException(status_code=400, detail="Préciser des archives ou des signalements")
+
+    target = []
+    if data.archive_ids:
+        target.append(Report.archive_id == _uuid_array("archive_ids", data.archive_ids))
+    if data.report_ids:
+        target.append(Report.id == _uuid_array("report_ids", data.report_ids))
+    condition = target[0] if len(target) == 1 else (target[0] | target[1])
+
+    dismissed = (
+        await db.execute(
+            update(Report)
+            .where(condition, Report.status == "pending")
+            .values(status="dismissed")
+            .returning(Report.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalars().all()
+    return BulkModerationResponse(count=len(dismissed), ids=dismissed)
+
+
+@router.post("/admin/archives/bulk-hide", response_model=BulkModerationResponse)
+async def bulk_hide_archives(
+    data: BulkArchiveHide,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin_rw),
+):
+    """Masquer plusieurs archives signalées et lever leurs signalements."""
+    hidden = await _hide_archives(db, data.archive_ids)
+    return BulkModerationResponse(count=len(hidden), ids=hidden)
 
 
 # ── Admin : lever un signalement ─────────────────
@@ -105,7 +258,7 @@ async def list_reports(
 async def dismiss_report(
     report_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: User = Depends(require_admin_rw),
 ):
     """Lever un signalement (admin uniquement)."""
     result = await db.execute(select(Report).where(Report.id == report_id))
@@ -124,21 +277,10 @@ async def dismiss_report(
 async def hide_archive(
     archive_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: User = Depends(require_admin_rw),
 ):
     """Masquer une archive signalée (admin uniquement)."""
-    result = await db.execute(select(Archive).where(Archive.id == archive_id))
-    archive = result.scalar_one_or_none()
-    if not archive:
+    hidden = await _hide_archives(db, [archive_id])
+    if not hidden:
         raise HTTPException(status_code=404, detail="Archive non trouvée")
-
-    archive.status = "draft"
-    # Lever tous les signalements associés
-    reports_result = await db.execute(
-        select(Report).where(Report.archive_id == archive_id, Report.status == "pending")
-    )
-    for r in reports_result.scalars().all():
-        r.status = "dismissed"
-
-    await db.flush()
-    return {"status": "hidden", "id": str(archive.id)}
+    return {"status": "hidden", "id": str(archive_id)}
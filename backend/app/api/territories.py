@@ -1,16 +1,28 @@
 """Routes pour la gestion des territoires."""
 
+import json
+import math
 import re
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.core.database import get_db
-from app.core.security import get_current_user, require_admin
+from sqlalchemy import select
+from app.core.database import get_db, get_read_db
+from app.core.security import get_current_user, require_admin_rw
+from app.core.instrumentation import query_budget
 from app.models.territory import Territory
-from app.models.archive import Archive
 from app.models.user import User
-from app.schemas.schemas import TerritoryCreate, TerritoryResponse, TerritoryWithStatsResponse
+from app.schemas.schemas import (
+    TerritoryCreate, TerritoryResponse, TerritoryWithStatsResponse, MapFeatureCollection,
+)
+from app.services.map_clusters import cluster_index
+from app.services.territory_stats import (
+    etag_for,
+    invalidate_territory_catalog,
+    territory_catalog,
+    territory_stats,
+)
 
 router = APIRouter(prefix="/territories", tags=["Territoires"])
 
@@ -22,11 +34,19 @@ def slugify(text: str) -> str:
     return slug
 
 
+def _json_with_etag(request: Request, body: bytes, etag: str) -> Response:
+    """Réponse JSON revalidable : 304 si le client possède déjà cette version."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/", response_model=TerritoryResponse, status_code=201)
 async def create_territory(
     data: TerritoryCreate,
     db: AsyncSession = Depends(get_db),
-    _admin: User = Depends(require_admin),
+    _admin: User = Depends(require_admin_rw),
 ):
     """Créer un nouveau territoire (admin uniquement)."""
     territory = Territory(
@@ -43,50 +63,68 @@ async def create_territory(
     db.add(territory)
     await db.flush()
     await db.refresh(territory)
+    invalidate_territory_catalog()
     return territory
 
 
-@router.get("/stats", response_model=list[TerritoryWithStatsResponse])
+@router.get("/stats", response_model=list[TerritoryWithStatsResponse], dependencies=[query_budget(5)])
 async def list_territories_with_stats(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     _user: User = Depends(get_current_user),
 ):
-    """Lister les territoires avec le nombre d'archives associées."""
-    query = (
-        select(
-            Territory,
-            func.count(Archive.id).label("archive_count"),
-        )
-        .outerjoin(Archive, Archive.territory_id == Territory.id)
-        .group_by(Territory.id)
-        .order_by(Territory.name)
-    )
-    result = await db.execute(query)
-    rows = result.all()
+    """Lister les territoires avec le nombre d'archives associées (par type et par statut)."""
+    territories = await territory_stats(db)
+    body = json.dumps(territories, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _json_with_etag(request, body, etag_for(body))
 
-    territories = []
-    for territory, count in rows:
-        data = TerritoryWithStatsResponse.model_validate(territory)
-        data.archive_count = count
-        territories.append(data)
 
-    return territories
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """Lire `ouest,sud,est,nord` ; les longitudes sont ramenées dans [-180, 180]."""
+    west, south, east, north = (float(v) for v in bbox.split(","))
+    if not all(map(math.isfinite, (west, south, east, north))) or south > north:
+        raise ValueError(bbox)
+    if east - west >= 360:
+        return -180.0, south, 180.0, north
+    wrap = lambda lng: ((lng + 180.0) % 360.0) - 180.0  # noqa: E731
+    return wrap(west), south, wrap(east), north
 
 
-@router.get("/", response_model=list[TerritoryResponse])
+@router.get("/map", response_model=MapFeatureCollection, dependencies=[query_budget(6)])
+async def get_territory_map(
+    request: Request,
+    zoom: int = Query(ge=0, le=22),
+    bbox: str = Query("-180,-85,180,85", description="ouest,sud,est,nord"),
+    db: AsyncSession = Depends(get_read_db),
+    _user: User = Depends(get_current_user),
+):
+    """Points de carte regroupés par zoom et emprise (clusters pré-calculés)."""
+    try:
+        bounds = _parse_bbox(bbox)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Emprise invalide (ouest,sud,est,nord)")
+
+    index = await cluster_index(db)
+    payload = {"type": "FeatureCollection", "zoom": zoom, "features": index.features(zoom, bounds)}
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _json_with_etag(request, body, etag_for(body))
+
+
+@router.get("/", response_model=list[TerritoryResponse], dependencies=[query_budget(4)])
 async def list_territories(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     _user: User = Depends(get_current_user),
 ):
-    """Lister tous les territoires."""
-    result = await db.execute(select(Territory).order_by(Territory.name))
-    return result.scalars().all()
+    """Lister tous les territoires (catalogue en cache, revalidable par ETag)."""
+    etag, _items, body = await territory_catalog(db)
+    return _json_with_etag(request, body, etag)
 
 
 @router.get("/{territory_id}", response_model=TerritoryResponse)
 async def get_territory(
     territory_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _user: User = Depends(get_current_user),
 ):
     """Récupérer un territoire par son ID."""
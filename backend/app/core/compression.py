@@ -0,0 +1,241 @@
+"""Compression des réponses selon leur contenu (remplace GZipMiddleware).
+
+- JSON / texte : Brotli, zstd ou gzip selon ce qu'accepte le client ;
+- médias (vidéo, audio, images, réponses 206) : jamais recompressés ;
+- assets du SPA : variantes `.br` / `.gz` pré-calculées servies telles quelles.
+"""
+
+import mimetypes
+import zlib
+from pathlib import Path
+
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # dépendance optionnelle
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:  # dépendance optionnelle
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Types de contenu qui gagnent à être compressés (tout le reste passe tel quel)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/geo+json",
+    "application/x-ndjson",
+    "image/svg+xml",
+    "text/",
+)
+
+# Extensions des variantes pré-compressées, par ordre de préférence
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(headers: Headers) -> set[str]:
+    """Lire Accept-Encoding en ignorant les encodages à q=0."""
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(headers: Headers) -> str | None:
+    """Choisir le meilleur encodage disponible côté serveur et accepté par le client."""
+    accepted = _accepted_encodings(headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if zstandard is not None and "zstd" in accepted:
+        return "zstd"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+
+class _Compressor:
+    """Interface commune `compress(chunk)` / `flush()` pour les trois encodages."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            # Qualité modérée : bon ratio sans coût CPU prohibitif à la volée
+            self._obj = brotli.Compressor(quality=min(level, 5))
+            self._compress = self._obj.process
+            self._flush = self._obj.finish
+        elif encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=min(level, 10)).compressobj()
+            self._compress = self._obj.compress
+            self._flush = self._obj.flush
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._compress = self._obj.compress
+            self._flush = self._obj.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def flush(self) -> bytes:
+        return self._flush()
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compression sélective (types texte uniquement, jamais de Range)."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, level: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers)
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size, self.level)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int, level: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.level = level
+        self.send: Send | None = None
+        self.initial_message: Message = {}
+        self.passthrough = False
+        self.started = False
+        self.compressor: _Compressor | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] == 206 or "content-range" in headers:
+            return True
+        if "content-encoding" in headers:
+            return True
+        return not is_compressible(headers.get("content-type", ""))
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Décision prise sur les en-têtes : les médias ne sont jamais bufferisés
+            if self._should_skip(message):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.initial_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            self.compressor = _Compressor(self.encoding, self.level)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body)
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                message["body"] = compressed
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        message["body"] = data
+        await self.send(message)
+
+
+def precompressed_variant(path: Path, headers: Headers) -> tuple[Path, str] | None:
+    """Trouver une variante pré-compressée (.br / .gz) acceptée par le client."""
+    accepted = _accepted_encodings(headers)
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        if encoding not in accepted:
+            continue
+        candidate = path.with_name(path.name + suffix)
+        if candidate.is_file():
+            return candidate, encoding
+    return None
+
+
+def precompressed_file_response(path: Path, headers: Headers) -> FileResponse:
+    """FileResponse servant la variante pré-compressée si elle existe."""
+    variant = precompressed_variant(path, headers)
+    if variant is None:
+        return FileResponse(path, headers={"Vary": "Accept-Encoding"})
+    variant_path, encoding = variant
+    return FileResponse(
+        variant_path,
+        media_type=mimetypes.guess_type(path.name)[0] or "text/plain",
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+    )
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles servant `fichier.br` / `fichier.gz` quand ils existent.
+
+    Les assets Vite sont nommés par empreinte : ils sont mis en cache un an.
+    """
+
+    async def get_response(self, path: str, scope: Scope):
+        response = await super().get_response(path, scope)
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+
+        variant = precompressed_variant(Path(response.path), Headers(scope=scope))
+        cache = {"Cache-Control": "public, max-age=31536000, immutable"}
+        if variant is None:
+            response.headers.update(cache)
+            response.headers.setdefault("Vary", "Accept-Encoding")
+            return response
+
+        variant_path, encoding = variant
+        return FileResponse(
+            variant_path,
+            media_type=response.media_type,
+            headers={**cache, "Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
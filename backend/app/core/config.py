@@ -5,11 +5,34 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 
 
+def to_async_url(raw: str) -> str:
+    """Adapter une URL PostgreSQL au driver asyncpg (postgresql+asyncpg://)."""
+    if raw.startswith("postgresql://"):
+        return raw.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return raw
+
+
 class Settings(BaseSettings):
     # Application
     app_name: str = "The Human Archive"
     app_env: str = "development"
     debug: bool = True
+    sql_echo: bool = False  # afficher chaque requête SQL (très verbeux)
+    query_budget_strict: bool = False  # dépassement de budget de requêtes = erreur (tests)
+    slow_query_ms: float = 500  # seuil d'enregistrement d'une requête lente
+    slow_query_explain_rate: float = 0.1  # part des récidives ré-expliquées (la 1re l'est toujours)
+    slow_query_explain_timeout_ms: int = 10000
+    slow_query_buffer_size: int = 200
+    loop_monitor_enabled: bool = True  # détection des appels bloquants dans la boucle asyncio
+    loop_monitor_interval_ms: float = 50
+    loop_stall_ms: float = 100  # seuil de blocage journalisé (pile + route)
+    profile_dir: str = "/tmp/human-archive-profiles"  # profils speedscope (admin)
+    profile_interval_ms: float = 5
+    migration_lock_timeout: str = "5s"  # attente max d'un verrou par une migration
+    tracing_enabled: bool = True  # spans HTTP / SQL / stockage / média (mémoire)
+    trace_exporter: str = "none"  # "none" | "file" | "otlp"
+    trace_export_file: str = "/tmp/human-archive-traces.jsonl"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
     secret_key: str = "change-me"
     api_prefix: str = "/api/v1"
     port: int = 8000
@@ -24,6 +47,11 @@ class Settings(BaseSettings):
     # PostgreSQL (URL directe – Railway)
     database_url_override: str | None = None  # alias DATABASE_URL
 
+    # Réplicas en lecture (URLs séparées par des virgules) et durée pendant
+    # laquelle un client qui vient d'écrire continue de lire sur le primaire
+    database_replica_urls: str = ""
+    replica_sticky_seconds: int = 5
+
     # Stockage
     storage_backend: str = "s3"  # "s3" ou "local"
     storage_local_dir: str = "/data/uploads"
@@ -54,6 +82,22 @@ class Settings(BaseSettings):
     enable_compression: bool = True
     thumbnail_quality: int = 60
 
+    # Pool de processus des traitements CPU (Pillow, bcrypt) : 0 = un worker par CPU
+    cpu_pool_enabled: bool = True
+    cpu_pool_workers: int = 0
+    cpu_task_timeout_seconds: float = 120
+
+    # Exports asynchrones (JSONL / Parquet)
+    export_batch_size: int = 5000
+    export_max_concurrency: int = 1
+    export_stale_seconds: int = 300  # job « running » sans battement depuis : orphelin
+
+    # Rattachement GPS au territoire le plus proche (au-delà : pas de rattachement)
+    territory_match_max_km: float = 50.0
+
+    # Métriques Prometheus (/metrics) : jeton Bearer exigé s'il est défini
+    metrics_token: str | None = None
+
     # Railway
     railway_public_domain: str | None = None
 
@@ -62,10 +106,7 @@ class Settings(BaseSettings):
         # Railway fournit DATABASE_URL directement
         raw = self.database_url_override or os.environ.get("DATABASE_URL")
         if raw:
-            # asyncpg a besoin de postgresql+asyncpg://
-            if raw.startswith("postgresql://"):
-                return raw.replace("postgresql://", "postgresql+asyncpg://", 1)
-            return raw
+            return to_async_url(raw)
         return (
             f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
@@ -83,6 +124,10 @@ class Settings(BaseSettings):
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
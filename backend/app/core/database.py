@@ -1,37 +1,142 @@
-"""Connexion à la base de données et gestion des sessions."""
+"""Connexion à la base de données et gestion des sessions.
 
+Écritures sur le primaire (`get_db`), lectures sur les réplicas (`get_read_db`)
+quand `DATABASE_REPLICA_URLS` est défini. Après une écriture, le client reçoit
+un cookie qui le maintient sur le primaire quelques secondes : il relit ce qu'il
+vient d'écrire malgré le retard de réplication.
+"""
+
+import itertools
+import time
+
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from app.core.config import get_settings
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import get_settings, to_async_url
+from app.core.instrumentation import instrument_engine
+from app.core.metrics import register_gauges
 
 settings = get_settings()
 
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
+    echo=settings.sql_echo,
     pool_size=20,
     max_overflow=10,
 )
 
+instrument_engine(engine)
+
 async_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+# ── Réplicas en lecture seule ─────────────────────
+
+replica_engines = [
+    create_async_engine(
+        to_async_url(url),
+        echo=settings.sql_echo,
+        pool_size=20,
+        max_overflow=10,
+    )
+    for url in settings.replica_urls
+]
+
+for index, replica in enumerate(replica_engines):
+    instrument_engine(replica, f"replica{index}")
+
+replica_sessions = [
+    async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False)
+    for replica in replica_engines
+]
+
+_next_replica = itertools.cycle(replica_sessions or [async_session])
+
+
+def _pool_gauges():
+    engines = [("primary", engine)] + [(f"replica{i}", e) for i, e in enumerate(replica_engines)]
+    values = []
+    for name, eng in engines:
+        pool = eng.pool
+        values += [
+            ((name, "size"), pool.size()),
+            ((name, "checked_out"), pool.checkedout()),
+            ((name, "checked_in"), pool.checkedin()),
+            ((name, "overflow"), max(pool.overflow(), 0)),
+        ]
+    return values
+
+
+register_gauges("db_pool_connections", "Connexions du pool SQLAlchemy par état", ("engine", "state"), _pool_gauges)
+
+# Cookie de lecture sur le primaire après une écriture (valeur : échéance, epoch)
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+_WROTE_STATE_KEY = "db_wrote"
+
+
+def read_session() -> AsyncSession:
+    """Session sur le réplica suivant (primaire si aucun réplica n'est configuré)."""
+    return next(_next_replica)()
+
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
-    """Dependency injection pour les sessions DB."""
+async def get_db(request: Request) -> AsyncSession:
+    """Dependency injection pour les sessions DB (primaire, transaction committée)."""
     async with async_session() as session:
         try:
             yield session
             await session.commit()
+            if request.method not in ("GET", "HEAD", "OPTIONS"):
+                setattr(request.state, _WROTE_STATE_KEY, True)
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+def _sticky_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Session en lecture seule : réplica, sans commit (la transaction est simplement fermée)."""
+    factory = async_session if _sticky_to_primary(request) else next(_next_replica)
+    async with factory() as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """Poser le cookie de lecture sur le primaire quand la requête a écrit."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not replica_sessions:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and scope.get("state", {}).get(_WROTE_STATE_KEY):
+                seconds = settings.replica_sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{PRIMARY_STICKY_COOKIE}={time.time() + seconds:.3f}; "
+                    f"Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,224 @@
+"""Instrumentation par requête : requêtes SQL et appels au stockage.
+
+Les mêmes points de mesure alimentent les métriques globales (`core.metrics`).
+
+Chaque requête HTTP reçoit un compteur (`RequestMetrics`) porté par une
+ContextVar. Les événements du moteur SQLAlchemy et le dispatcher de stockage y
+ajoutent nombre d'appels, lignes et durées ; le middleware les publie dans
+l'en-tête `Server-Timing` et dans un log structuré en fin de requête.
+
+Chaque requête SQL et chaque appel au stockage devient aussi un span de la
+trace courante (`core.tracing`).
+
+Requêtes lentes : au-delà de `SLOW_QUERY_MS`, la requête est transmise à
+`core.slow_queries` (tampon consultable par les admins, plan échantillonné).
+
+Budget de requêtes : une route peut déclarer `dependencies=[query_budget(n)]`.
+Un dépassement est journalisé ; en mode strict (`QUERY_BUDGET_STRICT=true`,
+utile en test) il fait échouer la requête.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from contextvars import ContextVar
+
+from fastapi import Depends
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.loop_monitor import register_request
+from app.core.metrics import DB_QUERY_DURATION, HTTP_REQUEST_DURATION, STORAGE_DURATION, STORAGE_ERRORS
+from app.core.slow_queries import record_slow_query
+from app.core.tracing import current_trace_id, record_span, span
+
+logger = logging.getLogger("app.requests")
+settings = get_settings()
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class RequestMetrics:
+    __slots__ = (
+        "db_queries", "db_rows", "db_seconds",
+        "storage_calls", "storage_seconds", "query_budget", "path",
+    )
+
+    def __init__(self, path: str | None = None):
+        self.db_queries = 0
+        self.db_rows = 0
+        self.db_seconds = 0.0
+        self.storage_calls = 0
+        self.storage_seconds = 0.0
+        self.query_budget: int | None = None
+        self.path = path
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            # En-tête HTTP : ASCII uniquement
+            f'db;dur={self.db_seconds * 1000:.1f};desc="SQL x{self.db_queries}, {self.db_rows} lignes", '
+            f'storage;dur={self.storage_seconds * 1000:.1f};desc="stockage x{self.storage_calls}", '
+            f"total;dur={total_seconds * 1000:.1f}"
+        )
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _current.get()
+
+
+def detach_request_metrics():
+    """Dans une tâche de fond : ne plus imputer les mesures à la requête d'origine."""
+    _current.set(None)
+
+
+# ── SQLAlchemy ────────────────────────────────────
+
+def instrument_engine(engine, name: str = "primary"):
+    """Brancher le comptage des requêtes sur un moteur (async ou sync)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # Une seule valeur par connexion : une requête en échec n'atteint pas
+        # after_cursor_execute, la suivante écrase simplement l'horodatage
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started")
+        DB_QUERY_DURATION.observe(elapsed, name)
+        end_ns = time.time_ns()
+        record_span(
+            "db.query", end_ns - int(elapsed * 1e9), end_ns,
+            {"db.engine": name, "db.statement": statement[:200]},
+        )
+        metrics = _current.get()
+        if elapsed * 1000 >= settings.slow_query_ms:
+            record_slow_query(engine, name, statement, parameters, elapsed, metrics and metrics.path)
+        if metrics is None:
+            return
+        metrics.db_queries += 1
+        metrics.db_seconds += elapsed
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount and rowcount > 0:
+            metrics.db_rows += rowcount
+        if metrics.query_budget is not None and metrics.db_queries > metrics.query_budget:
+            message = f"Budget de requêtes dépassé ({metrics.db_queries} > {metrics.query_budget})"
+            if settings.query_budget_strict:
+                raise QueryBudgetExceeded(message)
+            if metrics.db_queries == metrics.query_budget + 1:
+                logger.warning(message)
+
+
+def query_budget(max_queries: int):
+    """Dépendance de route déclarant le nombre maximal de requêtes SQL attendu."""
+    async def _declare():
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.query_budget = max_queries
+    return Depends(_declare)
+
+
+# ── Stockage ──────────────────────────────────────
+
+def instrument_storage(fn):
+    """Envelopper une fonction du backend de stockage (sync ou async)."""
+    operation = fn.__name__
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def _async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                with span(f"storage.{operation}"):
+                    return await fn(*args, **kwargs)
+            except Exception:
+                STORAGE_ERRORS.inc(operation)
+                raise
+            finally:
+                _record_storage(operation, time.perf_counter() - started)
+        return _async_wrapper
+
+    @functools.wraps(fn)
+    def _wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with span(f"storage.{operation}"):
+                return fn(*args, **kwargs)
+        except Exception:
+            STORAGE_ERRORS.inc(operation)
+            raise
+        finally:
+            _record_storage(operation, time.perf_counter() - started)
+    return _wrapper
+
+
+def _record_storage(operation: str, elapsed: float):
+    STORAGE_DURATION.observe(elapsed, operation)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.storage_calls += 1
+        metrics.storage_seconds += elapsed
+
+
+# ── Middleware ────────────────────────────────────
+
+class RequestMetricsMiddleware:
+    """Ouvrir un compteur par requête, publier Server-Timing et un log structuré."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope["path"])
+        token = _current.set(metrics)
+        register_request(scope)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            # Gabarit de route (« /archives/{archive_id} ») : cardinalité bornée
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                elapsed, scope["method"], getattr(route, "path", "other"), status_code
+            )
+            fields = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(elapsed * 1000, 1),
+                "db_queries": metrics.db_queries,
+                "db_rows": metrics.db_rows,
+                "db_ms": round(metrics.db_seconds * 1000, 1),
+                "storage_calls": metrics.storage_calls,
+                "storage_ms": round(metrics.storage_seconds * 1000, 1),
+                "trace_id": current_trace_id(),
+            }
+            logger.info(
+                " ".join(f"{key}={value}" for key, value in fields.items()),
+                extra=fields,
+            )
@@ -0,0 +1,161 @@
+"""Détection des blocages de la boucle asyncio (appels bloquants dans les routes async).
+
+Deux mesures complémentaires :
+- une tâche « battement » dort `LOOP_MONITOR_INTERVAL_MS` en boucle ; le retard
+  au réveil est le délai d'ordonnancement, publié en histogramme ;
+- un thread de garde surveille le dernier battement. Quand la boucle est figée
+  au-delà de `LOOP_STALL_MS`, il capture la pile du thread de la boucle (le code
+  fautif est encore en cours d'exécution) et la tâche en cours, rattachée à la
+  route par `register_request`.
+
+Le blocage est publié à la reprise de la boucle : compteur par route, log avec
+la pile, tampon consultable par les admins.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger("app.loop_monitor")
+settings = get_settings()
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Retard d'ordonnancement de la boucle asyncio",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Blocages de la boucle asyncio au-delà du seuil, par route",
+    ("route",),
+)
+
+# Tâche asyncio → scope ASGI de la requête qu'elle traite
+_task_scopes: "weakref.WeakKeyDictionary[asyncio.Task, dict]" = weakref.WeakKeyDictionary()
+_stalls: deque = deque(maxlen=100)
+
+
+def register_request(scope: dict):
+    """Rattacher la tâche courante à une requête (appelé par le middleware de mesure)."""
+    task = asyncio.current_task()
+    if task is not None:
+        _task_scopes[task] = scope
+
+
+def _route_of(scope: dict | None) -> str:
+    if scope is None:
+        return "background"
+    # Gabarit de route si le routage a eu lieu (cardinalité bornée)
+    route = scope.get("route")
+    return getattr(route, "path", "other")
+
+
+def recent_stalls() -> list[dict]:
+    return list(reversed(_stalls))
+
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._last_beat = time.monotonic()
+        self._beat_index = 0
+        # Capture du thread de garde pour le battement en retard : (index, route, chemin, pile)
+        self._capture: tuple | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = self._loop.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-monitor", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            self._beat_index += 1
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(time.monotonic() - self._last_beat - self.interval, 0.0)
+            EVENT_LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _watch(self):
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stop.wait(poll):
+            beat = self._beat_index
+            if self._capture is not None and self._capture[0] == beat:
+                continue
+            if time.monotonic() - self._last_beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame, limit=40)
+            task = asyncio.current_task(self._loop)
+            scope = _task_scopes.get(task) if task is not None else None
+            self._capture = (
+                beat,
+                _route_of(scope),
+                scope.get("path") if scope else None,
+                "".join(stack),
+            )
+
+    def _report(self, lag: float):
+        capture = self._capture
+        if capture is not None and capture[0] == self._beat_index:
+            _, route, path, stack = capture
+        else:
+            # Blocage trop bref pour le thread de garde : pas de pile
+            route, path, stack = "unknown", None, None
+        EVENT_LOOP_STALLS.inc(route)
+        _stalls.append({
+            "duration_ms": round(lag * 1000, 1),
+            "route": route,
+            "path": path,
+            "stack": stack,
+            "recorded_at": datetime.now(timezone.utc),
+        })
+        logger.warning(
+            "Boucle asyncio bloquée %.0f ms (route=%s)%s",
+            lag * 1000, route, f"\n{stack}" if stack else "",
+            extra={"stall_ms": round(lag * 1000, 1), "route": route},
+        )
+
+
+_monitor: LoopMonitor | None = None
+
+
+def start_loop_monitor():
+    global _monitor
+    if _monitor is None and settings.loop_monitor_enabled:
+        _monitor = LoopMonitor(
+            settings.loop_monitor_interval_ms / 1000,
+            settings.loop_stall_ms / 1000,
+        )
+        _monitor.start()
+
+
+def stop_loop_monitor():
+    global _monitor
+    if _monitor is not None:
+        _monitor.stop()
+        _monitor = None
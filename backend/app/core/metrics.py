@@ -0,0 +1,152 @@
+"""Métriques au format d'exposition Prometheus (sans dépendance externe).
+
+Compteurs et histogrammes à étiquettes : chaque combinaison d'étiquettes est
+créée une fois puis réutilisée, l'enregistrement se résume à quelques additions
+sur des listes préallouées (pas de verrou, pas d'allocation par requête).
+Les jauges (pool de connexions…) sont lues au moment de la collecte.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+
+# Bornes par défaut (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: list = []
+_gauge_callbacks: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, list[float]] = {}
+        _registry.append(self)
+
+    def inc(self, *label_values, amount: float = 1.0):
+        cell = self._values.get(label_values)
+        if cell is None:
+            cell = self._values.setdefault(label_values, [0.0])
+        cell[0] += amount
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, cell in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {cell[0]:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Par combinaison : [compte par borne..., +Inf, somme]
+        self._values: dict[tuple, list[float]] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, *label_values):
+        cell = self._values.get(label_values)
+        if cell is None:
+            cell = self._values.setdefault(label_values, [0] * (len(self.buckets) + 1) + [0.0])
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, cell in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, cell):
+                cumulative += count
+                le = 'le="%s"' % format(bound, "g")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            cumulative += cell[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {cell[-1]:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+def register_gauges(name: str, documentation: str, labels: tuple[str, ...], callback):
+    """Jauge lue à la collecte : `callback()` retourne [(valeurs d'étiquettes, valeur)]."""
+    _gauge_callbacks.append((name, documentation, labels, callback))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    for name, documentation, labels, callback in _gauge_callbacks:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for values, value in callback():
+            lines.append(f"{name}{_format_labels(labels, values)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Métriques de l'application ────────────────────
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ("method", "route", "status"),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Durée des requêtes SQL",
+    ("engine",),
+)
+STORAGE_DURATION = Histogram(
+    "storage_operation_duration_seconds",
+    "Durée des appels au stockage (put/get/presign…)",
+    ("operation",),
+)
+STORAGE_ERRORS = Counter(
+    "storage_operation_errors_total",
+    "Appels au stockage en erreur",
+    ("operation",),
+)
+MEDIA_DURATION = Histogram(
+    "media_processing_duration_seconds",
+    "Durée des traitements média (ffprobe, ffmpeg, Pillow)",
+    ("tool",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Consultations des caches en mémoire (result = hit | miss)",
+    ("cache", "result"),
+)
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
@@ -0,0 +1,232 @@
+"""Pool de processus pour les traitements CPU (décodage Pillow, bcrypt, normalisation Unicode).
+
+`asyncio.to_thread` partage le GIL avec la boucle : le décodage d'un gros TIFF
+ralentit toutes les requêtes du worker. Les traitements CPU passent donc par un
+`ProcessPoolExecutor` (`run_cpu`) :
+- taille : `CPU_POOL_WORKERS`, à défaut le nombre de CPU utilisables ;
+- workers préchauffés : Pillow (et ses décodeurs) est chargé une fois par le
+  serveur de fork et par l'initialiseur, et les processus sont lancés en tâche
+  de fond au démarrage plutôt qu'au premier upload. Le processus API, lui, ne
+  charge toujours pas Pillow ;
+- délai maximal par tâche (`CPU_TASK_TIMEOUT_SECONDS`) : un processus en plein
+  calcul ne s'interrompt pas et la mort d'un worker casse tout son pool. Le pool
+  fautif est donc mis à la retraite : les nouvelles tâches partent sur un pool
+  neuf, celles déjà soumises à l'ancien se terminent normalement, puis il est
+  arrêté de force (worker bloqué compris) quand plus personne ne l'attend ;
+- reprise après crash : un worker mort (OOM, décodeur qui plante) casse le pool
+  (`BrokenProcessPool`) ; il est recréé et la tâche relancée une fois.
+
+Les fonctions soumises doivent être définies au niveau d'un module (picklables)
+et recevoir des arguments picklables. `CPU_POOL_ENABLED=false` revient à
+`asyncio.to_thread` (scripts, environnements sans multiprocessing).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, register_gauges
+
+logger = logging.getLogger("app.process_pool")
+settings = get_settings()
+
+CPU_POOL_TASKS = Counter(
+    "cpu_pool_tasks_total",
+    "Tâches du pool de processus par fonction (result = ok | error | timeout | crash)",
+    ("function", "result"),
+)
+CPU_POOL_RESTARTS = Counter(
+    "cpu_pool_restarts_total",
+    "Recréations du pool de processus (reason = timeout | crash)",
+    ("reason",),
+)
+
+# Modules chargés une fois dans le serveur de fork, hérités par chaque worker
+WORKER_PRELOAD = ["PIL.Image", "bcrypt"]
+
+_pool = None
+_pool_lock = threading.Lock()
+_in_flight = 0
+# Appelants en attente par pool ; pools retraités après un dépassement de délai
+_waiting: dict = {}
+_retired: set = set()
+
+register_gauges(
+    "cpu_pool_tasks_in_flight",
+    "Tâches en cours ou en attente dans le pool de processus",
+    (),
+    lambda: [((), _in_flight)],
+)
+
+
+def pool_size() -> int:
+    """Nombre de workers : réglage explicite, sinon CPU utilisables par ce processus."""
+    if settings.cpu_pool_workers > 0:
+        return settings.cpu_pool_workers
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker():
+    """Initialiseur des workers : décodeurs Pillow enregistrés avant la première tâche."""
+    import signal
+
+    # Ctrl+C : c'est le processus API qui arrête le pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from PIL import Image
+
+    Image.init()
+
+
+def _ping(hold: float = 0.0) -> int:
+    if hold:
+        time.sleep(hold)
+    return os.getpid()
+
+
+def _create_pool():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Pas de fork direct : le processus API a des threads (surveillance de la
+    # boucle, export des traces) et une mémoire qu'il est inutile de dupliquer
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(WORKER_PRELOAD)
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=pool_size(), mp_context=context, initializer=_init_worker)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _create_pool()
+        return _pool
+
+
+def _terminate(pool):
+    # Python 3.11 n'expose pas l'arrêt forcé des workers (terminate_workers en 3.14)
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    # Pool cassé : les tâches encore en file échouent en BrokenProcessPool et
+    # sont relancées par leur appelant sur le nouveau pool
+    pool.shutdown(wait=False)
+
+
+def _detach(pool, reason: str) -> bool:
+    """Retirer `pool` du service ; le suivant est créé à la prochaine tâche."""
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return False  # déjà remplacé par une autre tâche
+        _pool = None
+    CPU_POOL_RESTARTS.inc(reason)
+    logger.warning("Pool de processus recréé (%s)", reason)
+    return True
+
+
+def _discard(pool):
+    """Pool cassé (worker mort) : ses tâches ont déjà échoué, arrêt immédiat."""
+    if _detach(pool, "crash"):
+        _terminate(pool)
+
+
+def _retire(pool):
+    """Pool bloqué par une tâche trop longue : arrêt différé (voir `_reap`)."""
+    if _detach(pool, "timeout"):
+        _retired.add(pool)
+
+
+def _reap():
+    # Un pool retraité n'est arrêté qu'une fois ses autres tâches terminées
+    for pool in [p for p in _retired if p not in _waiting]:
+        _retired.discard(pool)
+        _terminate(pool)
+
+
+async def run_cpu(fn, *args, timeout: float | None = None):
+    """Exécuter `fn(*args)` dans le pool de processus et attendre le résultat.
+
+    Lève TimeoutError au-delà du délai, BrokenProcessPool si la tâche fait
+    planter son worker deux fois de suite ; les exceptions de `fn` sont propagées.
+    Un worker qui meurt fait échouer les autres tâches de son pool : elles sont
+    relancées une fois sur le pool recréé. Un dépassement de délai, lui, ne
+    touche pas les autres tâches en cours.
+    """
+    if not settings.cpu_pool_enabled:
+        return await asyncio.to_thread(fn, *args)
+    from concurrent.futures.process import BrokenProcessPool
+
+    global _in_flight
+    name = fn.__name__
+    loop = asyncio.get_running_loop()
+    _in_flight += 1
+    try:
+        for attempt in (1, 2):
+            pool = _get_pool()
+            _waiting[pool] = _waiting.get(pool, 0) + 1
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(pool, fn, *args),
+                    timeout or settings.cpu_task_timeout_seconds,
+                )
+            except BrokenProcessPool:
+                _discard(pool)
+                if attempt == 2:
+                    CPU_POOL_TASKS.inc(name, "crash")
+                    raise
+                continue
+            except TimeoutError:
+                CPU_POOL_TASKS.inc(name, "timeout")
+                _retire(pool)
+                raise
+            except Exception:
+                CPU_POOL_TASKS.inc(name, "error")
+                raise
+            finally:
+                _waiting[pool] -= 1
+                if not _waiting[pool]:
+                    del _waiting[pool]
+                _reap()
+            CPU_POOL_TASKS.inc(name, "ok")
+            return result
+    finally:
+        _in_flight -= 1
+
+
+def _warm_up() -> int:
+    from concurrent.futures import wait
+
+    # Un worker est lancé par tâche soumise tant qu'aucun n'est libre : chaque
+    # tâche de préchauffage garde le sien le temps que les suivants démarrent
+    futures = [_get_pool().submit(_ping, 0.2) for _ in range(pool_size())]
+    wait(futures, timeout=settings.cpu_task_timeout_seconds)
+    return len({f.result() for f in futures if f.done() and not f.exception()})
+
+
+async def start_cpu_pool():
+    """Lancer et préchauffer les workers (dans un thread : le fork ne bloque pas la boucle)."""
+    if not settings.cpu_pool_enabled:
+        return
+    try:
+        started = await asyncio.to_thread(_warm_up)
+        print(f"✅ Pool de processus prêt ({started}/{pool_size()} workers)")
+    except Exception as e:
+        print(f"⚠️  Pool de processus indisponible au démarrage : {e}")
+
+
+def stop_cpu_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    while _retired:
+        _terminate(_retired.pop())
@@ -0,0 +1,321 @@
+"""Profilage par échantillonnage à la demande (administrateurs uniquement).
+
+Un thread relève périodiquement la pile de chaque thread du processus
+(`sys._current_frames`) : boucle asyncio et threads d'exécution (`to_thread`,
+`run_in_executor`). Le résultat est un profil speedscope (https://speedscope.app),
+enregistré dans `PROFILE_DIR`.
+
+Deux modes :
+- par requête : en-tête `X-Profile: 1` ou paramètre `?profile=1` envoyé par un
+  admin. Sur le thread de la boucle, seuls les échantillons de la tâche de la
+  requête et des tâches qu'elle crée (corps d'une StreamingResponse…) sont
+  gardés ; quand aucune ne s'exécute (attente SQL, stockage…), sa
+  pile de coroutines est relevée sous un cadre « (attente) ». Les threads
+  d'exécution actifs sont tous inclus (pas d'attribution possible à une requête).
+  L'identifiant du profil est renvoyé dans l'en-tête `X-Profile-Id` ;
+- processus entier pendant N secondes, déclenché depuis /admin/diagnostics/profiles.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.profiler")
+settings = get_settings()
+
+MAX_PROCESS_PROFILE_SECONDS = 300
+MAX_KEPT_PROFILES = 50
+
+_profiles: deque = deque(maxlen=MAX_KEPT_PROFILES)
+_process_profile: dict | None = None
+
+# Profil de requête en cours dans ce contexte : les tâches créées y sont rattachées
+_profiled_tasks: ContextVar[weakref.WeakSet | None] = ContextVar("profiled_tasks", default=None)
+
+# Threads d'exécution inactifs (en attente de travail) : non échantillonnés
+_IDLE_FRAMES = {
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+}
+
+
+class SamplingProfiler:
+    """Échantillonneur de piles au format speedscope « sampled »."""
+
+    def __init__(self, interval: float, task: asyncio.Task | None = None):
+        self.interval = interval
+        self.task = task
+        self.tasks: weakref.WeakSet = weakref.WeakSet([task] if task is not None else [])
+        self._loop = task.get_loop() if task is not None else None
+        self._loop_thread_id = threading.get_ident() if task is not None else None
+        self._frames: list[dict] = []
+        self._frame_index: dict[tuple, int] = {}
+        # Par thread : (piles, poids)
+        self._samples: dict[int, tuple[list, list]] = {}
+        self._thread_names: dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.started = 0.0
+        self.duration = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.to_speedscope()
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_filename, code.co_firstlineno, code.co_qualname)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self._frames)
+            self._frames.append({"name": code.co_qualname, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _marker(self, name: str) -> int:
+        key = ("", 0, name)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self._frames)
+            self._frames.append({"name": name})
+        return index
+
+    def _stack(self, frame) -> list[int]:
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_id(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def _task_stack(self) -> list[int] | None:
+        """Pile de coroutines de la tâche suspendue (de l'extérieur vers l'intérieur)."""
+        try:
+            frames = self.task.get_stack()
+        except Exception:
+            return None
+        if not frames:
+            return None
+        return [self._frame_id(f.f_code) for f in frames] + [self._marker("(attente)")]
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if thread_id == self._loop_thread_id:
+                    if self.task.done():
+                        continue
+                    if asyncio.current_task(self._loop) in self.tasks:
+                        stack = self._stack(frame)
+                    else:
+                        stack = self._task_stack()
+                    if not stack:
+                        continue
+                else:
+                    code = frame.f_code
+                    if (Path(code.co_filename).name, code.co_name) in _IDLE_FRAMES:
+                        continue
+                    stack = self._stack(frame)
+                stacks, weights = self._samples.setdefault(thread_id, ([], []))
+                stacks.append(stack)
+                weights.append(weight)
+                self._thread_names.setdefault(thread_id, names.get(thread_id, str(thread_id)))
+
+    def sample_count(self) -> int:
+        return sum(len(stacks) for stacks, _ in self._samples.values())
+
+    def to_speedscope(self, name: str = "profil") -> dict:
+        profiles = []
+        for thread_id, (stacks, weights) in self._samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": self._thread_names.get(thread_id, str(thread_id)),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": stacks,
+                "weights": [round(w, 6) for w in weights],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": settings.app_name,
+            "shared": {"frames": self._frames},
+            "profiles": profiles,
+        }
+
+
+# ── Enregistrement des profils ───────────────────
+
+def _profile_dir() -> Path:
+    path = Path(settings.profile_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def profile_path(profile_id: str) -> Path | None:
+    for entry in _profiles:
+        if entry["id"] == profile_id:
+            path = _profile_dir() / f"{profile_id}.speedscope.json"
+            return path if path.exists() else None
+    return None
+
+
+def list_profiles() -> list[dict]:
+    running = [_process_profile["entry"]] if _process_profile else []
+    return running + list(reversed(_profiles))
+
+
+def _write(path: Path, document: dict):
+    path.write_text(json.dumps(document, separators=(",", ":")))
+
+
+async def _save(profile_id: str, profiler: SamplingProfiler, kind: str, target: str | None, entry: dict | None = None):
+    document = profiler.stop()
+    document["name"] = f"{kind} {target or ''}".strip()
+    await asyncio.to_thread(_write, _profile_dir() / f"{profile_id}.speedscope.json", document)
+    if len(_profiles) == _profiles.maxlen:
+        evicted = _profiles[0]
+        (_profile_dir() / f"{evicted['id']}.speedscope.json").unlink(missing_ok=True)
+    entry = entry or {"id": profile_id, "kind": kind, "target": target}
+    entry.update(
+        status="done",
+        duration_seconds=round(profiler.duration, 3),
+        sample_count=profiler.sample_count(),
+        created_at=entry.get("created_at", datetime.now(timezone.utc)),
+    )
+    _profiles.append(entry)
+    return entry
+
+
+def start_process_profile(seconds: float, interval: float) -> dict | None:
+    """Profiler tout le processus pendant `seconds` ; None si un profil est déjà en cours."""
+    global _process_profile
+    if _process_profile is not None:
+        return None
+    profile_id = uuid.uuid4().hex
+    profiler = SamplingProfiler(interval)
+    entry = {
+        "id": profile_id,
+        "kind": "process",
+        "target": None,
+        "status": "running",
+        "duration_seconds": seconds,
+        "sample_count": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+    async def _run():
+        global _process_profile
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await _save(profile_id, profiler, "process", None, entry)
+            _process_profile = None
+
+    profiler.start()
+    _process_profile = {"entry": entry, "task": asyncio.create_task(_run())}
+    return entry
+
+
+# ── Middleware (profil d'une requête) ────────────
+
+def _task_factory(loop, coro, context=None):
+    task = asyncio.Task(coro, loop=loop, context=context)
+    tasks = _profiled_tasks.get()
+    if tasks is not None:
+        tasks.add(task)
+    return task
+
+
+def _install_task_factory():
+    loop = asyncio.get_running_loop()
+    if loop.get_task_factory() is None:
+        loop.set_task_factory(_task_factory)
+
+
+async def _is_admin(scope: Scope) -> bool:
+    from sqlalchemy import select
+    from app.core.database import read_session
+    from app.core.security import decode_token
+    from app.models.user import User
+
+    authorization = Headers(scope=scope).get("authorization", "")
+    if not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        payload = decode_token(authorization[7:])
+    except Exception:
+        return False
+    if payload.get("type") != "access" or payload.get("sub") is None:
+        return False
+    async with read_session() as session:
+        role = (
+            await session.execute(select(User.role).where(User.id == payload["sub"], User.is_active.is_(True)))
+        ).scalar_one_or_none()
+    return role == "admin"
+
+
+def _profiling_requested(scope: Scope) -> bool:
+    # Décodage latin-1 (comme Starlette) : des octets non UTF-8 ne font pas échouer la requête
+    if Headers(scope=scope).get("x-profile", "").lower() in ("1", "true"):
+        return True
+    return QueryParams(scope.get("query_string", b"")).get("profile", "").lower() in ("1", "true")
+
+
+class ProfilingMiddleware:
+    """Profiler une requête marquée `X-Profile: 1` / `?profile=1` si elle vient d'un admin."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _profiling_requested(scope) or not await _is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profiler = SamplingProfiler(settings.profile_interval_ms / 1000, asyncio.current_task())
+        _install_task_factory()
+        token = _profiled_tasks.set(profiler.tasks)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _profiled_tasks.reset(token)
+            entry = await _save(profile_id, profiler, "request", f"{scope['method']} {scope['path']}")
+            logger.info("Profil %s enregistré (%s échantillons)", profile_id, entry["sample_count"])
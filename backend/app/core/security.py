@@ -1,15 +1,20 @@
-"""Utilitaires de sécurité : JWT, hachage de mots de passe."""
+"""Utilitaires de sécurité : JWT, hachage de mots de passe.
+
+python-jose (et cryptography) et bcrypt sont importés au premier usage : ils ne
+pèsent pas sur le démarrage des workers. Dans les routes, bcrypt (~250 ms de CPU
+par appel) passe par le pool de processus : `hash_password_async`,
+`verify_password_async`.
+"""
 
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-import bcrypt
-from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import get_settings
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.process_pool import run_cpu
 
 settings = get_settings()
 
@@ -17,39 +22,59 @@ security = HTTPBearer()
 
 
 def hash_password(password: str) -> str:
+    import bcrypt
+
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+async def hash_password_async(password: str) -> str:
+    return await run_cpu(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_cpu(verify_password, plain_password, hashed_password)
+
+
+def _jwt():
+    from jose import jwt
+
+    return jwt
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return _jwt().encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def create_reset_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(hours=1)
     to_encode.update({"exp": expire, "type": "reset"})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return _jwt().encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return _jwt().encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
 def decode_token(token: str) -> dict:
+    from jose import JWTError
+
     try:
-        payload = jwt.decode(
+        payload = _jwt().decode(
             token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
         )
         return payload
@@ -60,14 +85,10 @@ def decode_token(token: str) -> dict:
         )
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db),
-):
-    """Dépendance pour récupérer l'utilisateur courant depuis le JWT."""
+async def _user_from_token(token: str, db: AsyncSession):
     from app.models.user import User
 
-    payload = decode_token(credentials.credentials)
+    payload = decode_token(token)
     if payload.get("type") != "access":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -93,44 +114,45 @@ async def get_current_user(
     return user
 
 
-async def get_current_user_from_token_param(
-    token: str = Query(...),
-    db: AsyncSession = Depends(get_db),
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Dépendance pour récupérer l'utilisateur depuis un token en query param (pour les tags img/video)."""
-    from app.models.user import User
-
-    payload = decode_token(token)
-    if payload.get("type") != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Type de token invalide",
-        )
+    """Dépendance pour récupérer l'utilisateur courant depuis le JWT."""
+    return await _user_from_token(credentials.credentials, db)
 
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token invalide",
-        )
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+async def get_current_user_rw(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db),
+):
+    """Variante pour les routes sur le primaire (`get_db`) : la session de la route
+    est réutilisée (cache des dépendances), une seule connexion par requête."""
+    return await _user_from_token(credentials.credentials, db)
 
-    if user is None or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Utilisateur non trouvé ou désactivé",
-        )
 
-    return user
+async def get_current_user_from_token_param(
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Dépendance pour récupérer l'utilisateur depuis un token en query param (pour les tags img/video)."""
+    return await _user_from_token(token, db)
 
 
-async def require_admin(current_user=Depends(get_current_user)):
-    """Dépendance pour restreindre aux administrateurs."""
+def _ensure_admin(current_user):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Droits administrateur requis",
         )
     return current_user
+
+
+async def require_admin(current_user=Depends(get_current_user)):
+    """Dépendance pour restreindre aux administrateurs."""
+    return _ensure_admin(current_user)
+
+
+async def require_admin_rw(current_user=Depends(get_current_user_rw)):
+    """`require_admin` pour les routes sur le primaire (`get_db`)."""
+    return _ensure_admin(current_user)
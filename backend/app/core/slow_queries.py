@@ -0,0 +1,139 @@
+"""Enregistreur de requêtes lentes avec plan d'exécution échantillonné.
+
+Une requête plus longue que `SLOW_QUERY_MS` est ajoutée à un tampon circulaire
+(SQL normalisé, forme des paramètres, durée, route d'origine). Son plan est
+capturé en tâche de fond : `EXPLAIN (ANALYZE, BUFFERS)` pour un SELECT,
+`EXPLAIN` seul pour une écriture (jamais ré-exécutée). Le premier passage d'une
+requête donnée est toujours expliqué, les suivants selon `SLOW_QUERY_EXPLAIN_RATE`.
+
+auto_explain n'est pas utilisé : il exige `shared_preload_libraries`, rarement
+disponible sur une base managée.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.slow_queries")
+settings = get_settings()
+
+_buffer: deque = deque(maxlen=settings.slow_query_buffer_size)
+_explained: set[str] = set()
+# Vrai pendant l'exécution d'un EXPLAIN : ne pas l'enregistrer lui-même
+_explaining: ContextVar[bool] = ContextVar("slow_query_explaining", default=False)
+_explain_semaphore = asyncio.Semaphore(1)
+_pending: set[asyncio.Task] = set()
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_WRITE_RE = re.compile(r"\b(insert|update|delete)\b")
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+def normalize_sql(statement: str) -> str:
+    """Remplacer paramètres et littéraux par `?` et compacter les espaces."""
+    normalized = _PLACEHOLDER_RE.sub("?", statement)
+    normalized = _LITERAL_RE.sub("?", normalized)
+    return _SPACE_RE.sub(" ", normalized).strip()
+
+
+def bind_shape(parameters) -> list[str]:
+    """Types des paramètres (jamais leurs valeurs) : « UUID », « str », « list[12] »…"""
+    if isinstance(parameters, dict):
+        parameters = list(parameters.values())
+    elif isinstance(parameters, list) and parameters and isinstance(parameters[0], (tuple, list, dict)):
+        # executemany : forme de la première ligne
+        return [f"executemany[{len(parameters)}]"] + bind_shape(parameters[0])
+    shape = []
+    for value in parameters or ():
+        if isinstance(value, (list, tuple)):
+            shape.append(f"list[{len(value)}]")
+        else:
+            shape.append(type(value).__name__)
+    return shape
+
+
+def record_slow_query(engine, engine_name: str, statement: str, parameters, elapsed: float, path: str | None):
+    """Appelé depuis l'événement `after_cursor_execute` (contexte synchrone)."""
+    if _explaining.get():
+        return
+    normalized = normalize_sql(statement)
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    entry = {
+        "id": uuid.uuid4().hex,
+        "fingerprint": fingerprint,
+        "sql": normalized,
+        "bind_shape": bind_shape(parameters),
+        "duration_ms": round(elapsed * 1000, 1),
+        "engine": engine_name,
+        "path": path,
+        "recorded_at": datetime.now(timezone.utc),
+        "plan": None,
+    }
+    _buffer.append(entry)
+    logger.warning("Requête lente (%.0f ms, %s) : %s", elapsed * 1000, fingerprint, normalized[:300])
+
+    verb = normalized.split(" ", 1)[0].lower()
+    if verb not in _EXPLAINABLE:
+        return
+    first_time = fingerprint not in _explained
+    if not (first_time or random.random() < settings.slow_query_explain_rate):
+        return
+    # Moteur async uniquement, un seul EXPLAIN à la fois
+    if _explain_semaphore.locked() or not hasattr(engine, "sync_engine"):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _explained.add(fingerprint)
+    task = loop.create_task(_explain(engine, entry, statement, parameters))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def _explain(engine, entry: dict, statement: str, parameters):
+    from app.core.instrumentation import detach_request_metrics
+
+    _explaining.set(True)
+    detach_request_metrics()
+    lowered = statement.lstrip().lower()
+    # Un CTE peut contenir une écriture : pas d'ANALYZE dans ce cas
+    is_select = lowered.startswith("select") or (
+        lowered.startswith("with") and not _WRITE_RE.search(lowered)
+    )
+    options = "ANALYZE, BUFFERS" if is_select else "COSTS"
+    async with _explain_semaphore:
+        try:
+            async with engine.connect() as conn:
+                # Transaction jamais committée, bornée dans le temps
+                await conn.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_ms)}"
+                )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}",
+                    tuple(parameters) if isinstance(parameters, list) else parameters,
+                )
+                entry["plan"] = "\n".join(row[0] for row in result.all())
+                await conn.rollback()
+        except Exception as e:
+            entry["plan"] = f"(plan indisponible : {e})"
+
+
+def slow_queries() -> list[dict]:
+    """Entrées du tampon, les plus récentes d'abord."""
+    return list(reversed(_buffer))
+
+
+def clear_slow_queries():
+    _buffer.clear()
+    _explained.clear()
@@ -1,27 +1,21 @@
-"""Service de stockage S3-compatible (MinIO / Cloudflare R2)."""
+"""Service de stockage S3-compatible (MinIO / Cloudflare R2).
+
+boto3 (~100 ms et ~30 Mo à l'import) n'est chargé qu'à la création du premier
+client ; au démarrage, c'est la vérification du bucket en tâche de fond qui s'en charge.
+"""
 
-import boto3
-from botocore.config import Config as BotoConfig
-from botocore.exceptions import ClientError
 from app.core.config import get_settings
 
 settings = get_settings()
 
 
-def _build_endpoint_url(host: str) -> str:
-    """Construire l'URL de l'endpoint S3 en évitant les doublons de protocole."""
-    host = host.strip()
-    if host.startswith("https://") or host.startswith("http://"):
-        return host
-    scheme = "https" if settings.minio_use_ssl else "http"
-    return f"{scheme}://{host}"
-
+def _client(endpoint: str):
+    import boto3
+    from botocore.config import Config as BotoConfig
 
-def get_s3_client():
-    """Créer un client S3 (MinIO local ou Cloudflare R2)."""
     return boto3.client(
         "s3",
-        endpoint_url=_build_endpoint_url(settings.minio_endpoint),
+        endpoint_url=_build_endpoint_url(endpoint),
         aws_access_key_id=settings.minio_root_user,
         aws_secret_access_key=settings.minio_root_password,
         config=BotoConfig(
@@ -34,25 +28,29 @@ def get_s3_client():
     )
 
 
+def _build_endpoint_url(host: str) -> str:
+    """Construire l'URL de l'endpoint S3 en évitant les doublons de protocole."""
+    host = host.strip()
+    if host.startswith("https://") or host.startswith("http://"):
+        return host
+    scheme = "https" if settings.minio_use_ssl else "http"
+    return f"{scheme}://{host}"
+
+
+def get_s3_client():
+    """Créer un client S3 (MinIO local ou Cloudflare R2)."""
+    return _client(settings.minio_endpoint)
+
+
 def get_s3_public_client():
     """Créer un client S3 avec l'endpoint public (pour URLs navigateur)."""
-    return boto3.client(
-        "s3",
-        endpoint_url=_build_endpoint_url(settings.minio_public_endpoint),
-        aws_access_key_id=settings.minio_root_user,
-        aws_secret_access_key=settings.minio_root_password,
-        config=BotoConfig(
-            signature_version="s3v4",
-            connect_timeout=5,
-            read_timeout=10,
-            retries={"max_attempts": 1},
-        ),
-        region_name=settings.s3_region,
-    )
+    return _client(settings.minio_public_endpoint)
 
 
 def ensure_bucket_exists():
     """Vérifier la connectivité au bucket S3/R2."""
+    from botocore.exceptions import ClientError
+
     client = get_s3_client()
     bucket = settings.minio_bucket
     print(f"🪣 Bucket configuré : '{bucket}'")
@@ -93,6 +91,18 @@ async def upload_file(file_data: bytes, object_key: str, content_type: str) -> s
     return object_key
 
 
+def upload_fileobj(fileobj, object_key: str, content_type: str) -> str:
+    """Upload un fichier ouvert par parties (multipart) – mémoire bornée."""
+    client = get_s3_client()
+    client.upload_fileobj(
+        fileobj,
+        settings.minio_bucket,
+        object_key,
+        ExtraArgs={"ContentType": content_type},
+    )
+    return object_key
+
+
 async def get_presigned_url(object_key: str, expires_in: int = 3600) -> str:
     """Générer une URL pré-signée pour accéder à un fichier."""
     client = get_s3_public_client()
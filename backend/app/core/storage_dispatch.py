@@ -1,24 +1,22 @@
-"""Dispatcher de stockage – sélectionne le backend selon STORAGE_BACKEND."""
+"""Dispatcher de stockage – sélectionne le backend selon STORAGE_BACKEND.
+
+Les appels sont instrumentés (nombre et durée par requête, voir `core.instrumentation`).
+"""
 
 from app.core.config import get_settings
+from app.core.instrumentation import instrument_storage
 
 settings = get_settings()
 
 if settings.storage_backend == "local":
-    from app.core.storage_local import (  # noqa: F401
-        ensure_bucket_exists,
-        upload_file,
-        get_file_object,
-        get_presigned_url,
-        delete_file,
-        generate_upload_url,
-    )
+    from app.core import storage_local as _backend
 else:
-    from app.core.storage import (  # noqa: F401
-        ensure_bucket_exists,
-        upload_file,
-        get_file_object,
-        get_presigned_url,
-        delete_file,
-        generate_upload_url,
-    )
+    from app.core import storage as _backend
+
+ensure_bucket_exists = _backend.ensure_bucket_exists
+upload_file = instrument_storage(_backend.upload_file)
+upload_fileobj = instrument_storage(_backend.upload_fileobj)
+get_file_object = instrument_storage(_backend.get_file_object)
+get_presigned_url = instrument_storage(_backend.get_presigned_url)
+delete_file = instrument_storage(_backend.delete_file)
+generate_upload_url = instrument_storage(_backend.generate_upload_url)
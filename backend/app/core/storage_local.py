@@ -2,6 +2,7 @@
 
 import io
 import os
+import shutil
 from pathlib import Path
 
 from app.core.config import get_settings
@@ -23,13 +24,24 @@ async def upload_file(file_data: bytes, object_key: str, content_type: str) -> s
     return object_key
 
 
+def upload_fileobj(fileobj, object_key: str, content_type: str) -> str:
+    """Copier un fichier ouvert sur le disque local par blocs."""
+    file_path = STORAGE_DIR / object_key
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as dest:
+        shutil.copyfileobj(fileobj, dest, settings.chunk_size_kb * 1024)
+    return object_key
+
+
 def get_file_object(object_key: str, range_header: str = None):
-    """Lire un fichier depuis le disque local (compatible avec StreamingResponse)."""
+    """Lire un fichier depuis le disque local (compatible avec StreamingResponse).
+
+    Le fichier est ouvert et lu à la demande : seule la plage demandée est chargée.
+    """
     file_path = STORAGE_DIR / object_key
     if not file_path.exists():
         raise FileNotFoundError(f"Fichier non trouvé : {object_key}")
-    data = file_path.read_bytes()
-    total = len(data)
+    total = file_path.stat().st_size
 
     if range_header:
         # Parser "bytes=start-end"
@@ -38,14 +50,17 @@ def get_file_object(object_key: str, range_header: str = None):
         start = int(parts[0]) if parts[0] else 0
         end = int(parts[1]) if parts[1] else total - 1
         end = min(end, total - 1)
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start + 1)
         return {
-            "Body": io.BytesIO(data[start:end + 1]),
+            "Body": io.BytesIO(data),
             "ContentLength": end - start + 1,
             "ContentRange": f"bytes {start}-{end}/{total}",
         }
 
     return {
-        "Body": io.BytesIO(data),
+        "Body": open(file_path, "rb"),
         "ContentLength": total,
     }
 
@@ -0,0 +1,365 @@
+"""Traces de requêtes : spans imbriqués HTTP, SQL, stockage et traitements média.
+
+Le span courant est porté par une ContextVar : il suit donc les `await`, les
+tâches créées pendant la requête (exports…) et `asyncio.to_thread`. Chaque
+requête HTTP ouvre un span racine (en-tête W3C `traceparent` entrant respecté,
+`traceparent` et `X-Trace-Id` renvoyés) ; les requêtes SQL et les appels au
+stockage y ajoutent leurs spans automatiquement, les étapes métier avec `span()`.
+
+Les traces récentes restent en mémoire (décomposition par étape sous
+/admin/diagnostics/traces). Export optionnel (`TRACE_EXPORTER`) :
+- « file » : un span JSON par ligne dans `TRACE_EXPORT_FILE` ;
+- « otlp » : OTLP/HTTP JSON vers `OTLP_ENDPOINT` (collecteur OpenTelemetry).
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.tracing")
+settings = get_settings()
+
+MAX_TRACES = 500
+MAX_SPANS_PER_TRACE = 2000
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name",
+        "start_ns", "end_ns", "attributes", "status", "root",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict, root: bool = False):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.root = root
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> str | None:
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+@contextmanager
+def span(name: str, root: bool = False, **attributes):
+    """Ouvrir un span enfant du span courant.
+
+    Hors d'une trace, ne fait rien, sauf avec `root=True` (travail de fond lancé
+    hors requête, ex. reprise des exports au démarrage) qui ouvre une nouvelle trace.
+    """
+    parent = _current_span.get()
+    if not settings.tracing_enabled or (parent is None and not root):
+        yield None
+        return
+    if parent is None:
+        current = Span(name, os.urandom(16).hex(), None, attributes, root=True)
+    else:
+        current = Span(name, parent.trace_id, parent.span_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(current)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, attributes: dict):
+    """Enregistrer un span déjà terminé (événements synchrones, ex. requête SQL)."""
+    parent = _current_span.get()
+    if parent is None:
+        return
+    finished = Span(name, parent.trace_id, parent.span_id, attributes)
+    finished.start_ns = start_ns
+    _finish(finished, end_ns)
+
+
+# ── Traces récentes (mémoire) ────────────────────
+
+_traces: "OrderedDict[str, list[Span]]" = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def _finish(finished: Span, end_ns: int | None = None):
+    finished.end_ns = end_ns or time.time_ns()
+    with _traces_lock:
+        spans = _traces.get(finished.trace_id)
+        if spans is None:
+            spans = _traces[finished.trace_id] = []
+            if len(_traces) > MAX_TRACES:
+                _traces.popitem(last=False)
+        if len(spans) < MAX_SPANS_PER_TRACE:
+            spans.append(finished)
+    if _exporter is not None:
+        _exporter.submit(finished)
+
+
+def recent_traces() -> list[dict]:
+    """Traces terminées (span racine clos), les plus récentes d'abord."""
+    with _traces_lock:
+        items = [(trace_id, list(spans)) for trace_id, spans in _traces.items()]
+    summaries = []
+    for trace_id, spans in reversed(items):
+        root = next((s for s in spans if s.root), None)
+        if root is None:
+            continue
+        summaries.append({
+            "trace_id": trace_id,
+            "name": root.name,
+            "status": root.status,
+            "duration_ms": round(root.duration_ms, 3),
+            "span_count": len(spans),
+            "started_at_ns": root.start_ns,
+        })
+    return summaries
+
+
+def trace_detail(trace_id: str) -> dict | None:
+    """Spans d'une trace et temps cumulé par étape (nom de span)."""
+    with _traces_lock:
+        spans = list(_traces.get(trace_id) or [])
+    if not spans:
+        return None
+    spans.sort(key=lambda s: s.start_ns)
+    started = spans[0].start_ns
+    stages: dict[str, list] = {}
+    for s in spans:
+        stage = stages.setdefault(s.name, [0, 0.0])
+        stage[0] += 1
+        stage[1] += s.duration_ms
+    return {
+        "trace_id": trace_id,
+        "spans": [
+            {
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "name": s.name,
+                "start_offset_ms": round((s.start_ns - started) / 1e6, 3),
+                "duration_ms": round(s.duration_ms, 3),
+                "status": s.status,
+                "attributes": s.attributes,
+            }
+            for s in spans
+        ],
+        "stages": sorted(
+            ({"name": name, "count": count, "total_ms": round(total, 3)} for name, (count, total) in stages.items()),
+            key=lambda stage: stage["total_ms"],
+            reverse=True,
+        ),
+    }
+
+
+# ── Export ───────────────────────────────────────
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans: list[Span]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": settings.app_name}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "app.tracing"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                        "name": s.name,
+                        # SERVER pour la racine HTTP, INTERNAL sinon
+                        "kind": 2 if s.root else 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": 2 if s.status == "error" else 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }],
+    }
+
+
+class _Exporter:
+    """Thread d'export par lots ; les spans sont abandonnés si la file est pleine."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._client = None
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, finished: Span):
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            pass
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _drain(self, limit: int = 512) -> list[Span]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.wait(2.0):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        while batch := self._drain():
+            try:
+                self._export(batch)
+            except Exception as e:
+                logger.warning("Export de %d spans impossible : %s", len(batch), e)
+                return
+
+    def _export(self, batch: list[Span]):
+        if self.kind == "file":
+            with open(settings.trace_export_file, "a", encoding="utf-8") as f:
+                for s in batch:
+                    f.write(json.dumps(s.to_dict(), default=str) + "\n")
+        elif self.kind == "otlp":
+            import httpx
+
+            if self._client is None:
+                self._client = httpx.Client(timeout=5)
+            self._client.post(settings.otlp_endpoint, json=_otlp_payload(batch)).raise_for_status()
+
+
+_exporter: _Exporter | None = None
+
+
+def start_trace_exporter():
+    global _exporter
+    if _exporter is None and settings.tracing_enabled and settings.trace_exporter in ("file", "otlp"):
+        _exporter = _Exporter(settings.trace_exporter)
+        _exporter.start()
+
+
+def stop_trace_exporter():
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
+
+
+# ── Middleware ────────────────────────────────────
+
+_TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}")
+
+
+def _parse_traceparent(value: str) -> tuple[str, str] | None:
+    """(trace_id, span parent) d'un en-tête W3C valide, sinon None (nouvelle trace).
+
+    Un identifiant invalide renvoyé au collecteur lui ferait rejeter tout le lot.
+    """
+    match = _TRACEPARENT.fullmatch(value.strip())
+    if match is None:
+        return None
+    trace_id, parent_id = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id
+
+
+class TracingMiddleware:
+    """Ouvrir le span racine de chaque requête HTTP."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = _parse_traceparent(Headers(scope=scope).get("traceparent", ""))
+        trace_id, parent_id = incoming or (os.urandom(16).hex(), None)
+        method = scope["method"]
+        root = Span(f"{method} {scope['path']}", trace_id, parent_id, {"http.method": method, "http.target": scope["path"]}, root=True)
+        token = _current_span.set(root)
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    root.status = "error"
+                headers = MutableHeaders(scope=message)
+                headers.append("traceparent", f"00-{trace_id}-{root.span_id}-01")
+                headers.append("X-Trace-Id", trace_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException:
+            root.status = "error"
+            raise
+        finally:
+            # Gabarit de route (« GET /api/v1/archives/{archive_id} ») une fois le routage fait
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{method} {route.path}"
+            _current_span.reset(token)
+            _finish(root)
@@ -6,16 +6,26 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 from app.core.config import get_settings
+from app.core.database import ReadYourWritesMiddleware
+from app.core.instrumentation import RequestMetricsMiddleware
+from app.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.core.process_pool import start_cpu_pool, stop_cpu_pool
+from app.core.profiler import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, start_trace_exporter, stop_trace_exporter
+from app.core.metrics import render_metrics
+from app.core.compression import CompressionMiddleware, PrecompressedStaticFiles, precompressed_file_response
 from app.core.storage_dispatch import ensure_bucket_exists
+from app.migrations.runner import check_schema_version
 from app.api.auth import router as auth_router
 from app.api.archives import router as archives_router
+from app.api.exports import router as exports_router
+from app.api.changes import router as changes_router
 from app.api.territories import router as territories_router
 from app.api.reports import router as reports_router
+from app.api.diagnostics import router as diagnostics_router
 
 settings = get_settings()
 
@@ -23,39 +33,51 @@ settings = get_settings()
 STATIC_DIR = Path("/app/static")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Cycle de vie de l'application."""
-    # Startup – initialiser le stockage (dans un thread pour ne pas bloquer le démarrage)
+async def _check_storage():
+    """Vérifier (et créer au besoin) le bucket, dans un thread."""
     try:
-        await asyncio.wait_for(
-            asyncio.get_event_loop().run_in_executor(None, ensure_bucket_exists),
-            timeout=15,
-        )
+        await asyncio.wait_for(asyncio.to_thread(ensure_bucket_exists), timeout=15)
+        print("✅ Stockage disponible")
     except asyncio.TimeoutError:
-        print("⚠️  Timeout connexion stockage (15s) – l'app démarre quand même")
+        print("⚠️  Timeout connexion stockage (15s)")
     except Exception as e:
         print(f"⚠️  Stockage non disponible au démarrage : {e}")
 
-    # Startup – auto-créer les tables (Railway : pas de commande init_db manuelle)
+
+async def _resume_exports():
+    """Relancer les exports restés en attente."""
     try:
-        from app.core.database import engine, Base
-        from app.models.user import User  # noqa
-        from app.models.archive import Archive  # noqa
-        from app.models.territory import Territory  # noqa
-        from app.models.report import Report  # noqa
-        from sqlalchemy import text
-
-        async with engine.begin() as conn:
-            await conn.execute(text('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"'))
-            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
-            await conn.run_sync(Base.metadata.create_all)
-        print("✅ Base de données initialisée")
+        from app.services.exports import resume_pending_exports
+        await resume_pending_exports()
     except Exception as e:
-        print(f"⚠️  Erreur init DB : {e}")
+        print(f"⚠️  Reprise des exports impossible : {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cycle de vie de l'application."""
+    start_loop_monitor()
+    start_trace_exporter()
+
+    # Startup – vérifier la révision du schéma (une requête ; les migrations
+    # tournent avant le déploiement : `python -m app.migrations`)
+    await check_schema_version()
+
+    # Startup – stockage, reprise des exports et préchauffage du pool de
+    # processus en tâche de fond : le worker accepte les requêtes sans les attendre
+    background = [
+        asyncio.create_task(_check_storage()),
+        asyncio.create_task(_resume_exports()),
+        asyncio.create_task(start_cpu_pool()),
+    ]
 
     yield
     # Shutdown
+    for task in background:
+        task.cancel()
+    stop_cpu_pool()
+    stop_loop_monitor()
+    stop_trace_exporter()
 
 
 app = FastAPI(
@@ -89,17 +111,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Compression GZip pour faible débit
+# Lecture sur le primaire juste après une écriture (réplicas en lecture)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Compression pour faible débit (JSON/texte uniquement – médias et Range exclus)
 if settings.enable_compression:
-    app.add_middleware(GZipMiddleware, minimum_size=500)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+# Requêtes SQL / appels stockage par requête (Server-Timing + log structuré)
+app.add_middleware(RequestMetricsMiddleware)
+
+# Profil d'une requête à la demande (admin, X-Profile: 1 ou ?profile=1). Placé
+# autour du comptage : la vérification du rôle admin ne pèse pas sur le budget
+# de requêtes de la route
+app.add_middleware(ProfilingMiddleware)
+
+# Span racine de chaque requête (traceparent W3C), ajouté en dernier : englobe tout
+app.add_middleware(TracingMiddleware)
 
 
 # ── Routes API ───────────────────────────────────
 
 app.include_router(auth_router, prefix=settings.api_prefix)
+app.include_router(exports_router, prefix=settings.api_prefix)
+app.include_router(changes_router, prefix=settings.api_prefix)
 app.include_router(archives_router, prefix=settings.api_prefix)
 app.include_router(territories_router, prefix=settings.api_prefix)
 app.include_router(reports_router, prefix=settings.api_prefix)
+app.include_router(diagnostics_router, prefix=settings.api_prefix)
 
 
 @app.get("/health")
@@ -107,6 +146,14 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Exposition Prometheus (routes, pool SQL, stockage, traitements média, caches)."""
+    if settings.metrics_token and request.headers.get("authorization") != f"Bearer {settings.metrics_token}":
+        return PlainTextResponse("Non autorisé", status_code=401)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/debug-r2")
 async def debug_r2():
     import traceback
@@ -139,7 +186,8 @@ async def debug_r2():
 
 if STATIC_DIR.exists() and (STATIC_DIR / "index.html").exists():
     # Servir les assets statiques (JS, CSS, images)
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
+    # (variantes .br/.gz pré-calculées au build : aucune compression à la volée)
+    app.mount("/assets", PrecompressedStaticFiles(directory=STATIC_DIR / "assets"), name="assets")
 
     # Catch-all : toute route non-API renvoie index.html (React Router gère le routing)
     @app.get("/{full_path:path}")
@@ -147,8 +195,8 @@ if STATIC_DIR.exists() and (STATIC_DIR / "index.html").exists():
         # Vérifier si un fichier statique existe (favicon, robots.txt, etc.)
         file_path = STATIC_DIR / full_path
         if full_path and file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(STATIC_DIR / "index.html")
+            return precompressed_file_response(file_path, request.headers)
+        return precompressed_file_response(STATIC_DIR / "index.html", request.headers)
 else:
     # Pas de frontend buildé (dev local avec Vite)
     @app.get("/")
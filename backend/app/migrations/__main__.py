@@ -0,0 +1,41 @@
+"""Migrations du schéma.
+
+Usage :
+    python -m app.migrations            # appliquer toutes les migrations
+    python -m app.migrations current    # révision de la base et révision attendue
+    python -m app.migrations revision "message"   # nouvelle migration (autogenerate)
+"""
+
+import asyncio
+import sys
+
+from app.migrations.runner import alembic_config, current_revision, head_revision, upgrade
+
+
+async def _show_current():
+    from app.core.database import engine
+
+    async with engine.connect() as conn:
+        current = await current_revision(conn)
+    await engine.dispose()
+    print(f"Base : {current or 'aucune'} – code : {head_revision()}")
+
+
+def main(argv: list[str]):
+    action = argv[0] if argv else "upgrade"
+    if action == "upgrade":
+        upgrade(argv[1] if len(argv) > 1 else "head")
+        print("✅ Schéma à jour")
+    elif action == "current":
+        asyncio.run(_show_current())
+    elif action == "revision" and len(argv) > 1:
+        from alembic import command
+
+        command.revision(alembic_config(), message=argv[1], autogenerate=True)
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""Environnement Alembic : migrations exécutées sur le moteur async de l'application.
+
+Sécurité du déploiement :
+- verrou consultatif : deux déploiements simultanés ne migrent pas en parallèle ;
+- `lock_timeout` : une migration qui attend un verrou derrière une longue
+  transaction échoue vite au lieu de bloquer tout le trafic derrière elle.
+  Pour un index sur une grosse table, utiliser
+  `with op.get_context().autocommit_block(): op.create_index(..., postgresql_concurrently=True)`.
+"""
+
+import asyncio
+
+from alembic import context
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import get_settings
+from app.core.database import Base
+
+# Importer tous les modèles pour les enregistrer (autogenerate)
+from app.models.user import User  # noqa
+from app.models.archive import Archive  # noqa
+from app.models.territory import Territory  # noqa
+from app.models.report import Report  # noqa
+from app.models.export_job import ExportJob  # noqa
+from app.models.archive_change import ArchiveChange  # noqa
+from app.models.territory_stat import TerritoryArchiveStat  # noqa
+
+settings = get_settings()
+target_metadata = Base.metadata
+
+# Clé du verrou consultatif des migrations (constante arbitraire)
+MIGRATION_LOCK_KEY = 7_310_241
+
+
+def _run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        transaction_per_migration=True,
+    )
+    connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    try:
+        connection.execute(text(f"SET lock_timeout = '{settings.migration_lock_timeout}'"))
+        connection.commit()
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+
+
+async def run_migrations_online():
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with engine.connect() as connection:
+            await connection.run_sync(_run_migrations)
+    finally:
+        await engine.dispose()
+
+
+def run_migrations_offline():
+    """Générer le SQL sans connexion (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    asyncio.run(run_migrations_online())
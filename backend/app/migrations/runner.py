@@ -0,0 +1,64 @@
+"""Exécution et vérification des migrations Alembic.
+
+Les migrations tournent une fois par déploiement (`python -m app.migrations`,
+commande de pré-déploiement Railway) ; le démarrage d'un worker se contente de
+comparer la révision de la base à celle du code, en une requête.
+"""
+
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(Path(__file__).resolve().parent))
+    return config
+
+
+def head_revision() -> str:
+    """Révision attendue par le code (lecture des fichiers de migration, sans base)."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def upgrade(revision: str = "head"):
+    """Appliquer les migrations (hors boucle asyncio : env.py lance la sienne)."""
+    from alembic import command
+
+    command.upgrade(alembic_config(), revision)
+
+
+async def current_revision(conn) -> str | None:
+    if (await conn.execute(text("SELECT to_regclass('alembic_version')"))).scalar() is None:
+        return None
+    return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+
+
+async def check_schema_version() -> bool:
+    """Vérifier au démarrage que la base est à la révision du code (une requête)."""
+    from app.core.database import engine
+
+    try:
+        async with engine.connect() as conn:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+    except ProgrammingError:
+        # Table absente : base jamais migrée
+        current = None
+    except Exception as e:
+        print(f"⚠️  Base de données injoignable au démarrage : {e}")
+        return False
+    expected = head_revision()
+    if current != expected:
+        print(
+            f"⚠️  Schéma à la révision {current or 'aucune'}, le code attend {expected} : "
+            "lancer `python -m app.migrations`"
+        )
+        return False
+    return True
@@ -0,0 +1,227 @@
+"""Schéma initial (reprend les bases créées par create_all).
+
+Révision : 0001
+Précédente :
+Créée le : 2026-10-19
+
+Les bases déjà initialisées par l'ancien démarrage (`create_all` + instructions
+idempotentes) sont adoptées telles quelles : chaque table n'est créée que si
+elle manque, les index et le trigger sont idempotents.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+TERRITORY_STATS_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION territory_stats_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.territory_id IS NOT NULL THEN
+            UPDATE territory_archive_stats
+               SET archive_count = archive_count - 1
+             WHERE territory_id = OLD.territory_id
+               AND media_type = OLD.media_type
+               AND status = OLD.status;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.territory_id IS NOT NULL THEN
+            INSERT INTO territory_archive_stats (territory_id, media_type, status, archive_count)
+            VALUES (NEW.territory_id, NEW.media_type, NEW.status, 1)
+            ON CONFLICT (territory_id, media_type, status)
+            DO UPDATE SET archive_count = territory_archive_stats.archive_count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_archives_territory_stats ON archives",
+    """
+    CREATE TRIGGER trg_archives_territory_stats
+    AFTER INSERT OR DELETE OR UPDATE OF territory_id, media_type, status ON archives
+    FOR EACH ROW EXECUTE FUNCTION territory_stats_apply()
+    """,
+    # Remplissage initial : le trigger verrouille `archives` jusqu'au commit,
+    # aucune écriture ne peut se glisser entre le comptage et l'activation
+    """
+    INSERT INTO territory_archive_stats (territory_id, media_type, status, archive_count)
+    SELECT territory_id, media_type, status, count(*)
+      FROM archives
+     WHERE territory_id IS NOT NULL
+       AND NOT EXISTS (SELECT 1 FROM territory_archive_stats)
+     GROUP BY territory_id, media_type, status
+    """,
+]
+
+
+def _missing(table: str) -> bool:
+    # Mode hors ligne (`--sql`) : script pour une base vierge
+    if op.get_context().as_sql:
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table)
+
+
+def _timestamp(name: str, nullable: bool = False) -> sa.Column:
+    return sa.Column(name, sa.DateTime(timezone=True), nullable=nullable)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("full_name", sa.String(255), nullable=False),
+            sa.Column("organization", sa.String(255)),
+            sa.Column("role", sa.String(50), nullable=False),
+            sa.Column("language", sa.String(10), nullable=False),
+            sa.Column("is_active", sa.Boolean, nullable=False),
+            sa.Column("bio", sa.Text),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        )
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    if _missing("territories"):
+        op.create_table(
+            "territories",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("slug", sa.String(255), nullable=False),
+            sa.Column("country", sa.String(100), nullable=False),
+            sa.Column("region", sa.String(255)),
+            sa.Column("description", sa.Text),
+            sa.Column("latitude", sa.Float),
+            sa.Column("longitude", sa.Float),
+            sa.Column("context", sa.Text),
+            sa.Column("partner_institution", sa.String(500)),
+            _timestamp("created_at"),
+        )
+    op.create_index("ix_territories_name", "territories", ["name"], if_not_exists=True)
+    op.create_index("ix_territories_slug", "territories", ["slug"], unique=True, if_not_exists=True)
+
+    if _missing("archives"):
+        op.create_table(
+            "archives",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("title", sa.String(500), nullable=False),
+            sa.Column("slug", sa.String(500), nullable=False),
+            sa.Column("description", sa.Text),
+            sa.Column("media_type", sa.String(50), nullable=False),
+            sa.Column("file_key", sa.String(1000), nullable=False),
+            sa.Column("file_size_bytes", sa.Integer),
+            sa.Column("duration_seconds", sa.Float),
+            sa.Column("mime_type", sa.String(100)),
+            sa.Column("thumbnail_key", sa.String(1000)),
+            sa.Column("placeholder", sa.Text),
+            sa.Column("territory_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("territories.id")),
+            _timestamp("recording_date", nullable=True),
+            sa.Column("recording_location", sa.String(500)),
+            sa.Column("language_spoken", sa.String(50)),
+            sa.Column("tags", postgresql.ARRAY(sa.String)),
+            sa.Column("context_notes", sa.Text),
+            sa.Column("participants", postgresql.JSONB),
+            sa.Column("technical_notes", sa.Text),
+            sa.Column("license_type", sa.String(100), nullable=False),
+            sa.Column("rights_holder", sa.String(255)),
+            sa.Column("access_level", sa.String(50), nullable=False),
+            sa.Column("consent_obtained", sa.Boolean, nullable=False),
+            sa.Column("status", sa.String(50), nullable=False),
+            sa.Column("is_featured", sa.Boolean, nullable=False),
+            sa.Column("author_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("search_vector", postgresql.TSVECTOR),
+            _timestamp("created_at"),
+            _timestamp("updated_at"),
+        )
+    else:
+        # Colonne ajoutée après la création initiale des tables
+        op.execute("ALTER TABLE archives ADD COLUMN IF NOT EXISTS placeholder TEXT")
+    op.create_index("ix_archives_slug", "archives", ["slug"], unique=True, if_not_exists=True)
+    op.create_index("idx_archives_media_type", "archives", ["media_type"], if_not_exists=True)
+    op.create_index("idx_archives_status", "archives", ["status"], if_not_exists=True)
+    op.create_index("idx_archives_territory", "archives", ["territory_id"], if_not_exists=True)
+    op.create_index("idx_archives_tags", "archives", ["tags"], postgresql_using="gin", if_not_exists=True)
+    op.create_index(
+        "idx_archives_search", "archives", ["search_vector"], postgresql_using="gin", if_not_exists=True
+    )
+
+    if _missing("reports"):
+        op.create_table(
+            "reports",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "archive_id", postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("archives.id", ondelete="CASCADE"), nullable=False,
+            ),
+            sa.Column("reporter_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("reason", sa.Text, nullable=False),
+            sa.Column("status", sa.String(50), nullable=False),
+            _timestamp("created_at"),
+        )
+    op.create_index("idx_reports_archive", "reports", ["archive_id"], if_not_exists=True)
+    op.create_index("idx_reports_status", "reports", ["status"], if_not_exists=True)
+    op.create_index(
+        "idx_reports_status_archive", "reports", ["status", "archive_id", "created_at"], if_not_exists=True
+    )
+
+    if _missing("export_jobs"):
+        op.create_table(
+            "export_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("format", sa.String(20), nullable=False),
+            sa.Column("filters", postgresql.JSONB, nullable=False),
+            sa.Column("fingerprint", sa.String(64), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("file_key", sa.String(1000)),
+            sa.Column("row_count", sa.Integer),
+            sa.Column("size_bytes", sa.BigInteger),
+            sa.Column("error", sa.Text),
+            sa.Column("requested_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            _timestamp("created_at"),
+            _timestamp("finished_at", nullable=True),
+        )
+    op.create_index("idx_export_jobs_fingerprint", "export_jobs", ["fingerprint"], if_not_exists=True)
+
+    if _missing("archive_changes"):
+        op.create_table(
+            "archive_changes",
+            sa.Column("seq", sa.BigInteger, primary_key=True, autoincrement=True),
+            sa.Column("archive_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("op", sa.String(20), nullable=False),
+            sa.Column("txid", sa.BigInteger, nullable=False, server_default=sa.text("txid_current()")),
+            _timestamp("changed_at"),
+        )
+    op.create_index("idx_archive_changes_cursor", "archive_changes", ["txid", "seq"], if_not_exists=True)
+
+    if _missing("territory_archive_stats"):
+        op.create_table(
+            "territory_archive_stats",
+            sa.Column(
+                "territory_id", postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("territories.id", ondelete="CASCADE"), primary_key=True,
+            ),
+            sa.Column("media_type", sa.String(50), primary_key=True),
+            sa.Column("status", sa.String(50), primary_key=True),
+            sa.Column("archive_count", sa.Integer, nullable=False),
+        )
+    for statement in TERRITORY_STATS_SQL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_archives_territory_stats ON archives")
+    op.execute("DROP FUNCTION IF EXISTS territory_stats_apply()")
+    for table in (
+        "territory_archive_stats", "archive_changes", "export_jobs",
+        "reports", "archives", "territories", "users",
+    ):
+        op.drop_table(table)
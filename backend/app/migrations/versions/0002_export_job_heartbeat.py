@@ -0,0 +1,26 @@
+"""Battement des exports en cours (reprise des jobs orphelins).
+
+Révision : 0002
+Précédente : 0001
+Créée le : 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "export_jobs",
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("export_jobs", "heartbeat_at")
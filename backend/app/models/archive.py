@@ -32,6 +32,7 @@ class Archive(Base):
     duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
     mime_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
     thumbnail_key: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    placeholder: Mapped[str | None] = mapped_column(Text, nullable=True)  # data URI LQIP
 
     # ── Contextualisation ─────────────────────────
     territory_id: Mapped[uuid.UUID | None] = mapped_column(
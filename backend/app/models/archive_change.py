@@ -0,0 +1,34 @@
+"""Modèle ArchiveChange – journal append-only des modifications d'archives."""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, String, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class ArchiveChange(Base):
+    __tablename__ = "archive_changes"
+
+    seq: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+
+    # Pas de clé étrangère : l'entrée doit survivre à la suppression de l'archive
+    archive_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+
+    # Opération : create, update, delete, visibility
+    op: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    # Identifiant de la transaction d'écriture : le flux ne publie une entrée qu'une
+    # fois toutes les transactions plus anciennes terminées (aucune entrée manquée)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("txid_current()")
+    )
+
+    changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        Index("idx_archive_changes_cursor", "txid", "seq"),
+    )
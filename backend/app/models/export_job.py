@@ -0,0 +1,47 @@
+"""Modèle ExportJob – export asynchrone du catalogue (JSONL / Parquet)."""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, DateTime, Text, Integer, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    # Paramètres : format + mêmes filtres que l'export CSV
+    format: Mapped[str] = mapped_column(String(20), nullable=False)  # jsonl, parquet
+    filters: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    # Empreinte (format + filtres + périmètre de visibilité + version du catalogue)
+    # → un export identique est réutilisé tant qu'aucune archive n'a été modifiée
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    # Statut : pending, running, done, failed
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    file_key: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    row_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    requested_by: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Rafraîchi pendant l'exécution : un job « running » sans battement récent
+    # appartient à un processus mort et peut être repris
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_export_jobs_fingerprint", "fingerprint"),
+    )
@@ -44,4 +44,6 @@ class Report(Base):
     __table_args__ = (
         Index("idx_reports_archive", "archive_id"),
         Index("idx_reports_status", "status"),
+        # File de modération : regroupement par archive des signalements d'un statut
+        Index("idx_reports_status_archive", "status", "archive_id", "created_at"),
     )
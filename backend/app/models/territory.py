@@ -32,5 +32,5 @@ class Territory(Base):
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
 
-    # Relations
-    archives = relationship("Archive", back_populates="territory", lazy="selectin")
+    # Relations (jamais chargée implicitement : un territoire peut compter des milliers d'archives)
+    archives = relationship("Archive", back_populates="territory", lazy="noload")
@@ -0,0 +1,24 @@
+"""Modèle TerritoryArchiveStat – compteurs d'archives par territoire."""
+
+import uuid
+from sqlalchemy import Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class TerritoryArchiveStat(Base):
+    """Nombre d'archives par (territoire, type de média, statut).
+
+    Maintenu par un trigger sur `archives` dans la transaction même de
+    l'écriture (voir `app.services.territory_stats`).
+    """
+
+    __tablename__ = "territory_archive_stats"
+
+    territory_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("territories.id", ondelete="CASCADE"), primary_key=True
+    )
+    media_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    status: Mapped[str] = mapped_column(String(50), primary_key=True)
+    archive_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
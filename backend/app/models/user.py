@@ -35,4 +35,5 @@ class User(Base):
     )
 
     # Relations
-    archives = relationship("Archive", back_populates="author", lazy="selectin")
+    # Jamais chargée implicitement : chaque requête authentifiée charge l'utilisateur
+    archives = relationship("Archive", back_populates="author", lazy="noload")
@@ -91,6 +91,21 @@ class TerritoryResponse(BaseModel):
 
 class TerritoryWithStatsResponse(TerritoryResponse):
     archive_count: int = 0
+    counts_by_media_type: dict[str, int] = {}
+    counts_by_status: dict[str, int] = {}
+
+
+class MapFeature(BaseModel):
+    type: str = "Feature"
+    geometry: dict
+    properties: dict
+
+
+class MapFeatureCollection(BaseModel):
+    """GeoJSON : clusters (`cluster=true`, `point_count`) ou territoires isolés."""
+    type: str = "FeatureCollection"
+    zoom: int
+    features: list[MapFeature]
 
 
 # ── Archive ───────────────────────────────────────
@@ -127,6 +142,30 @@ class ArchiveUpdate(BaseModel):
     consent_obtained: Optional[bool] = None
     status: Optional[str] = None
 
+class ArchiveFilters(BaseModel):
+    media_type: Optional[str] = None
+    status: Optional[str] = None
+    territory_id: Optional[UUID] = None
+
+class BulkArchiveUpdate(BaseModel):
+    # Cible : liste d'identifiants et/ou mêmes filtres que la liste paginée
+    ids: Optional[list[UUID]] = Field(default=None, max_length=5000)
+    filters: Optional[ArchiveFilters] = None
+    # Opérations (toutes optionnelles, appliquées en une seule requête UPDATE)
+    add_tags: Optional[list[str]] = None
+    remove_tags: Optional[list[str]] = None
+    status: Optional[str] = Field(default=None, pattern="^(draft|review|published|archived)$")
+    access_level: Optional[str] = Field(default=None, pattern="^(public|partner|restricted|private)$")
+    territory_id: Optional[UUID] = None  # null explicite = retirer le territoire
+
+class BulkOutcome(BaseModel):
+    id: UUID
+    outcome: str  # updated, not_found, forbidden
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    results: list[BulkOutcome]
+
 class ArchiveResponse(BaseModel):
     id: UUID
     title: str
@@ -136,6 +175,7 @@ class ArchiveResponse(BaseModel):
     file_size_bytes: Optional[int]
     duration_seconds: Optional[float]
     mime_type: Optional[str]
+    placeholder: Optional[str] = None
     territory_id: Optional[UUID]
     recording_date: Optional[datetime]
     recording_location: Optional[str]
@@ -167,6 +207,81 @@ class ArchiveListResponse(BaseModel):
     page_size: int
 
 
+class MonthlyCount(BaseModel):
+    month: str  # AAAA-MM
+    count: int
+
+class ArchiveStatsResponse(BaseModel):
+    total: int
+    by_media_type: dict[str, int]
+    by_status: dict[str, int]
+    storage_bytes: int
+    total_duration_seconds: float
+    uploads_by_month: list[MonthlyCount]
+    recordings_by_month: list[MonthlyCount]
+
+
+class SpriteTile(BaseModel):
+    archive_id: UUID
+    x: int
+    y: int
+
+class SpriteResponse(BaseModel):
+    sprite_url: str
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    items: list[SpriteTile]
+
+
+class BundleResponse(BaseModel):
+    version: str
+    since: Optional[str] = None
+    archive_count: int
+    # False : bundle en préparation, consulter download_url jusqu'à obtenir le ZIP
+    ready: bool = True
+    download_url: str
+
+
+# ── Export asynchrone ─────────────────────────────
+
+class ExportJobCreate(BaseModel):
+    format: str = Field(default="jsonl", pattern="^(jsonl|parquet)$")
+    media_type: Optional[str] = None
+    status: Optional[str] = None
+    territory_id: Optional[UUID] = None
+
+class ExportJobResponse(BaseModel):
+    id: UUID
+    format: str
+    filters: dict
+    status: str
+    row_count: Optional[int]
+    size_bytes: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# ── Flux de changements ───────────────────────────
+
+class ArchiveChangeResponse(BaseModel):
+    archive_id: UUID
+    op: str
+    changed_at: datetime
+    archive: Optional[ArchiveResponse] = None
+
+class ChangeFeedResponse(BaseModel):
+    items: list[ArchiveChangeResponse]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
 # ── Search ────────────────────────────────────────
 
 class SearchQuery(BaseModel):
@@ -207,6 +322,97 @@ class ReportListResponse(BaseModel):
     total: int
 
 
+class ModerationQueueItem(BaseModel):
+    archive_id: UUID
+    archive_title: Optional[str] = None
+    archive_status: Optional[str] = None
+    report_count: int
+    latest_reason: str
+    first_reported_at: datetime
+    last_reported_at: datetime
+
+class ModerationQueueResponse(BaseModel):
+    items: list[ModerationQueueItem]
+    total: int
+    next_cursor: Optional[str] = None
+
+class BulkReportDismiss(BaseModel):
+    archive_ids: Optional[list[UUID]] = Field(default=None, max_length=1000)
+    report_ids: Optional[list[UUID]] = Field(default=None, max_length=1000)
+
+class BulkArchiveHide(BaseModel):
+    archive_ids: list[UUID] = Field(min_length=1, max_length=1000)
+
+class BulkModerationResponse(BaseModel):
+    count: int
+    ids: list[UUID]
+
+
+# ── Diagnostic (admin) ────────────────────────
+
+class SlowQueryResponse(BaseModel):
+    id: str
+    fingerprint: str
+    sql: str
+    bind_shape: list[str]
+    duration_ms: float
+    engine: str
+    path: Optional[str] = None
+    recorded_at: datetime
+    plan: Optional[str] = None
+
+class SlowQueryListResponse(BaseModel):
+    threshold_ms: float
+    items: list[SlowQueryResponse]
+
+class LoopStallResponse(BaseModel):
+    duration_ms: float
+    route: str
+    path: Optional[str] = None
+    stack: Optional[str] = None
+    recorded_at: datetime
+
+class LoopStallListResponse(BaseModel):
+    threshold_ms: float
+    items: list[LoopStallResponse]
+
+class TraceSummaryResponse(BaseModel):
+    trace_id: str
+    name: str
+    status: str
+    duration_ms: float
+    span_count: int
+    started_at_ns: int
+
+class TraceSpanResponse(BaseModel):
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    start_offset_ms: float
+    duration_ms: float
+    status: str
+    attributes: dict
+
+class TraceStageResponse(BaseModel):
+    name: str
+    count: int
+    total_ms: float
+
+class TraceResponse(BaseModel):
+    trace_id: str
+    spans: list[TraceSpanResponse]
+    stages: list[TraceStageResponse]
+
+class ProfileResponse(BaseModel):
+    id: str
+    kind: str
+    target: Optional[str] = None
+    status: str
+    duration_seconds: float
+    sample_count: int
+    created_at: datetime
+
+
 # ── Upload ────────────────────────────────────
 
 class UploadUrlRequest(BaseModel):
@@ -0,0 +1,79 @@
+"""Script de calcul des placeholders LQIP pour les archives existantes."""
+
+import asyncio
+from sqlalchemy import select, update
+from app.core.database import async_session
+from app.core.storage_dispatch import get_file_object
+from app.services.thumbnails import make_placeholder
+from app.models.archive import Archive
+
+# Importer pour enregistrer les modèles
+from app.models.user import User  # noqa
+from app.models.territory import Territory  # noqa
+from app.models.report import Report  # noqa
+
+BATCH_SIZE = 100
+
+
+def _read_source(key: str) -> bytes:
+    """Lire l'objet source (thumbnail ou image originale) depuis le stockage."""
+    return get_file_object(key)["Body"].read()
+
+
+async def backfill_placeholders():
+    print("\n🖼️  Calcul des placeholders LQIP manquants\n")
+
+    done = 0
+    failed = 0
+    last_id = None
+
+    while True:
+        async with async_session() as session:
+            query = (
+                select(Archive.id, Archive.thumbnail_key, Archive.file_key)
+                .where(Archive.placeholder.is_(None))
+                .where(
+                    Archive.thumbnail_key.is_not(None)
+                    | (Archive.media_type == "image")
+                )
+                .order_by(Archive.id)
+                .limit(BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.where(Archive.id > last_id)
+            rows = (await session.execute(query)).all()
+            if not rows:
+                break
+
+            for archive_id, thumbnail_key, file_key in rows:
+                last_id = archive_id
+                source_key = thumbnail_key or file_key
+                try:
+                    data = await asyncio.to_thread(_read_source, source_key)
+                except Exception as e:
+                    print(f"⚠️  {archive_id} : lecture impossible ({e})")
+                    failed += 1
+                    continue
+
+                placeholder = await asyncio.to_thread(make_placeholder, data)
+                if not placeholder:
+                    failed += 1
+                    continue
+
+                await session.execute(
+                    update(Archive)
+                    .where(Archive.id == archive_id)
+                    # Ne pas toucher updated_at : ce n'est pas une modification éditoriale
+                    .values(placeholder=placeholder, updated_at=Archive.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+                done += 1
+
+            await session.commit()
+        print(f"   … {done} archive(s) traitée(s)")
+
+    print(f"\n✅ Placeholders calculés : {done} (échecs : {failed})")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_placeholders())
@@ -0,0 +1,355 @@
+"""Script d'import en masse d'une collection (répertoire de fichiers + manifeste CSV/JSON).
+
+Usage :
+    python -m app.scripts.bulk_ingest /chemin/collection manifeste.csv --author admin@exemple.org
+
+Le manifeste contient une ligne par fichier : colonne `file` (chemin relatif au
+répertoire) obligatoire, puis les métadonnées optionnelles `title`, `description`,
+`media_type`, `recording_date`, `recording_location`, `language_spoken`, `tags`
+(séparés par des virgules), `context_notes`, `participants` (JSON), `license_type`,
+`rights_holder`, `access_level`, `consent_obtained`, `territory_id`.
+
+Pipeline : upload → probe/thumbnail → rattachement territoire (GPS, sinon lieu) → insertion par lots,
+chaque étape avec sa propre concurrence bornée. Les fichiers importés sont notés
+dans un fichier de reprise : relancer la commande après une interruption reprend
+là où elle s'était arrêtée.
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import mimetypes
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select, insert, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.storage_dispatch import upload_fileobj
+from app.services.thumbnails import generate_thumbnail
+from app.services.territory_matching import match_territory, TerritoryGrid
+from app.services.changes import record_archive_changes
+from app.services.slugs import slugify
+from app.models.user import User
+from app.models.archive import Archive
+from app.models.territory import Territory
+
+# Importer pour enregistrer les modèles
+from app.models.report import Report  # noqa
+
+settings = get_settings()
+
+_DONE = object()
+
+SEARCH_VECTOR_SQL = text("""
+    UPDATE archives SET search_vector =
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(context_notes, '')), 'C') ||
+        setweight(to_tsvector('french', coalesce(recording_location, '')), 'D')
+    WHERE id = ANY(:ids)
+""").bindparams(bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+def _extensions(value: str) -> set[str]:
+    return {e.strip().lower() for e in value.split(",") if e.strip()}
+
+
+MEDIA_TYPES_BY_EXTENSION = {
+    **{e: "video" for e in _extensions(settings.allowed_video_extensions)},
+    **{e: "audio" for e in _extensions(settings.allowed_audio_extensions)},
+    **{e: "image" for e in _extensions(settings.allowed_image_extensions)},
+}
+
+
+def load_manifest(path: Path) -> list[dict]:
+    if path.suffix.lower() == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def load_checkpoint(path: Path) -> tuple[str, set[str]]:
+    """Lire le fichier de reprise : (identifiant de l'import, fichiers déjà importés).
+
+    La première ligne `# import <uuid>` est créée au premier lancement et sert
+    d'espace de noms aux clés de stockage de cet import.
+    """
+    if not path.exists():
+        import_id = uuid.uuid4().hex
+        path.write_text(f"# import {import_id}\n", encoding="utf-8")
+        return import_id, set()
+    lines = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    import_id = lines[0].removeprefix("# import ").strip()
+    return import_id, set(lines[1:])
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "oui", "yes", "x")
+
+
+def _parse_tags(value) -> list[str] | None:
+    if isinstance(value, list):
+        return value or None
+    tags = [t.strip() for t in str(value or "").split(",") if t.strip()]
+    return tags or None
+
+
+class _Stats:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+
+    def report(self, prefix: str = "   …"):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        print(
+            f"{prefix} {self.done}/{self.total} importé(s), {self.failed} échec(s) – "
+            f"{self.done / elapsed:.1f} fichiers/s, "
+            f"{self.bytes / elapsed / 1048576:.1f} Mo/s"
+        )
+
+
+async def _run_stage(in_q: asyncio.Queue, out_q: asyncio.Queue, fn, workers: int, next_workers: int):
+    """Faire tourner `workers` tâches sur une étape puis signaler la fin à l'étape suivante."""
+    async def _worker():
+        while True:
+            ctx = await in_q.get()
+            if ctx is _DONE:
+                return
+            result = await fn(ctx)
+            if result is not None:
+                await out_q.put(result)
+
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    for _ in range(next_workers):
+        await out_q.put(_DONE)
+
+
+async def bulk_ingest(args):
+    root = Path(args.directory)
+    manifest_path = Path(args.manifest)
+    checkpoint_path = Path(args.checkpoint or f"{manifest_path}.checkpoint")
+
+    items = load_manifest(manifest_path)
+    import_id, already = load_checkpoint(checkpoint_path)
+    pending = [item for item in items if item.get("file") and item["file"] not in already]
+    print(f"\n📦 Import de {len(pending)} fichier(s) ({len(already)} déjà importé(s))\n")
+    if not pending:
+        return
+
+    async with async_session() as session:
+        author_id = (
+            await session.execute(select(User.id).where(User.email == args.author))
+        ).scalar_one_or_none()
+        if author_id is None:
+            print(f"❌ Utilisateur introuvable : {args.author}")
+            return
+        # Liste légère chargée une seule fois pour tout l'import
+        rows = (
+            await session.execute(
+                select(Territory.id, Territory.name, Territory.country, Territory.latitude, Territory.longitude)
+            )
+        ).all()
+        territories = [(t_id, name, country) for t_id, name, country, _lat, _lng in rows]
+        grid = TerritoryGrid(
+            ((t_id, lat, lng) for t_id, _name, _country, lat, lng in rows),
+            settings.territory_match_max_km,
+        )
+
+    stats = _Stats(len(pending))
+    upload_q: asyncio.Queue = asyncio.Queue(maxsize=args.upload_workers * 2)
+    media_q: asyncio.Queue = asyncio.Queue(maxsize=args.media_workers * 2)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=args.batch_size * 2)
+    failures: list[tuple[str, str]] = []
+
+    async def _feed():
+        for item in pending:
+            await upload_q.put({"item": item})
+        for _ in range(args.upload_workers):
+            await upload_q.put(_DONE)
+
+    async def _upload(ctx):
+        item = ctx["item"]
+        path = root / item["file"]
+        ext = path.suffix.lstrip(".").lower() or "bin"
+        media_type = item.get("media_type") or MEDIA_TYPES_BY_EXTENSION.get(ext, "document")
+        # Clé déterministe : une reprise réécrit le même objet au lieu d'en créer un orphelin
+        digest = hashlib.sha1(f"{import_id}/{item['file']}".encode("utf-8")).hexdigest()
+        object_key = f"{media_type}/{digest}.{ext}"
+        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        def _put():
+            with open(path, "rb") as f:
+                upload_fileobj(f, object_key, mime_type)
+            return path.stat().st_size
+
+        try:
+            size = await asyncio.to_thread(_put)
+        except Exception as e:
+            failures.append((item["file"], f"upload : {e}"))
+            stats.failed += 1
+            return None
+        ctx.update(path=path, media_type=media_type, object_key=object_key, mime_type=mime_type, size=size)
+        return ctx
+
+    async def _probe(ctx):
+        ctx["media_info"] = {}
+        if ctx["media_type"] in ("video", "image"):
+            try:
+                data = await asyncio.to_thread(ctx["path"].read_bytes)
+                ctx["media_info"] = await generate_thumbnail(ctx["media_type"], data, ctx["object_key"])
+            except Exception as e:
+                # Le thumbnail est facultatif : l'archive est importée sans
+                print(f"⚠️  {ctx['item']['file']} : thumbnail impossible ({e})")
+        return ctx
+
+    def _row(ctx) -> dict:
+        item = ctx["item"]
+        media_info = ctx["media_info"]
+        title = item.get("title") or Path(item["file"]).stem
+        territory_id = item.get("territory_id") or None
+        if territory_id:
+            territory_id = uuid.UUID(str(territory_id))
+        elif media_info.get("coordinates"):
+            territory_id = grid.nearest(*media_info["coordinates"])
+        if not territory_id and item.get("recording_location"):
+            territory_id = match_territory(item["recording_location"], territories)
+        participants = item.get("participants") or None
+        if isinstance(participants, str):
+            participants = json.loads(participants)
+        recording_date = item.get("recording_date") or None
+        if isinstance(recording_date, str):
+            recording_date = datetime.fromisoformat(recording_date)
+            if recording_date.tzinfo is None:
+                recording_date = recording_date.replace(tzinfo=timezone.utc)
+        return {
+            "id": uuid.uuid4(),
+            "title": title,
+            "slug": slugify(title),
+            "description": item.get("description") or None,
+            "media_type": ctx["media_type"],
+            "file_key": ctx["object_key"],
+            "file_size_bytes": ctx["size"],
+            "mime_type": ctx["mime_type"],
+            "thumbnail_key": media_info.get("thumbnail_key"),
+            "placeholder": media_info.get("placeholder"),
+            "duration_seconds": media_info.get("duration_seconds"),
+            "territory_id": territory_id,
+            "recording_date": recording_date,
+            "recording_location": item.get("recording_location") or None,
+            "language_spoken": item.get("language_spoken") or None,
+            "tags": _parse_tags(item.get("tags")),
+            "context_notes": item.get("context_notes") or None,
+            "participants": participants,
+            "license_type": item.get("license_type") or "all-rights-reserved",
+            "rights_holder": item.get("rights_holder") or None,
+            "access_level": item.get("access_level") or "restricted",
+            "consent_obtained": _parse_bool(item.get("consent_obtained")),
+            "author_id": author_id,
+            "status": args.status,
+        }
+
+    async def _flush(batch: list[dict]):
+        rows = []
+        files = []
+        for ctx in batch:
+            try:
+                rows.append(_row(ctx))
+                files.append(ctx["item"]["file"])
+            except Exception as e:
+                failures.append((ctx["item"]["file"], f"métadonnées : {e}"))
+                stats.failed += 1
+        if not rows:
+            return
+
+        async def _insert(session, batch_rows: list[dict]):
+            ids = [row["id"] for row in batch_rows]
+            # executemany : SQLAlchemy regroupe les lignes en INSERT multi-valeurs
+            await session.execute(insert(Archive), batch_rows)
+            await session.execute(SEARCH_VECTOR_SQL, {"ids": ids})
+            await record_archive_changes(session, ids, "create")
+
+        try:
+            async with async_session() as session:
+                await _insert(session, rows)
+                await session.commit()
+            inserted = list(zip(rows, files))
+        except (IntegrityError, DataError):
+            # Une ligne invalide (clé étrangère, valeur trop longue…) fait échouer
+            # tout le lot : reprise ligne à ligne, un savepoint chacune
+            inserted = []
+            async with async_session() as session:
+                for row, name in zip(rows, files):
+                    try:
+                        async with session.begin_nested():
+                            await _insert(session, [row])
+                    except (IntegrityError, DataError) as e:
+                        failures.append((name, f"insertion : {str(e.orig or e).splitlines()[0]}"))
+                        stats.failed += 1
+                    else:
+                        inserted.append((row, name))
+                await session.commit()
+
+        # Le point de reprise n'est écrit qu'une fois le lot committé
+        with open(checkpoint_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{name}\n" for _, name in inserted)
+        stats.done += len(inserted)
+        stats.bytes += sum(row["file_size_bytes"] or 0 for row, _ in inserted)
+        stats.report()
+
+    async def _write():
+        batch = []
+        finished = 0
+        while finished < args.media_workers:
+            ctx = await write_q.get()
+            if ctx is _DONE:
+                finished += 1
+                continue
+            batch.append(ctx)
+            if len(batch) >= args.batch_size:
+                await _flush(batch)
+                batch = []
+        if batch:
+            await _flush(batch)
+
+    await asyncio.gather(
+        _feed(),
+        _run_stage(upload_q, media_q, _upload, args.upload_workers, args.media_workers),
+        _run_stage(media_q, write_q, _probe, args.media_workers, args.media_workers),
+        _write(),
+    )
+
+    stats.report("\n✅ Terminé :")
+    for name, error in failures:
+        print(f"   ❌ {name} – {error}")
+    if failures:
+        print("   Relancer la commande pour réessayer les fichiers en échec.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import en masse d'une collection d'archives")
+    parser.add_argument("directory", help="Répertoire contenant les fichiers")
+    parser.add_argument("manifest", help="Manifeste CSV ou JSON")
+    parser.add_argument("--author", required=True, help="Email du compte auteur des archives")
+    parser.add_argument("--status", default="published", choices=["draft", "review", "published", "archived"])
+    parser.add_argument("--checkpoint", help="Fichier de reprise (défaut : <manifeste>.checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Lignes insérées par transaction")
+    parser.add_argument("--upload-workers", type=int, default=8, help="Uploads simultanés")
+    parser.add_argument("--media-workers", type=int, default=4, help="Probes/thumbnails simultanés")
+    asyncio.run(bulk_ingest(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Vérification du budget de démarrage d'un worker : temps d'import et mémoire.
+
+Importe `app.main` dans un processus neuf (plusieurs fois, meilleur essai retenu),
+mesure le temps d'import et le RSS maximal, et vérifie qu'aucune dépendance
+lourde chargée à la demande (Pillow, boto3, jose…) n'est importée au démarrage.
+Code de sortie 1 en cas de dépassement : utilisable en CI.
+
+Usage :
+    python -m app.scripts.import_budget [--max-seconds 2.0] [--max-rss-mb 100] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Importés au premier usage seulement (voir thumbnails, sprites, bundles, storage, security)
+LAZY_MODULES = (
+    "PIL", "boto3", "botocore", "jose", "bcrypt", "cryptography",
+    "pyarrow", "alembic", "httpx",
+)
+
+_PROBE = f"""
+import json, resource, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "lazy_loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(storage_backend: str) -> dict:
+    env = {**os.environ, "STORAGE_BACKEND": storage_backend, "PYTHONDONTWRITEBYTECODE": "1"}
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    parser.add_argument("--max-rss-mb", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    failures = []
+    for backend in ("local", "s3"):
+        runs = [measure(backend) for _ in range(args.runs)]
+        best = min(runs, key=lambda r: r["seconds"])
+        rss = max(r["rss_mb"] for r in runs)
+        print(
+            f"📦 STORAGE_BACKEND={backend} : import {best['seconds']:.2f} s, "
+            f"RSS {rss:.0f} Mo, {best['modules']} modules"
+        )
+        if best["seconds"] > args.max_seconds:
+            failures.append(f"{backend} : import {best['seconds']:.2f} s > {args.max_seconds} s")
+        if rss > args.max_rss_mb:
+            failures.append(f"{backend} : RSS {rss:.0f} Mo > {args.max_rss_mb:.0f} Mo")
+        if best["lazy_loaded"]:
+            failures.append(f"{backend} : importés au démarrage : {', '.join(best['lazy_loaded'])}")
+
+    if failures:
+        print("❌ Budget de démarrage dépassé :")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print("✅ Budget de démarrage respecté")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
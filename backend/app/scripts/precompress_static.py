@@ -0,0 +1,40 @@
+"""Script de pré-compression des assets du frontend buildé (.br / .gz)."""
+
+import gzip
+import mimetypes
+import sys
+from pathlib import Path
+
+from app.core.compression import brotli, is_compressible
+
+# En dessous, l'en-tête de compression coûte plus qu'il ne rapporte
+MIN_SIZE = 500
+
+
+def precompress(root: Path) -> None:
+    print(f"\n🗜️  Pré-compression des assets de {root}\n")
+    saved = 0
+    count = 0
+    for path in sorted(root.rglob("*")):
+        if not path.is_file() or path.suffix in (".br", ".gz"):
+            continue
+        content_type = mimetypes.guess_type(path.name)[0] or ""
+        if not is_compressible(content_type) or path.stat().st_size < MIN_SIZE:
+            continue
+
+        data = path.read_bytes()
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        path.with_name(path.name + ".gz").write_bytes(gz)
+        best = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            path.with_name(path.name + ".br").write_bytes(br)
+            best = min(best, len(br))
+        saved += len(data) - best
+        count += 1
+
+    print(f"✅ {count} fichier(s) pré-compressé(s), {saved // 1024} Ko économisés")
+
+
+if __name__ == "__main__":
+    precompress(Path(sys.argv[1] if len(sys.argv) > 1 else "/app/static"))
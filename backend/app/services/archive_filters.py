@@ -0,0 +1,61 @@
+"""Filtres de liste et règles de visibilité des archives, colonnes des exports.
+
+Partagés par les routes (liste, CSV, ZIP, flux de changements) et les exports
+asynchrones.
+"""
+
+import uuid
+from typing import Optional
+
+from app.models.archive import Archive
+from app.models.user import User
+
+# (attribut, libellé) : colonnes du CSV et champs des exports JSONL / Parquet
+CSV_COLUMNS = [
+    ("id", "ID"),
+    ("title", "Titre"),
+    ("slug", "Slug"),
+    ("description", "Description"),
+    ("media_type", "Type de média"),
+    ("mime_type", "Format MIME"),
+    ("file_size_bytes", "Taille (octets)"),
+    ("duration_seconds", "Durée (secondes)"),
+    ("recording_date", "Date d'enregistrement"),
+    ("recording_location", "Lieu d'enregistrement"),
+    ("language_spoken", "Langue"),
+    ("tags", "Tags"),
+    ("context_notes", "Notes de contexte"),
+    ("participants", "Participants"),
+    ("license_type", "Licence"),
+    ("rights_holder", "Titulaire des droits"),
+    ("access_level", "Niveau d'accès"),
+    ("consent_obtained", "Consentement"),
+    ("status", "Statut"),
+    ("territory_id", "Territoire (ID)"),
+    ("author_id", "Auteur (ID)"),
+    ("created_at", "Créé le"),
+    ("updated_at", "Modifié le"),
+]
+
+
+def apply_archive_filters(
+    query,
+    current_user: User,
+    media_type: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    territory_id: Optional[uuid.UUID] = None,
+):
+    """Appliquer les filtres de liste et les règles de visibilité à une requête."""
+    if media_type:
+        query = query.where(Archive.media_type == media_type)
+    if status_filter:
+        query = query.where(Archive.status == status_filter)
+    if territory_id:
+        query = query.where(Archive.territory_id == territory_id)
+
+    # Visibilité : published visible par tous, draft/review visible par auteur + admin
+    if current_user.role not in ("admin", "editor"):
+        query = query.where(
+            (Archive.status == "published") | (Archive.author_id == current_user.id)
+        )
+    return query
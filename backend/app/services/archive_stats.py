@@ -0,0 +1,119 @@
+"""Statistiques agrégées du catalogue pour le tableau de bord.
+
+Les agrégats sont calculés par portée de visibilité puis mis en cache :
+- « all » : tout le catalogue (admin / éditeur) ;
+- « published » : archives publiées, partagées par tous les contributeurs ;
+- « own:<id> » : archives non publiées d'un contributeur (ajoutées aux publiées).
+
+Le cache est invalidé par le journal des modifications : toute écriture sur une
+archive (création, modification, suppression, masquage) fait avancer sa version.
+"""
+
+from collections import Counter
+
+from sqlalchemy import select, func
+
+from app.core.metrics import cache_lookup
+from app.models.archive import Archive
+from app.models.user import User
+from app.services.changes import change_version
+
+# Au-delà, le cache des portées individuelles est vidé (pas de croissance illimitée)
+MAX_CACHED_SCOPES = 1000
+
+_cache: dict = {"version": None, "scopes": {}}
+
+
+async def _aggregate(db, *conditions) -> dict:
+    """Calculer les agrégats fusionnables d'un sous-ensemble d'archives."""
+    groups = (
+        await db.execute(
+            select(
+                Archive.media_type,
+                Archive.status,
+                func.count(Archive.id),
+                func.coalesce(func.sum(Archive.file_size_bytes), 0),
+                func.coalesce(func.sum(Archive.duration_seconds), 0.0),
+            )
+            .where(*conditions)
+            .group_by(Archive.media_type, Archive.status)
+        )
+    ).all()
+
+    async def _histogram(column) -> Counter:
+        month = func.to_char(func.date_trunc("month", column), "YYYY-MM")
+        rows = (
+            await db.execute(
+                select(month, func.count(Archive.id))
+                .where(column.is_not(None), *conditions)
+                .group_by(month)
+            )
+        ).all()
+        return Counter(dict(rows))
+
+    return {
+        "groups": {(m, s): (c, int(b), float(d)) for m, s, c, b, d in groups},
+        "uploads": await _histogram(Archive.created_at),
+        "recordings": await _histogram(Archive.recording_date),
+    }
+
+
+def _merge(*parts: dict) -> dict:
+    groups: dict = {}
+    uploads, recordings = Counter(), Counter()
+    for part in parts:
+        for key, (count, size, duration) in part["groups"].items():
+            c, b, d = groups.get(key, (0, 0, 0.0))
+            groups[key] = (c + count, b + size, d + duration)
+        uploads.update(part["uploads"])
+        recordings.update(part["recordings"])
+    return {"groups": groups, "uploads": uploads, "recordings": recordings}
+
+
+def _format(aggregates: dict) -> dict:
+    by_media_type, by_status = Counter(), Counter()
+    storage_bytes, duration = 0, 0.0
+    for (media_type, status), (count, size, seconds) in aggregates["groups"].items():
+        by_media_type[media_type] += count
+        by_status[status] += count
+        storage_bytes += size
+        duration += seconds
+    return {
+        "total": sum(by_media_type.values()),
+        "by_media_type": dict(by_media_type),
+        "by_status": dict(by_status),
+        "storage_bytes": storage_bytes,
+        "total_duration_seconds": round(duration, 1),
+        "uploads_by_month": [
+            {"month": m, "count": c} for m, c in sorted(aggregates["uploads"].items())
+        ],
+        "recordings_by_month": [
+            {"month": m, "count": c} for m, c in sorted(aggregates["recordings"].items())
+        ],
+    }
+
+
+async def _scope(db, key: str, *conditions) -> dict:
+    scopes = _cache["scopes"]
+    cache_lookup("archive_stats", key in scopes)
+    if key not in scopes:
+        if len(scopes) >= MAX_CACHED_SCOPES:
+            scopes.clear()
+        scopes[key] = await _aggregate(db, *conditions)
+    return scopes[key]
+
+
+async def archive_stats(db, user: User) -> dict:
+    """Statistiques visibles par `user`, servies depuis le cache tant que le catalogue n'a pas changé."""
+    version = await change_version(db)
+    if version != _cache["version"]:
+        _cache.update(version=version, scopes={})
+
+    if user.role in ("admin", "editor"):
+        return _format(await _scope(db, "all"))
+
+    published = await _scope(db, "published", Archive.status == "published")
+    own = await _scope(
+        db, f"own:{user.id}", Archive.author_id == user.id, Archive.status != "published"
+    )
+    return _format(_merge(published, own))
@@ -0,0 +1,163 @@
+"""Bundles de synchronisation hors ligne : métadonnées + mini-thumbnails en un seul ZIP.
+
+Un bundle est construit une fois, en tâche de fond (`enqueue_bundle`), stocké sous
+`bundles/<empreinte>.zip`, puis servi avec support des requêtes Range : un
+téléchargement interrompu reprend là où il s'était arrêté. La construction est
+dédupliquée par empreinte et bornée en concurrence (`BUNDLE_MAX_CONCURRENCY`) :
+une première synchronisation d'un territoire entier ne bloque pas la requête.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import tempfile
+import zipfile
+from io import BytesIO
+
+from app.core.config import get_settings
+from app.core.instrumentation import detach_request_metrics
+from app.core.metrics import cache_lookup
+from app.core.process_pool import run_cpu
+from app.core.storage_dispatch import upload_fileobj, get_file_object
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BUNDLE_THUMB_SIZE = (160, 90)
+BUNDLE_FETCH_CONCURRENCY = 8
+BUNDLE_MAX_CONCURRENCY = 2
+# Délai suggéré au client entre deux consultations d'un bundle en préparation
+BUNDLE_RETRY_AFTER_SECONDS = 5
+
+# Empreintes des bundles déjà présents dans le stockage
+_known_bundles: set[str] = set()
+
+_bundle_semaphore = asyncio.Semaphore(BUNDLE_MAX_CONCURRENCY)
+# Constructions en cours par empreinte (références fortes : sinon le GC peut les collecter)
+_building: dict[str, asyncio.Task] = {}
+
+
+def bundle_digest(filters: dict, scope: str, since: str | None, version: str, count: int) -> str:
+    payload = json.dumps(
+        {"filters": filters, "scope": scope, "since": since, "version": version, "count": count},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def bundle_key(digest: str) -> str:
+    return f"bundles/{digest}.zip"
+
+
+async def bundle_exists(digest: str) -> bool:
+    cache_lookup("bundles", digest in _known_bundles)
+    if digest in _known_bundles:
+        return True
+    try:
+        await asyncio.to_thread(get_file_object, bundle_key(digest), "bytes=0-0")
+    except Exception:
+        return False
+    _known_bundles.add(digest)
+    return True
+
+
+def _small_thumbnail(data: bytes) -> bytes | None:
+    """Réduire un thumbnail à la taille bundle (JPEG très compressé)."""
+    from PIL import Image
+
+    try:
+        img = Image.open(BytesIO(data))
+        img.draft("RGB", BUNDLE_THUMB_SIZE)
+        img.thumbnail(BUNDLE_THUMB_SIZE)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        buf = BytesIO()
+        img.save(buf, format="JPEG", quality=min(settings.thumbnail_quality, 50), optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return None
+
+
+def _read_object(object_key: str) -> bytes:
+    return get_file_object(object_key)["Body"].read()
+
+
+def _write_zip(fileobj, manifest: dict, thumbs: list[tuple[str, bytes]]):
+    with zipfile.ZipFile(fileobj, mode="w") as zf:
+        # Le JSON se compresse très bien ; les JPEG sont stockés tels quels
+        zf.writestr(
+            "manifest.json",
+            json.dumps(manifest, ensure_ascii=False, separators=(",", ":")),
+            compress_type=zipfile.ZIP_DEFLATED,
+            compresslevel=9,
+        )
+        for name, data in thumbs:
+            zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+
+
+async def build_bundle(digest: str, manifest: dict, thumb_sources: list[tuple[str, str]]):
+    """Construire le bundle et l'envoyer au stockage.
+
+    `thumb_sources` : liste de (archive_id, clé du thumbnail source).
+    """
+    semaphore = asyncio.Semaphore(BUNDLE_FETCH_CONCURRENCY)
+
+    async def _fetch(archive_id: str, object_key: str):
+        # Téléchargement et réduction sous le même sémaphore : au plus
+        # BUNDLE_FETCH_CONCURRENCY thumbnails pleine taille en mémoire
+        async with semaphore:
+            try:
+                source = await asyncio.to_thread(_read_object, object_key)
+            except Exception:
+                logger.warning("Thumbnail introuvable pour le bundle : %s", object_key)
+                return None
+            try:
+                data = await run_cpu(_small_thumbnail, source)
+            except Exception as e:
+                logger.warning("Réduction du thumbnail impossible pour le bundle : %s (%r)", object_key, e)
+                return None
+        return (f"thumbs/{archive_id}.jpg", data) if data else None
+
+    results = await asyncio.gather(*(_fetch(i, k) for i, k in thumb_sources))
+    thumbs = [r for r in results if r]
+
+    with tempfile.TemporaryFile() as tmp:
+        await asyncio.to_thread(_write_zip, tmp, manifest, thumbs)
+        tmp.seek(0)
+        await asyncio.to_thread(upload_fileobj, tmp, bundle_key(digest), "application/zip")
+
+    _known_bundles.add(digest)
+    logger.info("Bundle hors ligne généré : %s (%d thumbnails)", digest, len(thumbs))
+
+
+def bundle_building(digest: str) -> bool:
+    return digest in _building
+
+
+async def _run_bundle(digest: str, collect):
+    # Les requêtes SQL du bundle ne comptent pas dans le budget de la requête d'origine
+    detach_request_metrics()
+    with span("bundle.build", root=True, digest=digest):
+        async with _bundle_semaphore:
+            if await bundle_exists(digest):
+                return
+            try:
+                manifest, thumb_sources = await collect()
+                await build_bundle(digest, manifest, thumb_sources)
+            except Exception:
+                logger.exception("Bundle hors ligne %s échoué", digest)
+
+
+def enqueue_bundle(digest: str, collect):
+    """Planifier la construction d'un bundle, sauf si elle est déjà en cours.
+
+    `collect` : coroutine sans argument qui lit (manifeste, thumb_sources) dans sa
+    propre session ; celle de la requête est fermée avant la fin de la construction.
+    """
+    if digest in _building:
+        return
+    task = asyncio.create_task(_run_bundle(digest, collect))
+    _building[digest] = task
+    task.add_done_callback(lambda _: _building.pop(digest, None))
@@ -0,0 +1,68 @@
+"""Journal des modifications d'archives (flux de changements pour les partenaires)."""
+
+import base64
+import uuid
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.archive_change import ArchiveChange
+
+# Champs dont la modification change la visibilité d'une archive
+VISIBILITY_FIELDS = ("status", "access_level")
+
+
+async def record_archive_change(db: AsyncSession, archive_id: uuid.UUID, op: str):
+    """Journaliser une modification dans la transaction courante."""
+    await record_archive_changes(db, [archive_id], op)
+
+
+async def record_archive_changes(db: AsyncSession, archive_ids, op: str):
+    """Journaliser la même opération pour plusieurs archives (un seul INSERT)."""
+    rows = [{"archive_id": archive_id, "op": op} for archive_id in archive_ids]
+    if rows:
+        await db.execute(insert(ArchiveChange), rows)
+
+
+async def change_version(db) -> tuple[int | None, int | None]:
+    """Version du journal pour les caches en mémoire, sensible à l'ordre des commits.
+
+    `seq` est attribué avant le commit : une transaction qui prend N mais committe
+    après N+1 ne fait pas bouger `max(seq)`. Le second terme, plus grand txid
+    antérieur au xmin du snapshot (toutes les transactions plus anciennes sont
+    terminées), avance forcément quand cette entrée devient définitive.
+    """
+    xmin = func.txid_snapshot_xmin(func.txid_current_snapshot())
+    last_seq = select(func.max(ArchiveChange.seq)).scalar_subquery()
+    stable_txid = select(func.max(ArchiveChange.txid)).where(ArchiveChange.txid < xmin).scalar_subquery()
+    return tuple((await db.execute(select(last_seq, stable_txid))).one())
+
+
+async def stable_change_cursor(db) -> tuple[int, int]:
+    """Dernière position (txid, seq) définitive du journal : toute entrée ajoutée
+    ensuite se placera après elle. (0, 0) si le journal est vide."""
+    xmin = func.txid_snapshot_xmin(func.txid_current_snapshot())
+    row = (
+        await db.execute(
+            select(ArchiveChange.txid, ArchiveChange.seq)
+            .where(ArchiveChange.txid < xmin)
+            .order_by(ArchiveChange.txid.desc(), ArchiveChange.seq.desc())
+            .limit(1)
+        )
+    ).first()
+    return (row.txid, row.seq) if row else (0, 0)
+
+
+def change_op_for_update(update_data: dict) -> str:
+    return "visibility" if any(f in update_data for f in VISIBILITY_FIELDS) else "update"
+
+
+def encode_cursor(txid: int, seq: int) -> str:
+    return base64.urlsafe_b64encode(f"{txid}:{seq}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """Décoder un curseur opaque ; lève ValueError s'il est invalide."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    txid, seq = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+    return int(txid), int(seq)
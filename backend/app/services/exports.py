@@ -0,0 +1,273 @@
+"""Service d'export asynchrone du catalogue (JSONL compressé / Parquet).
+
+Les exports tournent en tâche de fond avec une concurrence bornée
+(`EXPORT_MAX_CONCURRENCY`) : un gros export ne monopolise ni le pool de
+connexions ni la boucle d'événements des requêtes interactives.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, and_, or_
+
+from app.core.config import get_settings
+from app.core.database import async_session, read_session
+from app.core.storage_dispatch import upload_fileobj
+from app.core.tracing import span
+from app.services.archive_filters import CSV_COLUMNS, apply_archive_filters
+from app.services.changes import encode_cursor, stable_change_cursor
+from app.models.archive import Archive
+from app.models.export_job import ExportJob
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# format → (extension, content-type)
+EXPORT_FORMATS = {
+    "jsonl": ("jsonl.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+EXPORT_FIELDS = [field for field, _ in CSV_COLUMNS]
+
+# Intervalle de rafraîchissement de `heartbeat_at` pendant un export
+EXPORT_HEARTBEAT_SECONDS = 30
+
+_export_semaphore = asyncio.Semaphore(settings.export_max_concurrency)
+# Références fortes vers les tâches en cours (sinon le GC peut les collecter)
+_running_tasks: set[asyncio.Task] = set()
+
+
+async def catalog_version(db) -> str:
+    """Version du catalogue : position définitive du journal des changements.
+
+    Ordonnée par commit (voir `stable_change_cursor`) : une transaction qui
+    committe après une autre plus récente fait quand même avancer la version,
+    ce que `count` + `max(updated_at)` (horodaté au flush) ne garantissait pas.
+    """
+    return encode_cursor(*await stable_change_cursor(db))
+
+
+def stale_before() -> datetime:
+    """Au-delà, un job « running » sans battement est considéré orphelin."""
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.export_stale_seconds)
+
+
+def reusable_job_filter():
+    """Jobs réutilisables pour une demande identique : en attente, terminés, ou en
+    cours avec un battement récent (un job orphelin ne se termine jamais)."""
+    return or_(
+        ExportJob.status.in_(("pending", "done")),
+        and_(ExportJob.status == "running", ExportJob.heartbeat_at >= stale_before()),
+    )
+
+
+def export_fingerprint(fmt: str, filters: dict, user: User, version: str) -> str:
+    """Empreinte d'un export : deux demandes identiques sur le même catalogue coïncident."""
+    scope = "all" if user.role in ("admin", "editor") else str(user.id)
+    payload = json.dumps(
+        {"format": fmt, "filters": filters, "scope": scope, "version": version},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _json_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _JsonlWriter:
+    def __init__(self, fileobj):
+        self._gz = gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6)
+
+    def write_batch(self, rows):
+        lines = [
+            json.dumps(
+                {field: _json_value(value) for field, value in zip(EXPORT_FIELDS, row)},
+                ensure_ascii=False,
+            )
+            for row in rows
+        ]
+        self._gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def close(self):
+        self._gz.close()
+
+
+class _ParquetWriter:
+    def __init__(self, fileobj):
+        # Import paresseux : pyarrow est lourd et inutile hors des exports
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        ts = pa.timestamp("us", tz="UTC")
+        types = {
+            "file_size_bytes": pa.int64(),
+            "duration_seconds": pa.float64(),
+            "recording_date": ts,
+            "tags": pa.list_(pa.string()),
+            "consent_obtained": pa.bool_(),
+            "created_at": ts,
+            "updated_at": ts,
+        }
+        self._schema = pa.schema([(f, types.get(f, pa.string())) for f in EXPORT_FIELDS])
+        self._writer = pq.ParquetWriter(fileobj, self._schema, compression="zstd")
+
+    def _column(self, field, values):
+        if field == "participants":
+            return [json.dumps(v, ensure_ascii=False) if v is not None else None for v in values]
+        if self._schema.field(field).type == self._pa.string():
+            return [str(v) if v is not None else None for v in values]
+        return list(values)
+
+    def write_batch(self, rows):
+        columns = list(zip(*rows))
+        arrays = [
+            self._pa.array(self._column(field, columns[i]), type=self._schema.field(field).type)
+            for i, field in enumerate(EXPORT_FIELDS)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _build_query(filters: dict, user: User):
+    territory_id = filters.get("territory_id")
+    columns = [getattr(Archive, field) for field in EXPORT_FIELDS]
+    query = apply_archive_filters(
+        select(*columns),
+        user,
+        filters.get("media_type"),
+        filters.get("status"),
+        uuid.UUID(territory_id) if territory_id else None,
+    )
+    return query.order_by(Archive.created_at.desc())
+
+
+async def _write_export(job: ExportJob, user: User) -> tuple[str, int, int]:
+    """Écrire l'export par lots dans un fichier temporaire puis l'envoyer au stockage."""
+    extension, content_type = EXPORT_FORMATS[job.format]
+    object_key = f"exports/{job.id}.{extension}"
+    query = _build_query(job.filters or {}, user)
+    row_count = 0
+
+    with tempfile.TemporaryFile() as tmp:
+        writer_cls = _ParquetWriter if job.format == "parquet" else _JsonlWriter
+        writer = await asyncio.to_thread(writer_cls, tmp)
+
+        # Lecture en continu sur un réplica : l'export ne charge pas le primaire
+        async with read_session() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=settings.export_batch_size)
+            )
+            async for partition in result.partitions():
+                # Sérialisation hors de la boucle d'événements
+                await asyncio.to_thread(writer.write_batch, partition)
+                row_count += len(partition)
+
+        await asyncio.to_thread(writer.close)
+        size = tmp.seek(0, 2)
+        tmp.seek(0)
+        await asyncio.to_thread(upload_fileobj, tmp, object_key, content_type)
+
+    return object_key, row_count, size
+
+
+async def _run_export(job_id: uuid.UUID):
+    # Rattaché à la trace de la requête qui l'a créé ; nouvelle trace à la reprise au démarrage
+    with span("export.run", root=True, job_id=str(job_id)):
+        await _run_export_job(job_id)
+
+
+async def _heartbeat(job_id: uuid.UUID):
+    """Rafraîchir `heartbeat_at` tant que l'export tourne (lecture, écriture, upload)."""
+    while True:
+        await asyncio.sleep(EXPORT_HEARTBEAT_SECONDS)
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    update(ExportJob)
+                    .where(ExportJob.id == job_id, ExportJob.status == "running")
+                    .values(heartbeat_at=datetime.now(timezone.utc))
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning("Battement de l'export %s impossible : %s", job_id, e)
+
+
+async def _run_export_job(job_id: uuid.UUID):
+    async with _export_semaphore:
+        async with async_session() as session:
+            # Réclamation atomique : un seul worker exécute un job donné
+            claimed = await session.execute(
+                update(ExportJob)
+                .where(ExportJob.id == job_id, ExportJob.status == "pending")
+                .values(status="running", heartbeat_at=datetime.now(timezone.utc))
+                .returning(ExportJob.id)
+            )
+            if claimed.scalar_one_or_none() is None:
+                return
+            await session.commit()
+            job = await session.get(ExportJob, job_id)
+            user = await session.get(User, job.requested_by)
+
+        heartbeat = asyncio.create_task(_heartbeat(job_id))
+        try:
+            object_key, row_count, size = await _write_export(job, user)
+            values = {"status": "done", "file_key": object_key, "row_count": row_count, "size_bytes": size}
+            logger.info("Export %s terminé : %d lignes, %d octets", job_id, row_count, size)
+        except Exception as e:
+            logger.exception("Export %s échoué", job_id)
+            values = {"status": "failed", "error": str(e)[:1000]}
+        finally:
+            heartbeat.cancel()
+        values["finished_at"] = datetime.now(timezone.utc)
+
+        async with async_session() as session:
+            await session.execute(
+                update(ExportJob).where(ExportJob.id == job_id).values(**values)
+            )
+            await session.commit()
+
+
+def enqueue_export(job_id: uuid.UUID):
+    """Planifier l'exécution d'un export en tâche de fond."""
+    task = asyncio.create_task(_run_export(job_id))
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+
+
+async def resume_pending_exports():
+    """Relancer les exports restés en attente et ceux dont le processus est mort
+    en cours d'exécution (« running » sans battement récent)."""
+    async with async_session() as session:
+        orphaned = await session.execute(
+            update(ExportJob)
+            .where(
+                ExportJob.status == "running",
+                or_(ExportJob.heartbeat_at.is_(None), ExportJob.heartbeat_at < stale_before()),
+            )
+            .values(status="pending", heartbeat_at=None)
+            .returning(ExportJob.id)
+        )
+        for job_id in orphaned.scalars().all():
+            logger.warning("Export %s orphelin remis en file", job_id)
+        await session.commit()
+        result = await session.execute(
+            select(ExportJob.id).where(ExportJob.status == "pending")
+        )
+        for job_id in result.scalars().all():
+            enqueue_export(job_id)
@@ -0,0 +1,195 @@
+"""Index de clusters cartographiques des territoires (grille Web Mercator par zoom).
+
+Chaque territoire géolocalisé est rangé, pour chaque niveau de zoom, dans une
+cellule de `CELL_PIXELS` pixels. Une cellule cumule le nombre de territoires,
+le nombre d'archives et la somme des coordonnées (centroïde du cluster).
+
+L'index vit en mémoire et n'est mis à jour qu'au changement de version (catalogue
+des territoires ou journal des modifications d'archives) : seuls les territoires
+dont la position ou le compteur a changé sont retirés puis réinsérés.
+"""
+
+import asyncio
+import math
+import time
+
+from sqlalchemy import select, func
+
+from app.core.metrics import cache_lookup
+from app.models.territory_stat import TerritoryArchiveStat
+from app.services.changes import change_version
+from app.services.territory_stats import territory_catalog
+
+MAX_CLUSTER_ZOOM = 16
+TILE_PIXELS = 256
+CELL_PIXELS = 64
+MAX_LATITUDE = 85.05112878
+
+# Délai minimal entre deux vérifications de version (le déplacement de la carte
+# enchaîne les requêtes : l'index est servi sans aller-retour base entre-temps)
+VERSION_CHECK_INTERVAL = 2.0
+
+
+def _project(lat: float, lng: float) -> tuple[float, float]:
+    """Coordonnées Web Mercator normalisées dans [0, 1]."""
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    x = (lng + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def _cells_per_axis(zoom: int) -> int:
+    return (1 << zoom) * (TILE_PIXELS // CELL_PIXELS)
+
+
+def _cell(x: float, y: float, zoom: int) -> tuple[int, int]:
+    n = _cells_per_axis(zoom)
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+
+class _Cell:
+    __slots__ = ("members", "archives", "lat_sum", "lng_sum")
+
+    def __init__(self):
+        self.members: set[str] = set()
+        self.archives = 0
+        self.lat_sum = 0.0
+        self.lng_sum = 0.0
+
+
+class ClusterIndex:
+    def __init__(self):
+        self.version = None
+        self.checked_at = 0.0
+        # territory_id → (lat, lng, x, y, archive_count, propriétés)
+        self.points: dict[str, tuple] = {}
+        self.grids: list[dict[tuple[int, int], _Cell]] = [{} for _ in range(MAX_CLUSTER_ZOOM + 1)]
+        self.lock = asyncio.Lock()
+
+    @staticmethod
+    def _keys(x: float, y: float):
+        """Cellule du point à chaque zoom (décalage binaire depuis le zoom maximal)."""
+        cx, cy = _cell(x, y, MAX_CLUSTER_ZOOM)
+        return [(cx >> (MAX_CLUSTER_ZOOM - z), cy >> (MAX_CLUSTER_ZOOM - z)) for z in range(MAX_CLUSTER_ZOOM + 1)]
+
+    def _add(self, territory_id: str, point: tuple):
+        lat, lng, x, y, count, _props = point
+        for grid, key in zip(self.grids, self._keys(x, y)):
+            cell = grid.get(key)
+            if cell is None:
+                cell = grid[key] = _Cell()
+            cell.members.add(territory_id)
+            cell.archives += count
+            cell.lat_sum += lat
+            cell.lng_sum += lng
+        self.points[territory_id] = point
+
+    def _remove(self, territory_id: str):
+        lat, lng, x, y, count, _props = self.points.pop(territory_id)
+        for grid, key in zip(self.grids, self._keys(x, y)):
+            cell = grid[key]
+            cell.members.discard(territory_id)
+            if not cell.members:
+                del grid[key]
+                continue
+            cell.archives -= count
+            cell.lat_sum -= lat
+            cell.lng_sum -= lng
+
+    def apply(self, points: dict[str, tuple]):
+        """Mettre l'index en conformité avec `points` en ne touchant que les différences."""
+        for territory_id in [t for t in self.points if t not in points]:
+            self._remove(territory_id)
+        for territory_id, point in points.items():
+            current = self.points.get(territory_id)
+            if current == point:
+                continue
+            if current is not None:
+                self._remove(territory_id)
+            self._add(territory_id, point)
+
+    def _cells_in_bbox(self, zoom: int, west: float, south: float, east: float, north: float):
+        grid = self.grids[zoom]
+        x0, y1 = _project(south, west)
+        x1, y0 = _project(north, east)
+        cx0, cy0 = _cell(x0, y0, zoom)
+        cx1, cy1 = _cell(x1, y1, zoom)
+        # Boîte à cheval sur l'antiméridien : deux plages en x
+        x_ranges = [(cx0, cx1)] if west <= east else [(cx0, _cells_per_axis(zoom) - 1), (0, cx1)]
+
+        area = sum(hi - lo + 1 for lo, hi in x_ranges) * (cy1 - cy0 + 1)
+        if area <= len(grid):
+            for lo, hi in x_ranges:
+                for cx in range(lo, hi + 1):
+                    for cy in range(cy0, cy1 + 1):
+                        cell = grid.get((cx, cy))
+                        if cell is not None:
+                            yield cell
+        else:
+            for (cx, cy), cell in grid.items():
+                if cy0 <= cy <= cy1 and any(lo <= cx <= hi for lo, hi in x_ranges):
+                    yield cell
+
+    def features(self, zoom: int, bbox: tuple[float, float, float, float]) -> list[dict]:
+        zoom = max(0, min(zoom, MAX_CLUSTER_ZOOM))
+        features = []
+        for cell in self._cells_in_bbox(zoom, *bbox):
+            size = len(cell.members)
+            if size == 1:
+                territory_id = next(iter(cell.members))
+                lat, lng, _x, _y, count, props = self.points[territory_id]
+                properties = {"cluster": False, "territory_id": territory_id, "archive_count": count, **dict(props)}
+            else:
+                lat, lng = cell.lat_sum / size, cell.lng_sum / size
+                properties = {"cluster": True, "point_count": size, "archive_count": cell.archives}
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(lng, 6), round(lat, 6)]},
+                "properties": properties,
+            })
+        return features
+
+
+_index = ClusterIndex()
+
+
+async def _current_version(db) -> tuple:
+    last_change = await change_version(db)
+    etag, _items, _body = await territory_catalog(db)
+    return etag, last_change
+
+
+async def _load_points(db) -> dict[str, tuple]:
+    _etag, items, _body = await territory_catalog(db)
+    result = await db.execute(
+        select(TerritoryArchiveStat.territory_id, func.sum(TerritoryArchiveStat.archive_count))
+        .group_by(TerritoryArchiveStat.territory_id)
+    )
+    totals = {str(territory_id): int(total or 0) for territory_id, total in result.all()}
+    points = {}
+    for item in items:
+        lat, lng = item.get("latitude"), item.get("longitude")
+        if lat is None or lng is None:
+            continue
+        x, y = _project(lat, lng)
+        props = (("name", item["name"]), ("country", item["country"]), ("region", item["region"]))
+        points[item["id"]] = (lat, lng, x, y, totals.get(item["id"], 0), props)
+    return points
+
+
+async def cluster_index(db) -> ClusterIndex:
+    """Retourner l'index à jour (mise à jour incrémentale si la version a changé)."""
+    if time.monotonic() - _index.checked_at < VERSION_CHECK_INTERVAL and _index.version is not None:
+        return _index
+    async with _index.lock:
+        if time.monotonic() - _index.checked_at < VERSION_CHECK_INTERVAL and _index.version is not None:
+            return _index
+        version = await _current_version(db)
+        cache_lookup("map_clusters", version == _index.version)
+        if version != _index.version:
+            points = await _load_points(db)
+            _index.apply(points)
+            _index.version = version
+        _index.checked_at = time.monotonic()
+    return _index
@@ -0,0 +1,12 @@
+"""Slugs des archives, partagés par les routes et l'ingestion en masse."""
+
+import re
+import uuid
+
+
+def slugify(text: str) -> str:
+    """Générer un slug à partir d'un titre."""
+    slug = text.lower().strip()
+    slug = re.sub(r"[^\w\s-]", "", slug)
+    slug = re.sub(r"[-\s]+", "-", slug)
+    return f"{slug}-{uuid.uuid4().hex[:8]}"
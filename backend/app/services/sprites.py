@@ -0,0 +1,112 @@
+"""Service de planches contact : une page de thumbnails composée en une seule image."""
+
+import asyncio
+import hashlib
+import logging
+import math
+from io import BytesIO
+
+from app.core.config import get_settings
+from app.core.metrics import MEDIA_DURATION, cache_lookup
+from app.core.process_pool import run_cpu
+from app.core.tracing import span
+from app.core.storage_dispatch import upload_file, get_file_object
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TILE_WIDTH = 160
+TILE_HEIGHT = 90
+SPRITE_COLUMNS = 10
+SPRITE_FETCH_CONCURRENCY = 8
+
+# Clés de sprites déjà présentes dans le stockage (évite un aller-retour par requête)
+_known_sprites: set[str] = set()
+
+
+def sprite_hash(entries: list[tuple[str, str]]) -> str:
+    """Calculer l'empreinte d'une planche à partir des couples (archive_id, thumbnail_key).
+
+    Une clé de thumbnail étant immuable (uuid), l'empreinte change dès qu'une
+    archive de la page change de thumbnail.
+    """
+    h = hashlib.sha256(f"{TILE_WIDTH}x{TILE_HEIGHT}:{SPRITE_COLUMNS}:{settings.thumbnail_quality}".encode())
+    for archive_id, key in entries:
+        h.update(f"|{archive_id}={key}".encode())
+    return h.hexdigest()[:32]
+
+
+def sprite_key(digest: str) -> str:
+    return f"sprites/{digest}.jpg"
+
+
+def sprite_layout(count: int) -> tuple[int, int]:
+    """Retourner (colonnes, lignes) pour une planche de `count` tuiles."""
+    columns = max(1, min(SPRITE_COLUMNS, count))
+    rows = max(1, math.ceil(count / columns))
+    return columns, rows
+
+
+def _read_object(key: str) -> bytes:
+    return get_file_object(key)["Body"].read()
+
+
+def _compose(sources: list[bytes | None]) -> bytes:
+    """Coller les thumbnails dans une grille et encoder la planche en JPEG."""
+    from PIL import Image
+
+    columns, rows = sprite_layout(len(sources))
+    sheet = Image.new("RGB", (columns * TILE_WIDTH, rows * TILE_HEIGHT), (0, 0, 0))
+    for index, data in enumerate(sources):
+        if not data:
+            continue
+        try:
+            tile = Image.open(BytesIO(data))
+            tile.draft("RGB", (TILE_WIDTH, TILE_HEIGHT))
+            tile.thumbnail((TILE_WIDTH, TILE_HEIGHT))
+            if tile.mode != "RGB":
+                tile = tile.convert("RGB")
+        except Exception:
+            logger.warning("Thumbnail illisible ignoré dans la planche (index %d)", index)
+            continue
+        x = (index % columns) * TILE_WIDTH + (TILE_WIDTH - tile.width) // 2
+        y = (index // columns) * TILE_HEIGHT + (TILE_HEIGHT - tile.height) // 2
+        sheet.paste(tile, (x, y))
+
+    buf = BytesIO()
+    sheet.save(buf, format="JPEG", quality=settings.thumbnail_quality, optimize=True)
+    return buf.getvalue()
+
+
+async def ensure_sprite(entries: list[tuple[str, str]]) -> str:
+    """Composer (si nécessaire) la planche correspondant aux entrées et retourner son empreinte."""
+    digest = sprite_hash(entries)
+    key = sprite_key(digest)
+    cache_lookup("sprites", digest in _known_sprites)
+    if digest in _known_sprites:
+        return digest
+
+    try:
+        await asyncio.to_thread(get_file_object, key, "bytes=0-0")
+        _known_sprites.add(digest)
+        return digest
+    except Exception:
+        pass
+
+    semaphore = asyncio.Semaphore(SPRITE_FETCH_CONCURRENCY)
+
+    async def _fetch(thumb_key: str) -> bytes | None:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_read_object, thumb_key)
+            except Exception:
+                logger.warning("Thumbnail introuvable pour la planche : %s", thumb_key)
+                return None
+
+    sources = await asyncio.gather(*(_fetch(k) for _, k in entries))
+    with MEDIA_DURATION.time("pillow_sprite"), span("media.pillow_sprite"):
+        sprite_data = await run_cpu(_compose, list(sources))
+    await upload_file(sprite_data, key, "image/jpeg")
+    _known_sprites.add(digest)
+    logger.info("Planche contact générée : %s (%d tuiles)", key, len(entries))
+    return digest
@@ -0,0 +1,96 @@
+"""Rattachement automatique d'une archive à un territoire d'après le lieu d'enregistrement."""
+
+import math
+import unicodedata
+import uuid
+from typing import Iterable
+
+
+def strip_accents(value: str) -> str:
+    """Minuscules sans diacritiques (« Île-de-France » → « ile-de-france »)."""
+    value = unicodedata.normalize("NFD", value.lower())
+    return "".join(c for c in value if unicodedata.category(c) != "Mn")
+
+
+def match_territory(
+    location: str, territories: Iterable[tuple[uuid.UUID, str, str]]
+) -> uuid.UUID | None:
+    """Trouver le territoire dont le nom correspond le mieux au lieu.
+
+    `territories` : couples (id, nom, pays). « nom, pays » trouvé tel quel dans le
+    lieu l'emporte sur le nom seul ; à égalité, le nom le plus long gagne.
+    """
+    loc = strip_accents(location)
+    best_match = None
+    best_score = 0
+    for territory_id, name, country in territories:
+        t_name = strip_accents(name)
+        t_country = strip_accents(country)
+        if t_name in loc or loc.startswith(t_name):
+            score = len(t_name)
+            if score > best_score:
+                best_score = score
+                best_match = territory_id
+        full = f"{t_name}, {t_country}"
+        if full in loc:
+            score = len(full) + 100
+            if score > best_score:
+                best_score = score
+                best_match = territory_id
+    return best_match
+
+
+# ── Rattachement par coordonnées GPS ──────────────
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class TerritoryGrid:
+    """Index spatial des centroïdes de territoires : grille de cases lat/lng.
+
+    Les cases mesurent `max_km` en latitude ; une recherche n'examine que les
+    cases voisines susceptibles de contenir un territoire à moins de `max_km`,
+    quel que soit le nombre total de territoires.
+    """
+
+    def __init__(self, territories: Iterable[tuple[uuid.UUID, float, float]], max_km: float):
+        self.max_km = max_km
+        # Taille de case divisant 360° : les colonnes se referment sur l'antiméridien.
+        # Arrondi inférieur : une case n'est jamais plus petite que le rayon, sinon
+        # un territoire à moins de `max_km` pourrait se trouver deux rangées plus loin
+        self.columns = max(1, math.floor(360 / max(max_km / KM_PER_DEGREE, 1e-3)))
+        self.cell_deg = 360 / self.columns
+        self.cells: dict[tuple[int, int], list[tuple[uuid.UUID, float, float]]] = {}
+        for territory_id, lat, lng in territories:
+            if lat is None or lng is None:
+                continue
+            self.cells.setdefault(self._key(lat, lng), []).append((territory_id, lat, lng))
+
+    def _key(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg) % self.columns
+
+    def nearest(self, lat: float, lng: float) -> uuid.UUID | None:
+        """Territoire le plus proche à moins de `max_km`, sinon None."""
+        row, col = self._key(lat, lng)
+        # En longitude, une case rétrécit avec cos(latitude) : élargir la fenêtre
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_deg, 90.0))), 1e-6)
+        span = min(math.ceil(1 / cos_lat), self.columns // 2)
+        columns = {(col + offset) % self.columns for offset in range(-span, span + 1)}
+
+        best_id, best_km = None, self.max_km
+        for r in (row - 1, row, row + 1):
+            for c in columns:
+                for territory_id, t_lat, t_lng in self.cells.get((r, c), ()):
+                    distance = haversine_km(lat, lng, t_lat, t_lng)
+                    if distance <= best_km:
+                        best_id, best_km = territory_id, distance
+        return best_id
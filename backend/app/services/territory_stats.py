@@ -0,0 +1,111 @@
+"""Statistiques par territoire et catalogue des territoires mis en cache.
+
+Les compteurs `territory_archive_stats` sont tenus à jour par un trigger sur
+`archives` : chaque insertion, suppression ou changement de territoire, de type
+ou de statut ajuste le compteur dans la même transaction. Les pages territoires
+ne parcourent donc plus la table des archives. Le trigger est installé par la
+migration initiale (`app/migrations/versions/0001_initial_schema.py`).
+
+Le catalogue (liste des territoires sans statistiques) est sérialisé une fois
+par version et conservé en mémoire ; la version change à chaque création de
+territoire.
+"""
+
+import hashlib
+import json
+import uuid
+
+from sqlalchemy import select, func
+
+from app.core.config import get_settings
+from app.core.metrics import cache_lookup
+from app.models.territory import Territory
+from app.models.territory_stat import TerritoryArchiveStat
+from app.schemas.schemas import TerritoryResponse
+from app.services.territory_matching import TerritoryGrid
+
+settings = get_settings()
+
+# ── Catalogue en cache ────────────────────────────
+
+# Dernière version chargée, son ETag, la liste sérialisée et le corps JSON
+_catalog_cache: dict = {"version": None, "etag": None, "items": [], "body": b"[]", "grid": None}
+
+_CATALOG_COLUMNS = [getattr(Territory, name) for name in TerritoryResponse.model_fields]
+
+
+async def _catalog_version(db) -> str:
+    count, last_created = (
+        await db.execute(select(func.count(Territory.id), func.max(Territory.created_at)))
+    ).one()
+    return f"{count}:{last_created.isoformat() if last_created else '-'}"
+
+
+def etag_for(payload: bytes) -> str:
+    return f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+
+async def territory_catalog(db) -> tuple[str, list[dict], bytes]:
+    """Retourner (etag, territoires, corps JSON) en ne relisant la table qu'au changement de version."""
+    version = await _catalog_version(db)
+    cache_lookup("territory_catalog", _catalog_cache["version"] == version)
+    if _catalog_cache["version"] != version:
+        rows = (
+            await db.execute(select(*_CATALOG_COLUMNS).order_by(Territory.name))
+        ).all()
+        items = [
+            TerritoryResponse.model_validate(row._mapping).model_dump(mode="json")
+            for row in rows
+        ]
+        body = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        _catalog_cache.update(version=version, etag=etag_for(body), items=items, body=body, grid=None)
+    return _catalog_cache["etag"], _catalog_cache["items"], _catalog_cache["body"]
+
+
+async def territory_grid(db) -> TerritoryGrid:
+    """Index spatial des territoires, reconstruit seulement quand le catalogue change."""
+    _etag, items, _body = await territory_catalog(db)
+    cache_lookup("territory_grid", _catalog_cache["grid"] is not None)
+    if _catalog_cache["grid"] is None:
+        _catalog_cache["grid"] = TerritoryGrid(
+            ((uuid.UUID(t["id"]), t["latitude"], t["longitude"]) for t in items),
+            settings.territory_match_max_km,
+        )
+    return _catalog_cache["grid"]
+
+
+def invalidate_territory_catalog():
+    _catalog_cache["version"] = None
+
+
+async def territory_stats(db) -> list[dict]:
+    """Catalogue enrichi des compteurs : O(territoires), indépendant du nombre d'archives."""
+    _etag, items, _body = await territory_catalog(db)
+    rows = (
+        await db.execute(
+            select(
+                TerritoryArchiveStat.territory_id,
+                TerritoryArchiveStat.media_type,
+                TerritoryArchiveStat.status,
+                TerritoryArchiveStat.archive_count,
+            ).where(TerritoryArchiveStat.archive_count > 0)
+        )
+    ).all()
+
+    counts: dict[str, dict] = {}
+    for territory_id, media_type, status, count in rows:
+        entry = counts.setdefault(str(territory_id), {"total": 0, "media": {}, "status": {}})
+        entry["total"] += count
+        entry["media"][media_type] = entry["media"].get(media_type, 0) + count
+        entry["status"][status] = entry["status"].get(status, 0) + count
+
+    territories = []
+    for item in items:
+        entry = counts.get(item["id"], {"total": 0, "media": {}, "status": {}})
+        territories.append({
+            **item,
+            "archive_count": entry["total"],
+            "counts_by_media_type": entry["media"],
+            "counts_by_status": entry["status"],
+        })
+    return territories
@@ -1,28 +1,123 @@
-"""Service de génération de thumbnails pour vidéos et images."""
+"""Service de génération de thumbnails pour vidéos et images.
+
+Le travail Pillow (décodage, redimensionnement, placeholder) s'exécute dans le
+pool de processus (`run_cpu`) : le processus API ne charge pas Pillow et le
+décodage d'une grosse image ne prend pas le GIL des requêtes.
+"""
 
 import asyncio
+import base64
 import json
 import logging
+import re
 import subprocess
 import tempfile
 import uuid
 from io import BytesIO
 from pathlib import Path
-
-from PIL import Image
+from typing import TYPE_CHECKING
 
 from app.core.config import get_settings
+from app.core.metrics import MEDIA_DURATION
+from app.core.process_pool import run_cpu
+from app.core.tracing import span
 from app.core.storage_dispatch import upload_file
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 THUMB_WIDTH = 640
 THUMB_HEIGHT = 360
 
+# Placeholder basse qualité (LQIP) inliné dans les réponses JSON (~300 octets)
+PLACEHOLDER_SIZE = (16, 9)
+PLACEHOLDER_QUALITY = 30
+
+
+def _build_placeholder(img: "Image.Image") -> str:
+    """Réduire une image déjà décodée en data URI WebP minuscule."""
+    small = img.copy()
+    small.thumbnail(PLACEHOLDER_SIZE)
+    if small.mode not in ("RGB", "L"):
+        small = small.convert("RGB")
+    buf = BytesIO()
+    small.save(buf, format="WEBP", quality=PLACEHOLDER_QUALITY, method=6)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+# ── Coordonnées GPS ───────────────────────────────
+
+EXIF_GPS_IFD = 0x8825
+# Tag ISO 6709 des conteneurs MP4/MOV : « +48.8584+002.2945+035.000/ »
+ISO6709_RE = re.compile(r"^([+-]\d+(?:\.\d+)?)([+-]\d+(?:\.\d+)?)")
+VIDEO_LOCATION_TAGS = ("location", "com.apple.quicktime.location.ISO6709", "location-eng")
+
+
+def _valid_coordinates(lat: float, lng: float) -> tuple[float, float] | None:
+    if -90 <= lat <= 90 and -180 <= lng <= 180 and (lat, lng) != (0.0, 0.0):
+        return lat, lng
+    return None
+
+
+def _exif_gps(img: "Image.Image") -> tuple[float, float] | None:
+    """Lire latitude/longitude dans l'EXIF (degrés, minutes, secondes → décimal)."""
+    try:
+        gps = img.getexif().get_ifd(EXIF_GPS_IFD)
+        if not gps or 2 not in gps or 4 not in gps:
+            return None
+
+        def _decimal(dms, ref) -> float:
+            degrees, minutes, seconds = (float(v) for v in dms)
+            value = degrees + minutes / 60 + seconds / 3600
+            return -value if ref in ("S", "W") else value
+
+        return _valid_coordinates(_decimal(gps[2], gps.get(1, "N")), _decimal(gps[4], gps.get(3, "E")))
+    except Exception:
+        return None
+
+
+def _container_gps(tags: dict) -> tuple[float, float] | None:
+    for name in VIDEO_LOCATION_TAGS:
+        match = ISO6709_RE.match(tags.get(name, ""))
+        if match:
+            return _valid_coordinates(float(match.group(1)), float(match.group(2)))
+    return None
+
 
-async def _extract_video_duration(video_path: Path) -> float | None:
-    """Extraire la durée d'une vidéo avec ffprobe."""
+def make_placeholder(image_data: bytes) -> str | None:
+    """Calculer le placeholder LQIP d'une image (bloquant – via `run_cpu`)."""
+    from PIL import Image
+
+    try:
+        img = Image.open(BytesIO(image_data))
+        img.draft("RGB", (PLACEHOLDER_SIZE[0] * 8, PLACEHOLDER_SIZE[1] * 8))
+        return _build_placeholder(img)
+    except Exception:
+        logger.warning("Impossible de calculer le placeholder LQIP")
+        return None
+
+
+def render_image_thumbnail(file_data: bytes) -> tuple[bytes, str, tuple[float, float] | None]:
+    """Décoder une image et produire (thumbnail JPEG, placeholder, coordonnées EXIF)."""
+    from PIL import Image
+
+    img = Image.open(BytesIO(file_data))
+    # L'EXIF se lit avant le redimensionnement (thumbnail() ne le conserve pas)
+    coordinates = _exif_gps(img)
+    img.thumbnail((THUMB_WIDTH, THUMB_HEIGHT))
+    if img.mode in ("RGBA", "P"):
+        img = img.convert("RGB")
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=settings.thumbnail_quality)
+    # Le placeholder réutilise l'image déjà décodée et réduite
+    return buf.getvalue(), _build_placeholder(img), coordinates
+
+
+async def _probe_video(video_path: Path) -> tuple[float | None, tuple[float, float] | None]:
+    """Extraire la durée et les coordonnées GPS (tags du conteneur) avec ffprobe."""
     cmd = [
         "ffprobe",
         "-v", "quiet",
@@ -32,35 +127,37 @@ async def _extract_video_duration(video_path: Path) -> float | None:
     ]
 
     try:
-        proc = await asyncio.to_thread(
-            subprocess.run, cmd,
-            capture_output=True, timeout=15,
-        )
+        with MEDIA_DURATION.time("ffprobe"), span("media.ffprobe"):
+            proc = await asyncio.to_thread(
+                subprocess.run, cmd,
+                capture_output=True, timeout=15,
+            )
         if proc.returncode != 0:
             logger.warning("ffprobe a échoué : %s", proc.stderr.decode(errors="replace"))
-            return None
+            return None, None
 
         info = json.loads(proc.stdout)
+        coordinates = _container_gps(info["format"].get("tags") or {})
         duration = float(info["format"]["duration"])
-        return duration
+        return duration, coordinates
     except FileNotFoundError:
         logger.warning("ffprobe non installé — pas d'extraction de durée")
-        return None
+        return None, None
     except (KeyError, ValueError, json.JSONDecodeError) as e:
         logger.warning("Impossible de lire la durée vidéo : %s", e)
-        return None
+        return None, None
     except subprocess.TimeoutExpired:
         logger.warning("ffprobe timeout")
-        return None
+        return None, None
 
 
 async def generate_video_thumbnail(file_data: bytes, object_key_prefix: str) -> dict:
     """Extraire une frame de la vidéo avec ffmpeg et l'uploader comme thumbnail.
 
-    Retourne {"thumbnail_key": str|None, "duration_seconds": float|None}.
+    Retourne {"thumbnail_key", "duration_seconds", "placeholder", "coordinates"}.
     """
     thumb_key = f"thumbnails/{object_key_prefix}/{uuid.uuid4().hex}.jpg"
-    result = {"thumbnail_key": None, "duration_seconds": None}
+    result = {"thumbnail_key": None, "duration_seconds": None, "placeholder": None, "coordinates": None}
 
     with tempfile.TemporaryDirectory() as tmpdir:
         video_path = Path(tmpdir) / "input"
@@ -68,8 +165,8 @@ async def generate_video_thumbnail(file_data: bytes, object_key_prefix: str) ->
 
         video_path.write_bytes(file_data)
 
-        # Extraire la durée
-        result["duration_seconds"] = await _extract_video_duration(video_path)
+        # Extraire la durée et la géolocalisation
+        result["duration_seconds"], result["coordinates"] = await _probe_video(video_path)
 
         # Calculer le timestamp de capture (1s ou 10% de la durée, min 0)
         if result["duration_seconds"] and result["duration_seconds"] > 2:
@@ -92,10 +189,11 @@ async def generate_video_thumbnail(file_data: bytes, object_key_prefix: str) ->
         ]
 
         try:
-            proc = await asyncio.to_thread(
-                subprocess.run, cmd,
-                capture_output=True, timeout=30,
-            )
+            with MEDIA_DURATION.time("ffmpeg"), span("media.ffmpeg"):
+                proc = await asyncio.to_thread(
+                    subprocess.run, cmd,
+                    capture_output=True, timeout=30,
+                )
         except FileNotFoundError:
             logger.warning("ffmpeg non installé — pas de thumbnail vidéo")
             return result
@@ -115,6 +213,8 @@ async def generate_video_thumbnail(file_data: bytes, object_key_prefix: str) ->
 
     await upload_file(thumb_data, thumb_key, "image/jpeg")
     result["thumbnail_key"] = thumb_key
+    with MEDIA_DURATION.time("pillow_placeholder"), span("media.pillow_placeholder"):
+        result["placeholder"] = await run_cpu(make_placeholder, thumb_data)
     logger.info("Thumbnail vidéo généré : %s (durée: %s s)", thumb_key, result["duration_seconds"])
     return result
 
@@ -122,34 +222,32 @@ async def generate_video_thumbnail(file_data: bytes, object_key_prefix: str) ->
 async def generate_image_thumbnail(file_data: bytes, object_key_prefix: str) -> dict:
     """Créer un thumbnail redimensionné à partir d'une image avec Pillow.
 
-    Retourne {"thumbnail_key": str|None, "duration_seconds": None}.
+    Retourne {"thumbnail_key", "duration_seconds": None, "placeholder", "coordinates"}.
     """
     thumb_key = f"thumbnails/{object_key_prefix}/{uuid.uuid4().hex}.jpg"
 
-    def _resize():
-        img = Image.open(BytesIO(file_data))
-        img.thumbnail((THUMB_WIDTH, THUMB_HEIGHT))
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        buf = BytesIO()
-        img.save(buf, format="JPEG", quality=settings.thumbnail_quality)
-        return buf.getvalue()
-
     try:
-        thumb_data = await asyncio.to_thread(_resize)
+        with MEDIA_DURATION.time("pillow_thumbnail"), span("media.pillow_thumbnail"):
+            thumb_data, placeholder, coordinates = await run_cpu(render_image_thumbnail, file_data)
     except Exception:
         logger.warning("Échec de la génération du thumbnail image pour %s", object_key_prefix)
-        return {"thumbnail_key": None, "duration_seconds": None}
+        return {"thumbnail_key": None, "duration_seconds": None, "placeholder": None, "coordinates": None}
 
     await upload_file(thumb_data, thumb_key, "image/jpeg")
     logger.info("Thumbnail image généré : %s", thumb_key)
-    return {"thumbnail_key": thumb_key, "duration_seconds": None}
+    return {
+        "thumbnail_key": thumb_key,
+        "duration_seconds": None,
+        "placeholder": placeholder,
+        "coordinates": coordinates,
+    }
 
 
 async def generate_thumbnail(media_type: str, file_data: bytes, object_key: str) -> dict:
     """Point d'entrée : générer un thumbnail selon le type de média.
 
-    Retourne {"thumbnail_key": str|None, "duration_seconds": float|None}.
+    Retourne {"thumbnail_key": str|None, "duration_seconds": float|None,
+    "placeholder": str|None, "coordinates": (lat, lng)|None}.
     """
     prefix = object_key.rsplit(".", 1)[0] if "." in object_key else object_key
 
@@ -158,4 +256,4 @@ async def generate_thumbnail(media_type: str, file_data: bytes, object_key: str)
     if media_type == "image":
         return await generate_image_thumbnail(file_data, prefix)
 
-    return {"thumbnail_key": None, "duration_seconds": None}
+    return {"thumbnail_key": None, "duration_seconds": None, "placeholder": None, "coordinates": None}
@@ -0,0 +1,92 @@
+"""Génération d'archives ZIP64 en streaming (entrées stockées, sans fichier temporaire)."""
+
+import asyncio
+import logging
+import zipfile
+from datetime import datetime
+from typing import AsyncIterable
+
+from app.core.config import get_settings
+from app.core.storage_dispatch import get_file_object
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class _ZipSink:
+    """Flux en écriture seule : zipfile y écrit, le générateur vide le tampon à chaque bloc.
+
+    Sans `seek`/`tell`, zipfile passe en mode non-seekable (descripteurs de données
+    après chaque entrée) : rien n'est jamais réécrit, donc rien n'a besoin d'être gardé.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(name: str, modified: datetime | None) -> zipfile.ZipInfo:
+    date_time = (modified or datetime.now()).timetuple()[:6]
+    # Le format ZIP ne représente pas les dates antérieures à 1980
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = zipfile.ZIP_STORED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+async def iter_zip(entries: AsyncIterable[tuple[str, str, datetime | None]], trailer=None):
+    """Produire un ZIP64 bloc par bloc.
+
+    `entries` : itérateur asynchrone de (nom dans l'archive, clé de stockage, date
+    de modification), consommé au fil de l'écriture. `trailer`, appelée une fois
+    les entrées épuisées, retourne (nom, fichier ouvert) d'une dernière entrée :
+    un manifeste construit pendant le parcours, par exemple.
+    Les médias étant déjà compressés, les entrées sont stockées telles quelles (pas de CPU).
+    """
+    chunk_size = settings.chunk_size_kb * 1024
+    sink = _ZipSink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    async for name, object_key, modified in entries:
+        try:
+            s3_object = await asyncio.to_thread(get_file_object, object_key)
+        except Exception:
+            logger.warning("Fichier absent du stockage, ignoré dans le ZIP : %s", object_key)
+            continue
+
+        body = s3_object["Body"]
+        try:
+            with zf.open(_zip_info(name, modified), mode="w", force_zip64=True) as dest:
+                while True:
+                    chunk = await asyncio.to_thread(body.read, chunk_size)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    yield sink.drain()
+        finally:
+            body.close()
+        yield sink.drain()
+
+    if trailer is not None:
+        name, fileobj = trailer()
+        with zf.open(_zip_info(name, None), mode="w", force_zip64=True) as dest:
+            while chunk := fileobj.read(chunk_size):
+                dest.write(chunk)
+                yield sink.drain()
+        yield sink.drain()
+
+    zf.close()
+    yield sink.drain()
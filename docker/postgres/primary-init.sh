@@ -0,0 +1,4 @@
+#!/bin/sh
+# Autoriser les connexions de réplication (exécuté à la première initialisation du primaire)
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
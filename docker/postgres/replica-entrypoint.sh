@@ -0,0 +1,11 @@
+#!/bin/sh
+# Réplica en streaming : copie de base du primaire au premier démarrage, puis
+# démarrage en hot standby (standby.signal + primary_conninfo écrits par -R)
+set -e
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+  until pg_isready -h db -U "$POSTGRES_USER"; do sleep 1; done
+  mkdir -p "$PGDATA" && chown postgres:postgres "$PGDATA" && chmod 700 "$PGDATA"
+  PGPASSWORD="$POSTGRES_PASSWORD" su-exec postgres \
+    pg_basebackup -h db -U "$POSTGRES_USER" -D "$PGDATA" -R -X stream
+fi
+exec docker-entrypoint.sh postgres -c hot_standby=on
@@ -138,10 +138,14 @@ export default function Archives() {
             <Link key={archive.id} to={`/archives/${archive.id}`} className="archive-card-link">
               <div className="card card--has-thumb">
                 {archive.thumbnail_url ? (
-                  <div className="card-thumbnail">
+                  <div
+                    className="card-thumbnail"
+                    style={archive.placeholder ? { backgroundImage: `url(${archive.placeholder})` } : undefined}
+                  >
                     <img
                       src={withToken(archive.thumbnail_url)}
                       alt=""
+                      loading="lazy"
                       onError={(e) => { e.target.closest('.card-thumbnail').style.display = 'none'; }}
                     />
                   </div>
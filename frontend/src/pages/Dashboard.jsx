@@ -110,78 +110,97 @@ function AdminPasswordReset() {
 }
 
 function AdminReports() {
-  const [reports, setReports] = useState([]);
+  // File de modération : une ligne par archive signalée, paginée par curseur
+  const [items, setItems] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
-  const fetchReports = () => {
+  const fetchQueue = (cursor = null) => {
     setLoading(true);
-    api.getReports('pending')
-      .then((data) => setReports(data.items || []))
+    api.getModerationQueue(cursor)
+      .then((data) => {
+        setItems(prev => (cursor ? [...prev, ...(data.items || [])] : (data.items || [])));
+        setTotal(data.total || 0);
+        setNextCursor(data.next_cursor || null);
+      })
       .catch(() => {})
       .finally(() => setLoading(false));
   };
 
-  useEffect(() => { fetchReports(); }, []);
+  useEffect(() => { fetchQueue(); }, []);
+
+  const removeItem = (archiveId) => {
+    setItems(prev => prev.filter(r => r.archive_id !== archiveId));
+    setTotal(t => Math.max(0, t - 1));
+  };
 
-  const handleDismiss = async (reportId) => {
+  const handleDismiss = async (archiveId) => {
     try {
-      await api.dismissReport(reportId);
-      setReports(prev => prev.filter(r => r.id !== reportId));
+      await api.bulkDismissReports([archiveId]);
+      removeItem(archiveId);
     } catch {}
   };
 
   const handleHide = async (archiveId) => {
     try {
       await api.hideArchive(archiveId);
-      setReports(prev => prev.filter(r => r.archive_id !== archiveId));
+      removeItem(archiveId);
     } catch {}
   };
 
   const handleDelete = async (archiveId) => {
-    if (!window.confirm('Supprimer cette archive ? Cette action est irr\u00e9versible.')) return;
+    if (!window.confirm('Supprimer cette archive ? Cette action est irréversible.')) return;
     try {
       await api.deleteArchive(archiveId);
-      setReports(prev => prev.filter(r => r.archive_id !== archiveId));
+      removeItem(archiveId);
     } catch {}
   };
 
-  if (loading) return <p style={{ color: 'var(--color-clay)' }}>Chargement des signalements...</p>;
-  if (reports.length === 0) return <p style={{ color: 'var(--color-clay)' }}>Aucun signalement en attente.</p>;
+  const formatDate = (value) => new Date(value).toLocaleDateString('fr-FR', {
+    day: 'numeric', month: 'short', year: 'numeric',
+  });
+
+  if (loading && items.length === 0) return <p style={{ color: 'var(--color-clay)' }}>Chargement des signalements...</p>;
+  if (items.length === 0) return <p style={{ color: 'var(--color-clay)' }}>Aucun signalement en attente.</p>;
 
   return (
     <div style={{ display: 'flex', flexDirection: 'column', gap: 'var(--space-md)' }}>
-      {reports.map((report) => (
-        <div key={report.id} className="card" style={{
+      <p style={{ fontSize: '0.85rem', color: 'var(--color-clay)', fontFamily: 'var(--font-mono)' }}>
+        {total} archive{total !== 1 ? 's' : ''} signal&eacute;e{total !== 1 ? 's' : ''}
+      </p>
+      {items.map((item) => (
+        <div key={item.archive_id} className="card" style={{
           borderLeft: '4px solid var(--color-error)',
           padding: 'var(--space-lg)',
         }}>
           <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'flex-start', gap: 'var(--space-md)', flexWrap: 'wrap' }}>
             <div style={{ flex: 1 }}>
               <h4 style={{ marginBottom: 'var(--space-xs)' }}>
-                <Link to={`/archives/${report.archive_id}`} style={{ color: 'var(--color-ink)' }}>
-                  {report.archive_title || 'Archive'}
+                <Link to={`/archives/${item.archive_id}`} style={{ color: 'var(--color-ink)' }}>
+                  {item.archive_title || 'Archive'}
                 </Link>
               </h4>
               <p style={{ fontSize: '0.85rem', color: 'var(--color-earth)', marginBottom: 'var(--space-xs)' }}>
-                Signal&eacute; par {report.reporter_name || 'Utilisateur'} &mdash;{' '}
-                {new Date(report.created_at).toLocaleDateString('fr-FR', {
-                  day: 'numeric', month: 'short', year: 'numeric',
-                })}
+                {item.report_count} signalement{item.report_count > 1 ? 's' : ''} &mdash;{' '}
+                {item.report_count > 1
+                  ? `du ${formatDate(item.first_reported_at)} au ${formatDate(item.last_reported_at)}`
+                  : formatDate(item.last_reported_at)}
               </p>
               <p style={{ fontSize: '0.9rem', fontStyle: 'italic', color: 'var(--color-error)' }}>
-                {report.reason}
+                {item.latest_reason}
               </p>
             </div>
             <div style={{ display: 'flex', gap: 'var(--space-sm)', flexShrink: 0 }}>
-              <button className="btn btn-secondary" onClick={() => handleDismiss(report.id)} style={{ fontSize: '0.8rem' }}>
+              <button className="btn btn-secondary" onClick={() => handleDismiss(item.archive_id)} style={{ fontSize: '0.8rem' }}>
                 Lever le signalement
               </button>
-              <button className="btn btn-secondary" onClick={() => handleHide(report.archive_id)} style={{ fontSize: '0.8rem' }}>
+              <button className="btn btn-secondary" onClick={() => handleHide(item.archive_id)} style={{ fontSize: '0.8rem' }}>
                 Masquer
               </button>
               <button
                 className="btn btn-secondary"
-                onClick={() => handleDelete(report.archive_id)}
+                onClick={() => handleDelete(item.archive_id)}
                 style={{ fontSize: '0.8rem', color: 'var(--color-error)', borderColor: 'var(--color-error)' }}
               >
                 Supprimer
@@ -190,6 +209,16 @@ function AdminReports() {
           </div>
         </div>
       ))}
+      {nextCursor && (
+        <button
+          className="btn btn-secondary"
+          onClick={() => fetchQueue(nextCursor)}
+          disabled={loading}
+          style={{ alignSelf: 'center' }}
+        >
+          {loading ? 'Chargement…' : 'Charger plus'}
+        </button>
+      )}
     </div>
   );
 }
@@ -197,33 +226,25 @@ function AdminReports() {
 export default function Dashboard() {
   const { user } = useAuth();
   const [archives, setArchives] = useState([]);
-  const [totalCount, setTotalCount] = useState(0);
-  const [allArchives, setAllArchives] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     // Charger les archives récentes pour l'affichage
     const fetchRecent = api.getArchives({ page: 1, page_size: 6 })
-      .then((data) => {
-        setArchives(data.items || []);
-        setTotalCount(data.total || 0);
-      });
+      .then((data) => setArchives(data.items || []));
 
-    // Charger toutes les archives pour les stats (admin voit tout, contributor voit les siennes + published)
-    const fetchAll = api.getArchives({ page: 1, page_size: 100 })
-      .then((data) => setAllArchives(data.items || []));
+    // Statistiques agrégées côté serveur (selon la visibilité de l'utilisateur)
+    const fetchStats = api.getArchiveStats().then(setStats);
 
-    Promise.all([fetchRecent, fetchAll])
+    Promise.all([fetchRecent, fetchStats])
       .catch(() => {})
       .finally(() => setLoading(false));
   }, []);
 
-  const stats = {
-    total: totalCount,
-    video: allArchives.filter(a => a.media_type === 'video').length,
-    audio: allArchives.filter(a => a.media_type === 'audio').length,
-    image: allArchives.filter(a => a.media_type === 'image').length,
-  };
+  const byType = stats?.by_media_type || {};
+  const storageGb = (stats?.storage_bytes || 0) / 1024 ** 3;
+  const hours = (stats?.total_duration_seconds || 0) / 3600;
 
   return (
     <div className="container main-content">
@@ -236,21 +257,29 @@ export default function Dashboard() {
 
       <div className="stats-row">
         <div className="stat-card">
-          <div className="stat-number">{stats.total}</div>
+          <div className="stat-number">{stats?.total ?? 0}</div>
           <div className="stat-label">Archives</div>
         </div>
         <div className="stat-card">
-          <div className="stat-number">{stats.video}</div>
+          <div className="stat-number">{byType.video || 0}</div>
           <div className="stat-label">Vid&eacute;os</div>
         </div>
         <div className="stat-card">
-          <div className="stat-number">{stats.audio}</div>
+          <div className="stat-number">{byType.audio || 0}</div>
           <div className="stat-label">Audio</div>
         </div>
         <div className="stat-card">
-          <div className="stat-number">{stats.image}</div>
+          <div className="stat-number">{byType.image || 0}</div>
           <div className="stat-label">Images</div>
         </div>
+        <div className="stat-card">
+          <div className="stat-number">{hours.toFixed(hours < 10 ? 1 : 0)}</div>
+          <div className="stat-label">Heures</div>
+        </div>
+        <div className="stat-card">
+          <div className="stat-number">{storageGb.toFixed(storageGb < 10 ? 1 : 0)}</div>
+          <div className="stat-label">Go stock&eacute;s</div>
+        </div>
       </div>
 
       {/* Section admin : contenus signal&eacute;s */}
@@ -298,10 +327,14 @@ export default function Dashboard() {
             <Link key={archive.id} to={`/archives/${archive.id}`} className="archive-card-link">
               <div className="card card--has-thumb">
                 {archive.thumbnail_url ? (
-                  <div className="card-thumbnail">
+                  <div
+                    className="card-thumbnail"
+                    style={archive.placeholder ? { backgroundImage: `url(${archive.placeholder})` } : undefined}
+                  >
                     <img
                       src={withToken(archive.thumbnail_url)}
                       alt=""
+                      loading="lazy"
                       onError={(e) => { e.target.closest('.card-thumbnail').style.display = 'none'; }}
                     />
                   </div>
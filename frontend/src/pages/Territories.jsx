@@ -1,11 +1,13 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { MapContainer, TileLayer, Marker, Popup, useMap } from 'react-leaflet';
+import { MapContainer, TileLayer, Marker, Popup, useMap, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
 import api from '../utils/api';
 
 import 'leaflet/dist/leaflet.css';
 
+const MEDIA_LABELS = { video: 'vidéo', audio: 'audio', image: 'image', document: 'document' };
+
 // Fix pour les icônes Leaflet manquantes avec les bundlers
 delete L.Icon.Default.prototype._getIconUrl;
 L.Icon.Default.mergeOptions({
@@ -23,6 +25,65 @@ function createCountIcon(count) {
   });
 }
 
+function ClusteredMarkers({ onSelect }) {
+  // Clusters calculés côté serveur pour l'emprise et le zoom courants
+  const [features, setFeatures] = useState([]);
+  const map = useMapEvents({
+    moveend: () => refresh(),
+  });
+
+  const refresh = () => {
+    const bounds = map.getBounds();
+    const bbox = [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()]
+      .map((v) => Math.round(v * 1e4) / 1e4);
+    bbox[1] = Math.max(bbox[1], -85);
+    bbox[3] = Math.min(bbox[3], 85);
+    api.getTerritoryMap(map.getZoom(), bbox)
+      .then((data) => setFeatures(data.features || []))
+      .catch(() => {});
+  };
+
+  useEffect(() => { refresh(); }, []);
+
+  return features.map((feature) => {
+    const [lng, lat] = feature.geometry.coordinates;
+    const props = feature.properties;
+    if (props.cluster) {
+      return (
+        <Marker
+          key={`c-${lat}-${lng}`}
+          position={[lat, lng]}
+          icon={createCountIcon(props.archive_count)}
+          eventHandlers={{
+            click: () => map.setView([lat, lng], Math.min(map.getZoom() + 2, 18)),
+          }}
+        />
+      );
+    }
+    return (
+      <Marker
+        key={props.territory_id}
+        position={[lat, lng]}
+        icon={createCountIcon(props.archive_count)}
+        eventHandlers={{
+          click: () => onSelect(props.territory_id),
+        }}
+      >
+        <Popup>
+          <div className="territory-popup">
+            <strong>{props.name}</strong>
+            <span>{props.country}{props.region ? `, ${props.region}` : ''}</span>
+            <span>{props.archive_count} archive{props.archive_count !== 1 ? 's' : ''}</span>
+            <Link to={`/archives?territory=${props.territory_id}`}>
+              Voir les archives
+            </Link>
+          </div>
+        </Popup>
+      </Marker>
+    );
+  });
+}
+
 function FitBounds({ territories }) {
   const map = useMap();
 
@@ -88,27 +149,7 @@ export default function Territories() {
               url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
             />
             <FitBounds territories={withCoords} />
-            {withCoords.map((territory) => (
-              <Marker
-                key={territory.id}
-                position={[territory.latitude, territory.longitude]}
-                icon={createCountIcon(territory.archive_count)}
-                eventHandlers={{
-                  click: () => setSelected(territory.id),
-                }}
-              >
-                <Popup>
-                  <div className="territory-popup">
-                    <strong>{territory.name}</strong>
-                    <span>{territory.country}{territory.region ? `, ${territory.region}` : ''}</span>
-                    <span>{territory.archive_count} archive{territory.archive_count !== 1 ? 's' : ''}</span>
-                    <Link to={`/archives?territory=${territory.id}`}>
-                      Voir les archives
-                    </Link>
-                  </div>
-                </Popup>
-              </Marker>
-            ))}
+            <ClusteredMarkers onSelect={setSelected} />
           </MapContainer>
         </div>
       )}
@@ -145,6 +186,19 @@ export default function Territories() {
               </p>
             )}
 
+            {territory.counts_by_media_type && Object.keys(territory.counts_by_media_type).length > 0 && (
+              <p style={{
+                fontSize: '0.75rem',
+                fontFamily: 'var(--font-mono)',
+                color: 'var(--color-clay)',
+                margin: 0,
+              }}>
+                {Object.entries(territory.counts_by_media_type)
+                  .map(([type, count]) => `${count} ${MEDIA_LABELS[type] || type}`)
+                  .join(' · ')}
+              </p>
+            )}
+
             <div style={{
               display: 'flex',
               justifyContent: 'space-between',
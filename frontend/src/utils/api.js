@@ -162,6 +162,12 @@ class ApiClient {
     return res.json();
   }
 
+  async getArchiveStats() {
+    const res = await this.request('/archives/stats');
+    if (!res.ok) throw new Error('Erreur de chargement des statistiques');
+    return res.json();
+  }
+
   async getArchive(id) {
     const res = await this.request(`/archives/${id}`);
     if (!res.ok) throw new Error('Archive non trouvée');
@@ -229,6 +235,16 @@ class ApiClient {
     return res.json();
   }
 
+  async bulkUpdateArchives(payload) {
+    // payload : { ids | filters, add_tags, remove_tags, status, access_level, territory_id }
+    const res = await this.request('/archives/bulk', {
+      method: 'POST',
+      body: JSON.stringify(payload),
+    });
+    if (!res.ok) throw new Error('Erreur de mise à jour groupée');
+    return res.json();
+  }
+
   async searchArchives(query, params = {}) {
     const allParams = { q: query, ...params };
     const qs = new URLSearchParams(allParams).toString();
@@ -237,6 +253,18 @@ class ApiClient {
     return res.json();
   }
 
+  async getThumbnailSprite(params = {}) {
+    // Une seule image pour toute une page de thumbnails (+ offsets par archive)
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (Array.isArray(value)) value.forEach((v) => query.append(key, v));
+      else query.append(key, value);
+    });
+    const res = await this.request(`/archives/sprite?${query.toString()}`);
+    if (!res.ok) throw new Error('Erreur de chargement');
+    return res.json();
+  }
+
   async exportArchivesCsv(params = {}) {
     const query = new URLSearchParams(params).toString();
     const res = await this.request(`/archives/export/csv?${query}`);
@@ -250,6 +278,45 @@ class ApiClient {
     URL.revokeObjectURL(url);
   }
 
+  downloadArchivesZip(params = {}) {
+    // Lien direct : le navigateur écrit le ZIP sur le disque au fil de l'eau
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (Array.isArray(value)) value.forEach((v) => query.append(key, v));
+      else query.append(key, value);
+    });
+    if (this.accessToken) query.append('token', this.accessToken);
+    const a = document.createElement('a');
+    a.href = `${API_BASE}/archives/download/zip?${query.toString()}`;
+    a.download = 'archives.zip';
+    a.click();
+  }
+
+  async getOfflineBundle(params = {}) {
+    // params.since : version du dernier bundle synchronisé (bundle delta)
+    const query = new URLSearchParams(params).toString();
+    const res = await this.request(`/archives/bundle?${query}`);
+    if (!res.ok) throw new Error('Erreur de préparation du bundle');
+    return res.json();
+  }
+
+  // ── Exports asynchrones (JSONL / Parquet) ──
+
+  async createExport(format = 'jsonl', filters = {}) {
+    const res = await this.request('/archives/exports', {
+      method: 'POST',
+      body: JSON.stringify({ format, ...filters }),
+    });
+    if (!res.ok) throw new Error('Erreur lors de l\'export');
+    return res.json();
+  }
+
+  async getExport(jobId) {
+    const res = await this.request(`/archives/exports/${jobId}`);
+    if (!res.ok) throw new Error('Export non trouvé');
+    return res.json();
+  }
+
   // ── Upload par URL pré-signée (gros fichiers) ──
 
   async getUploadUrl(filename, contentType, fileSize) {
@@ -285,6 +352,32 @@ class ApiClient {
     return res.json();
   }
 
+  async getModerationQueue(cursor = null, limit = 50) {
+    const params = new URLSearchParams({ limit });
+    if (cursor) params.append('cursor', cursor);
+    const res = await this.request(`/admin/reports/queue?${params.toString()}`);
+    if (!res.ok) throw new Error('Erreur de chargement');
+    return res.json();
+  }
+
+  async bulkDismissReports(archiveIds) {
+    const res = await this.request('/admin/reports/bulk-dismiss', {
+      method: 'POST',
+      body: JSON.stringify({ archive_ids: archiveIds }),
+    });
+    if (!res.ok) throw new Error('Erreur lors de la levée des signalements');
+    return res.json();
+  }
+
+  async bulkHideArchives(archiveIds) {
+    const res = await this.request('/admin/archives/bulk-hide', {
+      method: 'POST',
+      body: JSON.stringify({ archive_ids: archiveIds }),
+    });
+    if (!res.ok) throw new Error('Erreur lors du masquage');
+    return res.json();
+  }
+
   async dismissReport(reportId) {
     const res = await this.request(`/admin/reports/${reportId}`, {
       method: 'PATCH',
@@ -322,6 +415,13 @@ class ApiClient {
     return res.json();
   }
 
+  async getTerritoryMap(zoom, bbox) {
+    const params = new URLSearchParams({ zoom, bbox: bbox.join(',') });
+    const res = await this.request(`/territories/map?${params.toString()}`);
+    if (!res.ok) throw new Error('Erreur de chargement de la carte');
+    return res.json();
+  }
+
   async createTerritory(data) {
     const res = await this.request('/territories/', {
       method: 'POST',